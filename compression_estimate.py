@@ -0,0 +1,156 @@
+#
+# compression_estimate.py : Kolmogorov complexity upper bounds from compressed sizes
+#                           (the README.txt zip-ratio estimate, without writing archives)
+#
+# use:   python compression_estimate.py high_complexity.txt --reference low_complexity.txt
+#        python compression_estimate.py FILE [--codecs zlib,bz2,lzma] [--levels zlib=9,lzma=6]
+#
+# The file is mmapped (or read in chunks when it cannot be mapped) and fed to
+# every codec in CHUNK_BYTES slices, so memory stays bounded for multi-GB
+# inputs. Each codec runs in its own thread: zlib, bz2 and lzma release the
+# GIL while compressing, so they use one core each.
+#
+# index = compressed size of FILE / compressed size of the reference file,
+# the README upper bound (712 kb / 3 kb = 237 for high_complexity.txt).
+#
+
+import os, sys, mmap, time, argparse
+import bz2, lzma, zlib
+from concurrent.futures import ThreadPoolExecutor
+
+CHUNK_BYTES = 1 << 20
+
+CODECS = {
+    "zlib": lambda level: zlib.compressobj(level),
+    "bz2": lambda level: bz2.BZ2Compressor(level),
+    "lzma": lambda level: lzma.LZMACompressor(preset=level),
+}
+DEFAULT_LEVELS = {"zlib": 9, "bz2": 9, "lzma": 6}
+
+
+# -----------------------------------------------------------
+#   INPUT: zero-copy slices of a mapped file, or chunks read from it
+# -----------------------------------------------------------
+def iter_slices(path, chunk_bytes=CHUNK_BYTES):
+    """
+    Yields the content of path as successive buffers of at most chunk_bytes.
+    A mapped slice is only valid until the next one is requested.
+    """
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # empty files, pipes, ... : plain chunked reads
+            while True:
+                chunk = f.read(chunk_bytes)
+                if not chunk:
+                    return
+                yield chunk
+        with mm:
+            view = memoryview(mm)
+            try:
+                for start in range(0, len(mm), chunk_bytes):
+                    part = view[start:start + chunk_bytes]
+                    try:
+                        yield part
+                    finally:
+                        part.release()
+            finally:
+                view.release()
+
+
+def compressed_size(path, codec, level=None, chunk_bytes=CHUNK_BYTES):
+    """
+    Returns (original_bytes, compressed_bytes, elapsed_seconds) of path with codec.
+    """
+    if codec not in CODECS:
+        raise ValueError(f"unknown codec {codec!r} (use one of {sorted(CODECS)})")
+    level = DEFAULT_LEVELS[codec] if level is None else level
+
+    t0 = time.perf_counter()
+    compressor = CODECS[codec](level)
+    original = compressed = 0
+    for part in iter_slices(path, chunk_bytes):
+        original += len(part)
+        compressed += len(compressor.compress(part))
+    compressed += len(compressor.flush())
+    return original, compressed, time.perf_counter() - t0
+
+
+# -----------------------------------------------------------
+#   ESTIMATE
+# -----------------------------------------------------------
+def estimate(path, codecs=None, levels=None, reference=None, chunk_bytes=CHUNK_BYTES):
+    """
+    Compress path (and the reference file, if given) with every codec in parallel.
+    Returns {codec: {"level", "bytes", "compressed", "ratio", "seconds", "mb_per_second",
+                     "reference_compressed", "index"}}; the last two only with a reference.
+    """
+    codecs = list(codecs or CODECS)
+    levels = {**DEFAULT_LEVELS, **(levels or {})}
+    jobs = [(path, c) for c in codecs] + ([(reference, c) for c in codecs] if reference else [])
+
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = {job: pool.submit(compressed_size, job[0], job[1], levels[job[1]], chunk_bytes)
+                   for job in jobs}
+        sizes = {job: f.result() for job, f in futures.items()}
+
+    report = {}
+    for c in codecs:
+        original, compressed, seconds = sizes[(path, c)]
+        row = {
+            "level": levels[c],
+            "bytes": original,
+            "compressed": compressed,
+            "ratio": compressed / original if original else 0.0,
+            "seconds": seconds,
+            "mb_per_second": original / 1e6 / max(seconds, 1e-12),
+        }
+        if reference:
+            row["reference_compressed"] = sizes[(reference, c)][1]
+            row["index"] = compressed / max(row["reference_compressed"], 1)
+        report[c] = row
+    return report
+
+
+def parse_levels(text):
+    # "zlib=9,lzma=6" -> {"zlib": 9, "lzma": 6}
+    levels = {}
+    for item in filter(None, text.split(",")):
+        codec, _, level = item.partition("=")
+        levels[codec.strip()] = int(level)
+    return levels
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Compressed-size complexity estimates (zlib, bz2, lzma).")
+    parser.add_argument("file")
+    parser.add_argument("--reference", default=None,
+                        help="low complexity file: index = compressed(file) / compressed(reference)")
+    parser.add_argument("--codecs", default=",".join(CODECS), help="comma separated")
+    parser.add_argument("--levels", default="", help="e.g. zlib=9,bz2=9,lzma=6")
+    parser.add_argument("--chunk", type=int, default=CHUNK_BYTES, help="bytes per compressor call")
+    args = parser.parse_args(argv)
+
+    codecs = [c for c in args.codecs.split(",") if c]
+    for c in codecs:
+        if c not in CODECS:
+            parser.error(f"unknown codec {c!r} (use one of {', '.join(CODECS)})")
+
+    t0 = time.perf_counter()
+    report = estimate(args.file, codecs, parse_levels(args.levels), args.reference, args.chunk)
+    elapsed = time.perf_counter() - t0
+
+    print(f"{args.file}: {os.path.getsize(args.file)} bytes")
+    for c, r in report.items():
+        line = (f"  {c:5s} level {r['level']}: {r['compressed']:12d} bytes  ratio {r['ratio']:.4f}  "
+                f"{r['mb_per_second']:8.2f} MB/s")
+        if "index" in r:
+            line += f"  index {r['index']:.1f} (reference {r['reference_compressed']} bytes)"
+        print(line)
+    print(f"Elapsed time: {elapsed:.3f} seconds")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
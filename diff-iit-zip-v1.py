@@ -7,6 +7,8 @@ import numpy as np
 from itertools import product
 from numba import njit
 
+from lz_symbolize import flatten_states
+
 @njit(cache=True, nogil=True)
 def complexityLempelZiv(s):
     complexity = 1
@@ -74,18 +76,18 @@ for _ in range(steps):
     sequence.append(current_state)
     current_state = evolve_v2(current_state)
 
-# Converti in stringa binaria per LZ
-seq_str = ''.join(''.join(str(bit) for bit in s) for s in sequence)
+# Sequenza binaria concatenata per LZ: array uint8, niente stringhe
+seq = flatten_states(sequence)
 
 print("Sequenza di stati:")
 print(sequence)
 print("\nSequenza binaria concatenata:")
-print(seq_str)
+print(''.join(map(str, seq)))
 
 # --------------------------
 # Calcolo Lempel-Ziv
 # --------------------------
-lz_index = complexityLempelZiv(np.array(tuple(seq_str)))
+lz_index = complexityLempelZiv(seq)
 print("\nLempel-Ziv complexity:", lz_index)
 
 # --------------------------
@@ -6,6 +6,13 @@ import numpy as np
 from itertools import product
 import matplotlib.pyplot as plt
 
+from lz_scripts import load_script
+from lz_symbolize import flatten_states
+from lz_psi import psi_curve
+
+# curva LZ76 di tutti i prefissi in O(N) (lempel-ziv-v6.py, kernel Numba)
+lz76_prefix_complexity = load_script("lempel-ziv-v6.py").lz76_prefix_complexity
+
 # --------------------------
 # Funzione Lempel-Ziv
 # --------------------------
@@ -46,33 +53,17 @@ for _ in range(steps):
     current_state = evolve(current_state)
 
 # --------------------------
-# Converti in stringa binaria
+# Sequenza binaria concatenata (array uint8, niente stringhe)
 # --------------------------
-seq_str = ''.join(''.join(str(bit) for bit in s) for s in sequence)
+seq = flatten_states(sequence)
 
 # --------------------------
 # Calcolo Lempel-Ziv e ψ passo passo
 # --------------------------
-lz_values = []
-psi_values = []
-
-for i in range(1, len(sequence)+1):
-    subseq = sequence[:i]
-    subseq_str = seq_str[:i*3]  # ogni stato = 3 bit
-
-    # Lempel-Ziv
-    lz_index = complexityLempelZiv(list(subseq_str))
-    lz_values.append(lz_index)
-
-    # ψ semplificato
-    states_array = np.array(subseq)
-    probs = np.mean(states_array, axis=0)
-    H_parts = np.sum([-p*np.log2(p)-(1-p)*np.log2(1-p) if 0<p<1 else 0 for p in probs])
-    flat_states = [tuple(s) for s in subseq]
-    unique, counts = np.unique(flat_states, axis=0, return_counts=True)
-    probs_total = counts / counts.sum()
-    H_total = -np.sum(probs_total * np.log2(probs_total))
-    psi_values.append(H_total - H_parts)
+# Lempel-Ziv di ogni prefisso seq[:i*3] (ogni stato = 3 bit) in un solo passaggio
+lz_values = lz76_prefix_complexity(seq, step=3)
+# ψ semplificato di ogni prefisso con conteggi incrementali (lz_psi.py), senza np.unique per prefisso
+_, _, psi_values = psi_curve(sequence)
 
 # --------------------------
 # Grafico
@@ -1,32 +1,177 @@
 
 # generate-string.py: generate string for Kolmogorov complexity calculation purposes
+#
+# use:   python generate-string.py rnd 10_000_000 > example.txt
+#        python generate-string.py PROFILE SIZE [-o FILE] [--seed S] [profile options]
+#
+# profiles (SIZE = number of characters, except const):
+#   const     SIZE repetitions of 'ab'                         (low complexity)
+#   rnd       uniform ascii letters                            (high complexity)
+#   binary    uniform '0'/'1'
+#   periodic  random pattern of --period symbols repeated, each symbol replaced
+#             by a random one with probability --noise
+#   markov    --order-th order Markov chain over --alphabet, random transition
+#             table (Dirichlet(--concentration): small values = more predictable)
+#   blocks    alternating --block long periodic ('ab') and random letter blocks
+#
+# Everything is generated with NumPy in chunks and written straight to the
+# output, so multi-GB corpora take seconds and little memory.
+
+import string, sys, argparse
+import numpy as np
+from numba import njit
+
+ALPHABETS = {
+    "letters": string.ascii_letters,
+    "binary": "01",
+    "dna": "ACGT",
+}
+CHUNK = 1 << 22
 
-import string, random, sys
 
 def generate_constant_string(message,size):
     return message*size
-    
-def generate_random_string(size):
-    message = ''
-    for i in range(size):
-        message += random.choice(string.ascii_letters)
-        
-    return message
-    
+
+def generate_random_string(size, seed=None):
+    rng = np.random.default_rng(seed)
+    letters = np.frombuffer(string.ascii_letters.encode(), dtype=np.uint8)
+    return letters[rng.integers(0, len(letters), size)].tobytes().decode()
+
+
+# ---------------------------
+# Chunked profile generators: yield arrays of symbol indices
+# ---------------------------
+def _sizes(size, chunk):
+    done = 0
+    while done < size:
+        n = min(chunk, size - done)
+        yield done, n
+        done += n
+
+def _uniform(rng, size, a, chunk):
+    for _, n in _sizes(size, chunk):
+        yield rng.integers(0, a, n, dtype=np.uint8)
+
+def _periodic(rng, size, a, period, noise, chunk):
+    pattern = rng.integers(0, a, period, dtype=np.uint8)
+    for start, n in _sizes(size, chunk):
+        idx = (start + np.arange(n)) % period
+        out = pattern[idx]
+        if noise > 0:
+            flip = rng.random(n) < noise
+            out[flip] = rng.integers(0, a, int(flip.sum()), dtype=np.uint8)
+        yield out
+
+@njit(cache=True)
+def markov_fill(cum, a, order, ctx, u, out):
+    # cum[ctx] = cumulative next-symbol distribution after context ctx (base-a number)
+    n_ctx = a ** order
+    for i in range(u.shape[0]):
+        s = np.searchsorted(cum[ctx], u[i], side="right")
+        if s >= a:
+            s = a - 1
+        out[i] = s
+        ctx = (ctx * a + s) % n_ctx
+    return ctx
+
+def _markov(rng, size, a, order, concentration, chunk):
+    table = rng.dirichlet(np.full(a, concentration), size=a ** order)
+    cum = np.cumsum(table, axis=1)
+    ctx = 0
+    for _, n in _sizes(size, chunk):
+        out = np.empty(n, dtype=np.uint8)
+        ctx = markov_fill(cum, a, order, ctx, rng.random(n), out)
+        yield out
+
+def _blocks(rng, size, a, block, chunk):
+    # symbols 0, 1 = 'a', 'b'; 2..a-1 = ascii letters
+    # even blocks: 'ab' repeated, odd blocks: random letters
+    for start, n in _sizes(size, chunk):
+        pos = start + np.arange(n)
+        low = (pos // block) % 2 == 0
+        out = rng.integers(2, a, n, dtype=np.uint8)
+        out[low] = (pos[low] % 2).astype(np.uint8)
+        yield out
+
+
+def profile_chunks(profile, size, seed=None, chunk=CHUNK, alphabet="letters",
+                   period=16, noise=0.01, order=2, concentration=0.5, block=100_000):
+    """
+    Generator of uint8 arrays (encoded characters) making up the corpus.
+    """
+    rng = np.random.default_rng(seed)
+    if profile == "const":
+        message = np.frombuffer(b"ab", dtype=np.uint8)
+        for start, n in _sizes(2 * size, chunk):
+            yield message[(start + np.arange(n)) % 2]
+        return
+
+    if profile == "rnd":
+        alphabet = "letters"
+    elif profile == "binary":
+        alphabet = "binary"
+    elif profile == "blocks":
+        alphabet = "ab" + string.ascii_letters
+    symbols = np.frombuffer(ALPHABETS.get(alphabet, alphabet).encode(), dtype=np.uint8)
+    a = len(symbols)
+
+    if profile in ("rnd", "binary"):
+        parts = _uniform(rng, size, a, chunk)
+    elif profile == "periodic":
+        parts = _periodic(rng, size, a, period, noise, chunk)
+    elif profile == "markov":
+        parts = _markov(rng, size, a, order, concentration, chunk)
+    elif profile == "blocks":
+        parts = _blocks(rng, size, a, block, chunk)
+    else:
+        raise ValueError(f"unknown profile {profile!r}")
+
+    for p in parts:
+        yield symbols[p]
+
+
+def write_profile(f, profile, size, newline=True, **params):
+    """
+    Write the corpus to the binary file object f, chunk by chunk.
+    """
+    written = 0
+    for part in profile_chunks(profile, size, **params):
+        f.write(part.tobytes())
+        written += part.shape[0]
+    if newline:
+        f.write(b"\n")
+    return written
+
+
 def main(argv):
-    
+
     # use:   python generate-string.py rnd 10_000_000 > example.txt
-    try:
-        size = int(argv[1])
-        
-        if 'const' in argv[0]:
-            print(generate_constant_string('ab',size))      # low complexity
-        elif 'rnd' in argv[0]:
-            print(generate_random_string(size))             # high complexity
-        else:
-            print("error! bad parameter.\npermitted parameters are 'const' / 'rnd'")
-    except error:
-        print("bad parameters.")
-    
+    parser = argparse.ArgumentParser(description="Generate corpora for complexity measurements.")
+    parser.add_argument("profile", choices=["const", "rnd", "binary", "periodic", "markov", "blocks"])
+    parser.add_argument("size", type=int)
+    parser.add_argument("-o", "--output", default=None, help="output file (default: stdout)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--alphabet", default="letters",
+                        help="letters, binary, dna or a literal set of characters (periodic, markov)")
+    parser.add_argument("--period", type=int, default=16)
+    parser.add_argument("--noise", type=float, default=0.01)
+    parser.add_argument("--order", type=int, default=2)
+    parser.add_argument("--concentration", type=float, default=0.5)
+    parser.add_argument("--block", type=int, default=100_000)
+    parser.add_argument("--chunk", type=int, default=CHUNK)
+    args = parser.parse_args(argv)
+
+    params = dict(seed=args.seed, chunk=args.chunk, alphabet=args.alphabet, period=args.period,
+                  noise=args.noise, order=args.order, concentration=args.concentration,
+                  block=args.block)
+    if args.output:
+        with open(args.output, "wb") as f:
+            write_profile(f, args.profile, args.size, **params)
+    else:
+        write_profile(sys.stdout.buffer, args.profile, args.size, **params)
+        sys.stdout.flush()
+
 if __name__ == "__main__":
-    main(sys.argv[1:])
+    # run through the stable module name (markov_fill is cached on disk, see lz_scripts.py)
+    from lz_scripts import load_script
+    load_script(__file__).main(sys.argv[1:])
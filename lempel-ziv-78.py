@@ -0,0 +1,239 @@
+#
+# lempel-ziv-78.py : LZ78 (dictionary) complexity in O(N)
+#                    - works on bytes, alphabet mapped to the symbols actually used
+#                    - the phrase dictionary is a trie stored in flat arrays:
+#                      dense (nodes, m) child table or hashed (node, symbol) -> child table
+#                    - constant work per input symbol, core routines njit-compiled
+#
+# The input is split into phrases, each one being the longest phrase already in
+# the dictionary followed by one new symbol; the new phrase is added to the
+# dictionary. The last phrase may be a repeat of an old one (input ended).
+# The LZ78 complexity is the number of phrases c; c * log_m(c) / N tends to
+# the entropy rate (in units of log m), so it is about 1 for random input.
+
+import sys, time
+import numpy as np
+from numba import njit
+
+TRIE_INITIAL_NODES = 1 << 12
+
+# ---------------------------
+# Helper: bytes -> dense alphabet [0..m-1]
+# ---------------------------
+def map_bytes(raw: bytes):
+    arr = np.frombuffer(raw, dtype=np.uint8)
+    present = np.bincount(arr, minlength=256) > 0
+    map256 = np.full(256, -1, dtype=np.int32)
+    m = int(present.sum())
+    map256[present] = np.arange(m, dtype=np.int32)
+    return map256[arr], m
+
+# ---------------------------
+# Dense trie: child[node, symbol] (-1 = no child), rows doubled when full
+# ---------------------------
+@njit(cache=True)
+def lz78_parse_dense(arr, m, memory_limit_bytes, starts):
+    """
+    Number of LZ78 phrases of arr (symbols in [0, m)), -1 if the trie grows
+    beyond memory_limit_bytes. If starts is not empty, starts[k] receives the
+    position where phrase k begins.
+    """
+    record = starts.shape[0] > 0
+    cap = TRIE_INITIAL_NODES
+    child = np.full((cap, m), -1, dtype=np.int32)
+    n_nodes = 1
+    node = 0
+    count = 0
+    for i in range(arr.shape[0]):
+        if node == 0 and record:
+            starts[count] = i
+        ch = arr[i]
+        nxt = child[node, ch]
+        if nxt != -1:
+            node = nxt
+            continue
+        # new phrase = phrase of node + ch
+        if n_nodes == cap:
+            if 2 * cap * m * 4 > memory_limit_bytes:
+                return -1
+            grown = np.full((2 * cap, m), -1, dtype=np.int32)
+            grown[:cap] = child
+            child = grown
+            cap *= 2
+        child[node, ch] = n_nodes
+        n_nodes += 1
+        count += 1
+        node = 0
+    if node != 0:
+        count += 1
+    return count
+
+# ---------------------------
+# Hashed trie: open addressing table keyed by node * m + symbol
+#   keys:  int64, -1 = empty slot
+#   child: int32, child node of the key in the same slot
+# Kept at most half full; memory depends on the phrases, not on m.
+# ---------------------------
+@njit(inline="always")
+def _slot(key, mask):
+    return np.int64(((np.uint64(key) * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(32)) & np.uint64(mask))
+
+@njit(cache=True)
+def _rehash_trie(keys, child, size):
+    new_keys = np.full(size, -1, dtype=np.int64)
+    new_child = np.empty(size, dtype=np.int32)
+    mask = size - 1
+    for s in range(keys.shape[0]):
+        if keys[s] != -1:
+            slot = _slot(keys[s], mask)
+            while new_keys[slot] != -1:
+                slot = (slot + 1) & mask
+            new_keys[slot] = keys[s]
+            new_child[slot] = child[s]
+    return new_keys, new_child
+
+@njit(cache=True)
+def lz78_parse_sparse(arr, m, memory_limit_bytes, starts):
+    """
+    Same as lz78_parse_dense() with the hashed trie.
+    """
+    record = starts.shape[0] > 0
+    size = 2 * TRIE_INITIAL_NODES
+    keys = np.full(size, -1, dtype=np.int64)
+    child = np.empty(size, dtype=np.int32)
+    mask = size - 1
+    n_nodes = 1
+    node = 0
+    count = 0
+    for i in range(arr.shape[0]):
+        if node == 0 and record:
+            starts[count] = i
+        key = np.int64(node) * m + arr[i]
+        slot = _slot(key, mask)
+        while keys[slot] != -1 and keys[slot] != key:
+            slot = (slot + 1) & mask
+        if keys[slot] == key:
+            node = child[slot]
+            continue
+        # new phrase = phrase of node + arr[i]
+        keys[slot] = key
+        child[slot] = n_nodes
+        n_nodes += 1
+        count += 1
+        node = 0
+        if 2 * n_nodes > size:
+            if 2 * size * 12 > memory_limit_bytes:
+                return -1
+            size *= 2
+            keys, child = _rehash_trie(keys, child, size)
+            mask = size - 1
+    if node != 0:
+        count += 1
+    return count
+
+# ---------------------------
+# Main wrapper
+# ---------------------------
+def lz78_normalized(count, n, m):
+    """
+    c * log_m(c) / N (log base 2 for a one-symbol alphabet), 0 for empty input.
+    """
+    if n == 0 or count < 2:
+        return 0.0
+    return float(count * np.log(count) / (n * np.log(max(m, 2))))
+
+def compute_lz78_complexity_bytes(raw: bytes, memory_limit_bytes=1_000_000_000, transitions="auto",
+                                  boundaries=False):
+    """
+    raw: input bytes
+    memory_limit_bytes: cap for the trie (MemoryError above it)
+    transitions: "dense" ((nodes, m) child table), "sparse" (hashed child table)
+                 or "auto" (dense for alphabets up to 16 symbols, the faster one there,
+                 sparse if the dense table does not fit in memory_limit_bytes)
+    boundaries: also return the phrase start positions
+    Returns: (phrase_count, normalized_complexity, elapsed_seconds)
+             + int64 array of phrase starts if boundaries is True
+    """
+    n = len(raw)
+    starts = np.zeros(n if boundaries else 0, dtype=np.int64)
+    if n == 0:
+        return (0, 0.0, 0.0, starts) if boundaries else (0, 0.0, 0.0)
+
+    arr_mapped, m = map_bytes(raw)
+    fallback = transitions == "auto"
+    if transitions == "auto":
+        transitions = "dense" if m <= 16 else "sparse"
+    if transitions == "dense":
+        parse = lz78_parse_dense
+    elif transitions == "sparse":
+        parse = lz78_parse_sparse
+    else:
+        raise ValueError(f"unknown transitions mode {transitions!r} (use 'dense', 'sparse' or 'auto')")
+
+    t0 = time.perf_counter()
+    count = parse(arr_mapped, m, memory_limit_bytes, starts)
+    if count < 0 and fallback and parse is lz78_parse_dense:
+        count = lz78_parse_sparse(arr_mapped, m, memory_limit_bytes, starts)
+    t1 = time.perf_counter()
+    if count < 0:
+        raise MemoryError(
+            f"LZ78 trie exceeded memory_limit_bytes ({memory_limit_bytes/1e9:.3f} GB). "
+            f"Reduce input size or increase the limit."
+        )
+
+    result = (int(count), lz78_normalized(count, n, m), float(t1 - t0))
+    if boundaries:
+        return result + (starts[:count].copy(),)
+    return result
+
+def warmup():
+    """
+    Compile (or load from the on-disk cache) both parsers. Returns the seconds spent.
+    """
+    t0 = time.perf_counter()
+    compute_lz78_complexity_bytes(b"abcab", transitions="dense", boundaries=True)
+    compute_lz78_complexity_bytes(b"abcab", transitions="sparse")
+    return time.perf_counter() - t0
+
+# ---------------------------
+# CLI / demo
+# ---------------------------
+def read_input_bytes():
+    print("Menù:\n")
+    print("[F] Read from file")
+    print("[K] Read from keyboard (string)\n")
+    x = input("> ").strip().upper()
+    if x == "F":
+        fn = input("File name: ").strip()
+        try:
+            with open(fn, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            print(f"File {fn} not found.")
+            sys.exit(1)
+    else:
+        s = input("give me a string: ")
+        return s.encode("utf-8")
+
+
+def main():
+    raw = read_input_bytes()
+    print(f"Input length = {len(raw)} bytes")
+    print(f"Startup (JIT compile / cache load) = {warmup():.6f} seconds")
+
+    try:
+        c, normalized, elapsed = compute_lz78_complexity_bytes(raw)
+    except MemoryError as e:
+        print("MemoryError:", e)
+        sys.exit(1)
+
+    print(f"\nLZ78 complexity (number of phrases) = {c}")
+    print(f"Normalized complexity c*log_m(c)/N  = {normalized:.6f}")
+    print(f"Elapsed time = {elapsed:.6f} seconds\n")
+
+
+if __name__ == "__main__":
+    # run through the stable module name: Numba's on-disk cache must not
+    # see these kernels as part of "__main__" (see lz_scripts.py)
+    from lz_scripts import load_script
+    load_script(__file__).main()
@@ -0,0 +1,189 @@
+#
+# lempel-ziv-bits.py : Lempel-Ziv complexity index of binary sequences, bit-packed
+#
+# Same algorithm and same result as complexityLempelZiv (lempel-ziv-v2.py), but
+#   - the sequence is stored 64 symbols per uint64 word (8x less memory than uint8)
+#   - matches are extended a word at a time: XOR of the two 64-bit windows at
+#     arbitrary bit offsets, count-trailing-zeros finds the first mismatch
+#
+
+import sys, time
+import numpy as np
+from numba import njit, types
+from numba.extending import intrinsic
+from llvmlite import ir
+
+
+@intrinsic
+def cttz64(typingctx, x):
+    # count trailing zeros (tzcnt / bsf); x must not be 0
+    sig = types.uint64(types.uint64)
+
+    def codegen(context, builder, signature, args):
+        return builder.cttz(args[0], ir.Constant(ir.IntType(1), 1))
+
+    return sig, codegen
+
+
+# -----------------------------------------------------------
+#   PACKING: symbol i = bit (i & 63) of word (i >> 6)
+# -----------------------------------------------------------
+def pack_binary(seq):
+    """
+    Binary sequence (bytes, str or 1-D array with at most 2 distinct symbols)
+    -> (words, n): uint64 array with one spare zero word at the end, and the length.
+    Which symbol becomes 1 does not matter, the complexity only compares symbols.
+    """
+    if isinstance(seq, str):
+        seq = seq.encode("utf-8")
+    if isinstance(seq, (bytes, bytearray, memoryview)):
+        seq = np.frombuffer(seq, dtype=np.uint8)
+    arr = np.ascontiguousarray(seq).ravel()
+    n = arr.shape[0]
+    words = np.zeros((n + 63) // 64 + 1, dtype=np.uint64)
+    if n == 0:
+        return words, 0
+
+    if arr.dtype == np.uint8:
+        distinct = np.count_nonzero(np.bincount(arr, minlength=256))
+    else:
+        distinct = np.unique(arr).shape[0]
+    if distinct > 2:
+        raise ValueError(f"binary engine: the sequence has {distinct} distinct symbols (at most 2)")
+
+    packed = np.packbits(arr != arr[0], bitorder="little")
+    words.view(np.uint8)[:packed.shape[0]] = packed
+    if sys.byteorder != "little":
+        words.byteswap(inplace=True)
+    return words, n
+
+
+# -----------------------------------------------------------
+#   KERNELS
+# -----------------------------------------------------------
+@njit(inline="always")
+def load64(words, pos):
+    # the 64 symbols starting at bit position pos
+    w = pos >> 6
+    off = np.uint64(pos & 63)
+    if off == 0:
+        return words[w]
+    return (words[w] >> off) | (words[w + 1] << (np.uint64(64) - off))
+
+
+@njit(cache=True, nogil=True)
+def common_run(words, a, b, limit):
+    """
+    Number of equal symbols s[a+i] == s[b+i] from i = 0, stopping at the first
+    mismatch or at limit.
+    """
+    run = 0
+    while run < limit:
+        x = load64(words, a + run) ^ load64(words, b + run)
+        if x != 0:
+            run += np.int64(cttz64(x))
+            return min(run, limit)
+        run += 64
+    return limit
+
+
+@njit(cache=True, nogil=True)
+def complexity_packed(words, n):
+    """
+    complexityLempelZiv of the n symbols packed in words (1 for n = 0, as the byte engine).
+    """
+    complexity = 1
+    prefix_length = 1
+    length_component = 1
+    max_length_component = 1
+    pointer = 0
+
+    while prefix_length + length_component <= n:
+        # extend the match as far as it goes, a word at a time
+        b = prefix_length + length_component - 1
+        length_component += common_run(words, pointer + length_component - 1, b, n - b)
+        if prefix_length + length_component > n:
+            break
+
+        # mismatch
+        if length_component > max_length_component:
+            max_length_component = length_component
+
+        pointer += 1
+
+        if pointer == prefix_length:
+            complexity += 1
+            prefix_length += max_length_component
+            pointer = 0
+            max_length_component = 1
+
+        length_component = 1
+
+    if length_component != 1:
+        complexity += 1
+
+    return complexity
+
+
+def lz76_binary(seq):
+    """
+    complexityLempelZiv of a binary sequence through the bit-packed engine.
+    """
+    words, n = pack_binary(seq)
+    return int(complexity_packed(words, n))
+
+
+def warmup():
+    """
+    Compile (or load from the on-disk cache) the kernels. Returns the seconds spent.
+    """
+    t0 = time.perf_counter()
+    lz76_binary(b"0110")
+    return time.perf_counter() - t0
+
+
+# -----------------------------------------------------------
+#   INPUT HANDLING
+# -----------------------------------------------------------
+def read_string():
+
+    print('\n\nlempel-ziv-bits.py : Lempel-Ziv complexity index of binary sequences, bit-packed\n')
+    print("Menù:\n")
+    print("Read from [F]ile\n")
+    print("Read from [K]eyboard\n")
+    x = input("> ").strip()
+
+    if x.upper() == "F":
+        file_name = input("What file: ").strip()
+        try:
+            with open(file_name, "rb") as f:
+                return f.read().rstrip(b"\r\n")
+        except FileNotFoundError:
+            print(f"File {file_name} not found.")
+            sys.exit(1)
+    else:
+        return input("give me a binary string: ").strip().encode("utf-8")
+
+
+def main():
+    raw = read_string()
+
+    startup = warmup()
+    t0 = time.perf_counter()
+    try:
+        c = lz76_binary(raw)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    elapsed = time.perf_counter() - t0
+
+    print(f"\nLempel-Ziv complexity index = {c}")
+    print(f"\nStartup time (JIT compile / cache load): {startup:.6f} seconds")
+    print(f"Elapsed time: {elapsed:.6f} seconds\n")
+
+
+if __name__ == "__main__":
+    # run through the stable module name: Numba's on-disk cache must not
+    # see these kernels as part of "__main__" (see lz_scripts.py)
+    from lz_scripts import load_script
+    load_script(__file__).main()
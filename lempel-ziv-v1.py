@@ -6,7 +6,7 @@ import time
 import numpy as np
 from numba import njit
 
-@njit(nopython=True,nogil=True)
+@njit(cache=True,nogil=True)
 def complexityLempelZiv(s):
 	complexity				= 1
 	prefix_length			= 1
@@ -33,6 +33,14 @@ def complexityLempelZiv(s):
 		complexity += 1
 	
 	return complexity
+
+def warmup():
+	# compile (or load from the on-disk cache) the kernel for the usual inputs:
+	# read-only uint8 (np.frombuffer), writable uint8 and int32 arrays
+	t0 = time.perf_counter()
+	for arr in (np.frombuffer(b'ab', dtype=np.uint8), np.zeros(2, dtype=np.uint8), np.zeros(2, dtype=np.int32)):
+		complexityLempelZiv(arr)
+	return time.perf_counter() - t0
 	
 def main():
 	
@@ -58,13 +66,21 @@ def main():
 		s = input('give me a string: ')
 	
 	arr = np.frombuffer(s.encode('utf-8'), dtype=np.uint8)
+	# through lz_engines: the result cache (LEMPEL_ZIV_CACHE, see lz_cache.py) applies
+	import lz_engines
+	startup = warmup()
 	t0 = time.perf_counter()
-	c = complexityLempelZiv(arr)
+	c = lz_engines.lz_complexity(arr, "v1")
 	t1 = time.perf_counter()
 	elapsed = t1 - t0
 	
 	print(f'\n\nLempel-Ziv complexity index for \n\n{s[:256]}... \n\nis {c}')
-	print(f"\nElapsed time: {elapsed:.6f} seconds\n")
+	print(f"\nStartup time (JIT compile / cache load): {startup:.6f} seconds")
+	print(f"Elapsed time: {elapsed:.6f} seconds\n")
     
 	
-main()
+if __name__ == "__main__":
+	# run through the stable module name: Numba's on-disk cache must not
+	# see these kernels as part of "__main__" (see lz_scripts.py)
+	from lz_scripts import load_script
+	load_script(__file__).main()
@@ -6,8 +6,13 @@ import time
 import numpy as np
 from numba import njit
 
+# optional counters of complexityLempelZiv (lz_profile.py)
+COMPARISONS, EXTENSIONS = range(2)
+COUNTERS = ("comparisons", "extensions")
+
 @njit(cache=True, nogil=True)
-def complexityLempelZiv(s):
+def complexityLempelZiv(s, counters=None):
+    # counters: None (compiled without counting) or int64 array receiving COUNTERS
     complexity = 1
     prefix_length = 1
     length_component = 1
@@ -16,8 +21,12 @@ def complexityLempelZiv(s):
     n = len(s)
 
     while prefix_length + length_component <= n:
+        if counters is not None:
+            counters[COMPARISONS] += 1
         if s[pointer + length_component - 1] == s[prefix_length + length_component - 1]:
             length_component += 1
+            if counters is not None:
+                counters[EXTENSIONS] += 1
         else:
             if length_component > max_length_component:
                 max_length_component = length_component
@@ -38,6 +47,19 @@ def complexityLempelZiv(s):
     return complexity
 
 
+def warmup():
+    """
+    Compile (or load from the on-disk cache) complexityLempelZiv for the usual
+    inputs: read-only uint8 (np.frombuffer), writable uint8 and int32 arrays.
+    Returns the seconds spent.
+    """
+    t0 = time.perf_counter()
+    for arr in (np.frombuffer(b"ab", dtype=np.uint8), np.zeros(2, dtype=np.uint8),
+                np.zeros(2, dtype=np.int32)):
+        complexityLempelZiv(arr)
+    return time.perf_counter() - t0
+
+
 def read_string():
     
     print('\n\nLempel-ziv-v2.py : Lempel-Ziv v.2 - complexity index with Numba and Numpy\n')
@@ -70,12 +92,20 @@ def main():
     # Convert string to array of uint8 for maximum speed with numba
     arr = np.frombuffer(s.encode("utf-8"), dtype=np.uint8)
 
+    # through lz_engines: the result cache (LEMPEL_ZIV_CACHE, see lz_cache.py) applies
+    import lz_engines
+    startup = warmup()
     t0 = time.perf_counter()
-    c = complexityLempelZiv(arr)
+    c = lz_engines.lz_complexity(arr, "v2")
     t1 = time.perf_counter()
     elapsed = t1 - t0
     
     print(f"\n\nLempel-Ziv complexity index for\n\n{s[:256]}...\n\nis {c}")
-    print(f"\nElapsed time: {elapsed:.6f} seconds\n")
-
-main()
+    print(f"\nStartup time (JIT compile / cache load): {startup:.6f} seconds")
+    print(f"Elapsed time: {elapsed:.6f} seconds\n")
+
+if __name__ == "__main__":
+    # run through the stable module name: Numba's on-disk cache must not
+    # see these kernels as part of "__main__" (see lz_scripts.py)
+    from lz_scripts import load_script
+    load_script(__file__).main()
@@ -4,56 +4,70 @@
 
 import sys, time
 import numpy as np
+from numba import njit
 
 # -----------------------------------------------------------
-#   SUFFIX ARRAY (Skew algorithm / prefix doubling)
+#   SUFFIX ARRAY (prefix doubling, vectorized with NumPy)
 # -----------------------------------------------------------
+def index_dtype(n):
+    return np.int32 if n < 2**31 - 1 else np.int64
+
+
+@njit(cache=True, nogil=True)
+def rerank(sa, key, rank):
+    """
+    rank[sa[i]] = number of distinct keys before key[sa[i]] in sorted order.
+    Returns the number of distinct keys.
+    """
+    r = 0
+    rank[sa[0]] = 0
+    for i in range(1, sa.shape[0]):
+        if key[sa[i]] != key[sa[i - 1]]:
+            r += 1
+        rank[sa[i]] = r
+    return r + 1
+
+
 def build_suffix_array(s):
     """
-    Builds a suffix array in O(N log N)
+    Builds a suffix array in O(N log N): each doubling round sorts the
+    (rank[i], rank[i+k]) pairs packed into one int64 key with np.argsort.
     """
+    s = np.asarray(s)
     n = len(s)
+    dt = index_dtype(n)
+    if n == 0:
+        return np.zeros(0, dtype=dt)
+
+    # initial ranks: dense rank of the symbols
+    symbols, rank = np.unique(s, return_inverse=True)
+    rank = rank.astype(np.int64).ravel()
+    sa = np.argsort(rank, kind="stable").astype(dt)
+    distinct = symbols.shape[0]
+
     k = 1
-    rank = np.array(s, dtype=np.int64)
-    tmp = np.zeros(n, dtype=np.int64)
-    sa = np.arange(n, dtype=np.int64)
-
-    while True:
-        # Sort by (rank[i], rank[i+k])
-        sa = sorted(sa, key=lambda x: (rank[x], rank[x + k] if x + k < n else -1))
-
-        tmp[sa[0]] = 0
-        for i in range(1, n):
-            prev = sa[i - 1]
-            cur = sa[i]
-            tmp[cur] = tmp[prev] + (
-                (rank[prev], rank[prev + k] if prev + k < n else -1)
-                < (rank[cur], rank[cur + k] if cur + k < n else -1)
-            )
-
-        rank[:] = tmp[:]
+    key = np.empty(n, dtype=np.int64)
+    while distinct < n:
+        # key = rank[i] * (n + 1) + (rank[i + k] + 1), 0 past the end
+        np.multiply(rank, n + 1, out=key)
+        key[:n - k] += rank[k:] + 1
+        sa = np.argsort(key).astype(dt)
+        distinct = rerank(sa, key, rank)
         k *= 2
-        if k >= n:
-            break
 
-    return np.array(sa, dtype=np.int64)
+    return sa
 
 
 # -----------------------------------------------------------
 #   LCP ARRAY (Kasai algorithm)
 # -----------------------------------------------------------
-def build_lcp_array(s, sa):
-    """
-    Kasai’s LCP construction in O(N)
-    """
-    n = len(s)
-    rank = np.zeros(n, dtype=np.int64)
+@njit(cache=True, nogil=True)
+def kasai(s, sa, rank, lcp):
+    n = s.shape[0]
     for i in range(n):
         rank[sa[i]] = i
 
-    lcp = np.zeros(n, dtype=np.int64)
     h = 0
-
     for i in range(n):
         if rank[i] > 0:
             j = sa[rank[i] - 1]
@@ -62,39 +76,125 @@ def build_lcp_array(s, sa):
             lcp[rank[i]] = h
             if h > 0:
                 h -= 1
+        else:
+            h = 0
+
 
+def build_lcp_array(s, sa):
+    """
+    Kasai’s LCP construction in O(N): lcp[r] = lcp(suffix sa[r-1], suffix sa[r])
+    """
+    s = np.asarray(s)
+    n = len(s)
+    rank = np.zeros(n, dtype=sa.dtype)
+    lcp = np.zeros(n, dtype=sa.dtype)
+    kasai(s, sa, rank, lcp)
     return lcp
 
 
+# -----------------------------------------------------------
+#   LONGEST PREVIOUS FACTOR (previous/next smaller values over SA)
+# -----------------------------------------------------------
+@njit(cache=True, nogil=True)
+def longest_previous_factor(sa, lcp):
+    """
+    lpf[i] = longest prefix of suffix i that also starts at some p < i
+    (overlap allowed). Among the suffixes that start before i, the best ones
+    are its nearest neighbours in SA order with a smaller position (previous /
+    next smaller value); a single stack pass finds both (Crochemore-Ilie).
+    Note: overwrites lcp.
+    """
+    n = sa.shape[0]
+    lpf = np.zeros(n, dtype=sa.dtype)
+    stack = np.empty(n, dtype=sa.dtype)
+    top = 0
+    stack[0] = 0
+
+    for i in range(1, n + 1):
+        pos = sa[i] if i < n else -1
+        cur = lcp[i] if i < n else 0
+        while top >= 0:
+            t = stack[top]
+            if pos < sa[t]:
+                # i is the next smaller value of t, the entry below t its previous one
+                lpf[sa[t]] = max(lcp[t], cur)
+                cur = min(lcp[t], cur)
+            elif cur <= lcp[t]:
+                lpf[sa[t]] = lcp[t]
+            else:
+                break
+            top -= 1
+        if i < n:
+            # from now on lcp[i] is the lcp with the previous smaller value
+            lcp[i] = cur
+            top += 1
+            stack[top] = i
+
+    return lpf
+
+
+@njit(cache=True, nogil=True)
+def count_factors(lpf):
+    """
+    LZ76 (Kaspar-Schuster) factorization from the LPF array: each component is
+    the longest previous factor plus one new symbol; the last one may be cut
+    by the end of the sequence.
+    """
+    n = lpf.shape[0]
+    c = 0
+    i = 0
+    while i < n:
+        c += 1
+        i += lpf[i] + 1
+    return c
+
+
+@njit(cache=True, nogil=True)
+def factor_starts(lpf):
+    """
+    Start positions of the LZ76 components (those counted by count_factors).
+    """
+    n = lpf.shape[0]
+    starts = np.empty(n, dtype=np.int64)
+    c = 0
+    i = 0
+    while i < n:
+        starts[c] = i
+        c += 1
+        i += lpf[i] + 1
+    return starts[:c]
+
+
 # -----------------------------------------------------------
 #   LZ76 COMPLEXITY USING SUFFIX ARRAY + LCP
 # -----------------------------------------------------------
 def lz76_complexity(s):
     """
-    Compute Lempel-Ziv complexity using the LZ76 factorization.
+    Compute Lempel-Ziv complexity using the LZ76 factorization
+    (same value as complexityLempelZiv in lempel-ziv-v2.py, 0 for an empty input
+    like lz_engines.lz_complexity).
     Complexity: O(N log N)
     """
+    s = np.asarray(s)
     if len(s) == 0:
         return 0
 
     sa = build_suffix_array(s)
     lcp = build_lcp_array(s, sa)
+    lpf = longest_previous_factor(sa, lcp)
+    return int(count_factors(lpf))
 
-    n = len(s)
-    c = 1
-    i = 0
-    while i < n:
-        # The longest match of substring s[i:]
-        longest_match = 0
-        for j in range(1, n - i):
-            longest_match = max(longest_match, lcp[j])
-        if longest_match == 0:
-            i += 1
-        else:
-            i += longest_match
-        c += 1
 
-    return c
+def warmup():
+    """
+    Compile (or load from the on-disk cache) the kernels for read-only uint8
+    (np.frombuffer), writable uint8 and int32 inputs. Returns the seconds spent.
+    """
+    t0 = time.perf_counter()
+    for arr in (np.frombuffer(b"abcab", dtype=np.uint8), np.zeros(5, dtype=np.uint8),
+                np.zeros(5, dtype=np.int32)):
+        lz76_complexity(arr)
+    return time.perf_counter() - t0
 
 
 # -----------------------------------------------------------
@@ -130,6 +230,7 @@ def main():
     arr = np.frombuffer(raw, dtype=np.uint8)
 
     print("\nComputing LZ complexity (fast O(N log N) version)...\n")
+    startup = warmup()
 
     # -----------------------------------------
     #   MISURAZIONE TEMPO DI ELABORAZIONE
@@ -141,6 +242,11 @@ def main():
     # -----------------------------------------
 
     print(f"Lempel-Ziv complexity index = {c}")
-    print(f"\nElapsed time: {elapsed:.6f} seconds\n")
-
-main()
+    print(f"\nStartup time (JIT compile / cache load): {startup:.6f} seconds")
+    print(f"Elapsed time: {elapsed:.6f} seconds\n")
+
+if __name__ == "__main__":
+    # run through the stable module name: Numba's on-disk cache must not
+    # see these kernels as part of "__main__" (see lz_scripts.py)
+    from lz_scripts import load_script
+    load_script(__file__).main()
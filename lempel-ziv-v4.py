@@ -1,7 +1,10 @@
 # LZ complexity in O(N) using a Suffix Automaton (Numba-friendly implementation)
 # - Works on bytes
 # - Maps alphabet to only used symbols (reduces memory)
-# - Core routines are njit-compiled for speed
+# - Transitions live either in a dense (states, m) table (when it fits) or in a
+#   sparse hashed edge store that grows with the transitions actually created
+# - Core routines are njit-compiled for speed and cached on disk (cache=True);
+#   warmup() compiles / loads them up front so startup and compute are timed apart
 # - Measures elapsed time with time.perf_counter()
 
 import sys
@@ -30,13 +33,20 @@ def build_byte_mapping(data: bytes):
 #   link: int32 array length max_states
 #   length: int32 array length max_states
 #   size_last: int32 array length 2 -> [size, last_state] (mutable container)
+#
+# Every kernel takes an optional int64 `counters` array (lz_profile.py):
+# with the default None, Numba compiles a version where all the
+# `if counters is not None` blocks are removed, so they cost nothing.
 # ---------------------------
+STATES, CLONES, LINK_STEPS, COPIED, MATCH_STEPS = range(5)
+COUNTERS = ("states", "clones", "link_steps", "transitions_copied", "match_steps")
 
-@njit
-def sa_extend(ch, next_arr, link, length, size_last):
+@njit(cache=True)
+def sa_extend(ch, next_arr, link, length, size_last, counters=None):
     """
     Extend suffix automaton with character index `ch`.
     Mutates next_arr, link, length and size_last in-place.
+    counters: None, or int64 array receiving the COUNTERS
     """
     size = size_last[0]
     last = size_last[1]
@@ -44,12 +54,16 @@ def sa_extend(ch, next_arr, link, length, size_last):
     cur = size
     size += 1
     length[cur] = length[last] + 1
+    if counters is not None:
+        counters[STATES] += 1
 
     p = last
     # add transition p --ch--> cur for all p that don't have it
     while p != -1 and next_arr[p, ch] == -1:
         next_arr[p, ch] = cur
         p = link[p]
+        if counters is not None:
+            counters[LINK_STEPS] += 1
 
     if p == -1:
         link[cur] = 0
@@ -66,11 +80,17 @@ def sa_extend(ch, next_arr, link, length, size_last):
             m = next_arr.shape[1]
             for cc in range(m):
                 next_arr[clone, cc] = next_arr[q, cc]
+            if counters is not None:
+                counters[STATES] += 1
+                counters[CLONES] += 1
+                counters[COPIED] += m
 
             link[clone] = link[q]
             while p != -1 and next_arr[p, ch] == q:
                 next_arr[p, ch] = clone
                 p = link[p]
+                if counters is not None:
+                    counters[LINK_STEPS] += 1
             link[q] = clone
             link[cur] = clone
 
@@ -78,8 +98,8 @@ def sa_extend(ch, next_arr, link, length, size_last):
     size_last[0] = size
     size_last[1] = last
 
-@njit
-def lz_factor_count(arr_mapped, next_arr, link, length, size_last):
+@njit(cache=True)
+def lz_factor_count(arr_mapped, next_arr, link, length, size_last, counters=None):
     """
     Compute number of LZ factors (Lempel-Ziv factorization where a factor
     is the longest prefix that appeared before, plus the next char).
@@ -103,6 +123,8 @@ def lz_factor_count(arr_mapped, next_arr, link, length, size_last):
                 break
             v = nxt
             j += 1
+            if counters is not None:
+                counters[MATCH_STEPS] += 1
 
         if j == n:
             consumed = j - i   # matched to end — consume all matched chars
@@ -115,7 +137,7 @@ def lz_factor_count(arr_mapped, next_arr, link, length, size_last):
         # extend automaton by consumed characters
         k = 0
         while k < consumed and i + k < n:
-            sa_extend(arr_mapped[i + k], next_arr, link, length, size_last)
+            sa_extend(arr_mapped[i + k], next_arr, link, length, size_last, counters)
             k += 1
 
         i += consumed
@@ -123,36 +145,317 @@ def lz_factor_count(arr_mapped, next_arr, link, length, size_last):
 
     return count
 
+# ---------------------------
+# Sparse transition storage (Numba-compatible)
+# Memory depends on the transitions that actually exist, not on 2*N*m.
+#   edges: int32 array shape (edge_cap, 4) -> [src, sym, dst, next_edge_of_src]
+#   table: int32 open-addressing hash (power of two) of edge indices keyed by (src, sym)
+#   head:  int32 array length state_cap -> first edge of each state (-1 = none)
+#   size_last: int64 array length 3 -> [size, last_state, n_edges]
+# ---------------------------
+EDGE_SRC, EDGE_SYM, EDGE_DST, EDGE_NEXT = 0, 1, 2, 3
+SPARSE_INITIAL_STATES = 1 << 12
+
+@njit(inline="always")
+def _edge_slot(state, ch, mask):
+    key = np.uint64(state) * np.uint64(256) + np.uint64(ch)
+    return np.int64(((key * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(32)) & np.uint64(mask))
+
+@njit(inline="always")
+def find_edge(edges, table, state, ch):
+    """
+    Index of the edge (state --ch--> ?) or -1 if the transition does not exist.
+    """
+    mask = table.shape[0] - 1
+    slot = _edge_slot(state, ch, mask)
+    while True:
+        e = table[slot]
+        if e == -1:
+            return -1
+        if edges[e, EDGE_SRC] == state and edges[e, EDGE_SYM] == ch:
+            return e
+        slot = (slot + 1) & mask
+
+@njit(cache=True)
+def _rehash(edges, n_edges, table_size):
+    table = np.full(table_size, -1, dtype=np.int32)
+    mask = table_size - 1
+    for e in range(n_edges):
+        slot = _edge_slot(edges[e, EDGE_SRC], edges[e, EDGE_SYM], mask)
+        while table[slot] != -1:
+            slot = (slot + 1) & mask
+        table[slot] = e
+    return table
+
+@njit(inline="always")
+def add_edge(state, ch, dst, edges, table, head, size_last):
+    """
+    Insert transition state --ch--> dst (must not exist yet).
+    Grows the edge array / hash table when needed and returns them.
+    """
+    n_edges = size_last[2]
+    if n_edges == edges.shape[0]:
+        grown = np.empty((2 * edges.shape[0], 4), dtype=np.int32)
+        grown[:n_edges] = edges[:n_edges]
+        edges = grown
+    if 2 * (n_edges + 1) > table.shape[0]:
+        table = _rehash(edges, n_edges, 2 * table.shape[0])
+
+    edges[n_edges, EDGE_SRC] = state
+    edges[n_edges, EDGE_SYM] = ch
+    edges[n_edges, EDGE_DST] = dst
+    edges[n_edges, EDGE_NEXT] = head[state]
+    head[state] = n_edges
+
+    mask = table.shape[0] - 1
+    slot = _edge_slot(state, ch, mask)
+    while table[slot] != -1:
+        slot = (slot + 1) & mask
+    table[slot] = n_edges
+    size_last[2] = n_edges + 1
+    return edges, table
+
+@njit(inline="always")
+def sa_extend_sparse(ch, edges, table, head, link, length, size_last, counters=None):
+    """
+    Same construction as sa_extend() on the sparse edge store.
+    Clones copy only the edges q really has. Caller guarantees room for 2 new states.
+    Returns (edges, table), which may have been reallocated.
+    """
+    size = size_last[0]
+    last = size_last[1]
+
+    cur = size
+    size += 1
+    length[cur] = length[last] + 1
+    head[cur] = -1
+    if counters is not None:
+        counters[STATES] += 1
+
+    p = last
+    e = find_edge(edges, table, p, ch)
+    while p != -1 and e == -1:
+        edges, table = add_edge(p, ch, cur, edges, table, head, size_last)
+        p = link[p]
+        if counters is not None:
+            counters[LINK_STEPS] += 1
+        if p != -1:
+            e = find_edge(edges, table, p, ch)
+
+    if p == -1:
+        link[cur] = 0
+    else:
+        q = edges[e, EDGE_DST]
+        if length[p] + 1 == length[q]:
+            link[cur] = q
+        else:
+            clone = size
+            size += 1
+            length[clone] = length[p] + 1
+            head[clone] = -1
+            if counters is not None:
+                counters[STATES] += 1
+                counters[CLONES] += 1
+            # copy only the real transitions of q
+            eq = head[q]
+            while eq != -1:
+                edges, table = add_edge(clone, edges[eq, EDGE_SYM], edges[eq, EDGE_DST],
+                                        edges, table, head, size_last)
+                eq = edges[eq, EDGE_NEXT]
+                if counters is not None:
+                    counters[COPIED] += 1
+
+            link[clone] = link[q]
+            while p != -1:
+                e = find_edge(edges, table, p, ch)
+                if e == -1 or edges[e, EDGE_DST] != q:
+                    break
+                edges[e, EDGE_DST] = clone
+                p = link[p]
+                if counters is not None:
+                    counters[LINK_STEPS] += 1
+            link[q] = clone
+            link[cur] = clone
+
+    size_last[0] = size
+    size_last[1] = cur
+    return edges, table
+
+@njit(cache=True)
+def _grow_states(arr, new_cap, fill):
+    grown = np.full(new_cap, fill, dtype=arr.dtype)
+    grown[:arr.shape[0]] = arr
+    return grown
+
+@njit(inline="always")
+def sa_extend_grow(ch, edges, table, head, link, length, size_last, memory_limit_bytes,
+                   counters=None):
+    """
+    sa_extend_sparse() that also doubles the state arrays when they are full.
+    Returns (ok, edges, table, head, link, length); ok is False once the
+    structures are larger than memory_limit_bytes.
+    """
+    if size_last[0] + 2 > link.shape[0]:
+        new_cap = 2 * link.shape[0]
+        if (edges.size + table.size + 3 * new_cap) * 4 > memory_limit_bytes:
+            return False, edges, table, head, link, length
+        link = _grow_states(link, new_cap, -1)
+        length = _grow_states(length, new_cap, 0)
+        head = _grow_states(head, new_cap, -1)
+    edges, table = sa_extend_sparse(ch, edges, table, head, link, length, size_last, counters)
+    ok = (edges.size + table.size + 3 * link.shape[0]) * 4 <= memory_limit_bytes
+    return ok, edges, table, head, link, length
+
+@njit(cache=True)
+def sa_extend_run(arr, lo, hi, edges, table, head, link, length, size_last, memory_limit_bytes):
+    """
+    Extend the sparse automaton with arr[lo:hi] (no factorization).
+    Returns (ok, edges, table, head, link, length).
+    """
+    ok = True
+    for k in range(lo, hi):
+        ok, edges, table, head, link, length = sa_extend_grow(
+            arr[k], edges, table, head, link, length, size_last, memory_limit_bytes)
+        if not ok:
+            break
+    return ok, edges, table, head, link, length
+
+@njit(cache=True)
+def lz_factor_run(arr, i, n, final, max_indexed, edges, table, head, link, length, size_last,
+                  memory_limit_bytes, curve, step, counters=None):
+    """
+    Factorize arr[i:n] on the sparse automaton, which must already index the
+    text that precedes arr[i]. Stops before a factor that
+      - runs into n while final is False (more input could extend it), or
+      - would start once the automaton indexes max_indexed symbols.
+    curve: if non-empty, curve[k] receives the number of factors of arr[:(k+1)*step]
+           (only meaningful for a single run starting at i = 0)
+    Returns (status, i, count, edges, table, head, link, length) with status
+    0 (done / needs more input), 1 (dictionary full), -1 (memory limit hit).
+    """
+    count = 0
+    sample = i // step
+
+    while i < n:
+        if length[size_last[1]] >= max_indexed:
+            return 1, i, count, edges, table, head, link, length
+
+        v = 0
+        j = i
+        while j < n:
+            e = find_edge(edges, table, v, arr[j])
+            if e == -1:
+                break
+            v = edges[e, EDGE_DST]
+            j += 1
+            if counters is not None:
+                counters[MATCH_STEPS] += 1
+
+        if j == n:
+            if not final:
+                return 0, i, count, edges, table, head, link, length
+            consumed = j - i
+            if consumed == 0:
+                consumed = 1
+        else:
+            consumed = (j - i) + 1
+
+        k = 0
+        while k < consumed and i + k < n:
+            ok, edges, table, head, link, length = sa_extend_grow(
+                arr[i + k], edges, table, head, link, length, size_last, memory_limit_bytes, counters)
+            if not ok:
+                return -1, i, count, edges, table, head, link, length
+            k += 1
+
+        i += consumed
+        count += 1
+        # every prefix ending inside this factor has exactly `count` factors
+        while sample < curve.shape[0] and (sample + 1) * step <= i:
+            curve[sample] = count
+            sample += 1
+
+    return 0, i, count, edges, table, head, link, length
+
+@njit(cache=True)
+def lz_factor_count_sparse(arr_mapped, edges, table, head, link, length, size_last,
+                           memory_limit_bytes, counters=None):
+    """
+    lz_factor_count() on the sparse edge store. State arrays start small and
+    double as states are created. Returns -1 if the structures would grow
+    beyond memory_limit_bytes.
+    """
+    n = arr_mapped.shape[0]
+    status, i, count, edges, table, head, link, length = lz_factor_run(
+        arr_mapped, 0, n, True, n + 1, edges, table, head, link, length, size_last,
+        memory_limit_bytes, np.zeros(0, dtype=np.int64), 1, counters)
+    if status < 0:
+        return -1
+    return count
+
 # ---------------------------
 # Main wrapper: prepare arrays, check memory, call njit routines
 # ---------------------------
-def compute_lz_complexity_bytes(raw: bytes, memory_limit_bytes=1_000_000_000):
+def compute_lz_complexity_bytes(raw: bytes, memory_limit_bytes=1_000_000_000, transitions="auto",
+                                cache=None, timings=None, counters=None):
     """
     raw: input bytes
-    memory_limit_bytes: threshold to avoid allocating huge (next_arr) tables
+    memory_limit_bytes: threshold to avoid allocating huge transition tables
+    transitions: "dense" (2*N*m table), "sparse" (hashed edge store) or "auto"
+                 (dense while it fits in memory_limit_bytes, it is the faster one)
+    cache: lz_cache.ResultCache to consult, False for none
+           (default: the one enabled by LEMPEL_ZIV_CACHE, see lz_cache.py)
+    timings: dict that receives the seconds of every phase (build_byte_mapping,
+             allocation, lz_factor_count), or None (see lz_profile.py)
+    counters: int64 array of len(COUNTERS) the kernels add their counters to, or None
+    (the cache is not consulted when timings or counters are asked for: they
+    describe a computation)
     Returns: (complexity_count, elapsed_seconds)
     """
     n = len(raw)
     if n == 0:
         return 0, 0.0
 
+    if cache is not False and timings is None and counters is None:
+        import lz_cache
+        store = lz_cache.resolve(cache)
+        if store is not None:
+            # dense and sparse give the same count: one entry for both, shared
+            # with lz_engines' v4-dense / v4-sparse (lz_cache.SHARED_ENGINES)
+            t0 = time.perf_counter()
+            count = store.memoize(raw, "v4", lambda: compute_lz_complexity_bytes(
+                raw, memory_limit_bytes, transitions, cache=False)[0], {"measure": "automaton"})
+            return int(count), time.perf_counter() - t0
+
+    t0 = time.perf_counter()
     map256, m = build_byte_mapping(raw)
     # map raw bytes to dense alphabet
     arr = np.frombuffer(raw, dtype=np.uint8)
     arr_mapped = map256[arr]  # int32 vector
+    if timings is not None:
+        timings["build_byte_mapping"] = time.perf_counter() - t0
 
     # estimate memory for next_arr: 2*n * m * 4 bytes (int32)
     max_states = 2 * n
     est_bytes = max_states * m * 4
+    if transitions == "auto":
+        transitions = "dense" if est_bytes <= memory_limit_bytes else "sparse"
+
+    if transitions == "sparse":
+        return _compute_sparse(arr_mapped, memory_limit_bytes, timings, counters)
+    if transitions != "dense":
+        raise ValueError(f"unknown transitions mode {transitions!r} (use 'dense', 'sparse' or 'auto')")
+
     if est_bytes > memory_limit_bytes:
         # Memory would be too large; informative error to user.
         raise MemoryError(
             f"Estimated memory for transition table is {est_bytes/1e9:.3f} GB "
-            f"(2*N*m*4). Reduce input size or increase memory_limit_bytes "
-            f"(current {memory_limit_bytes/1e9:.3f} GB)."
+            f"(2*N*m*4). Reduce input size, increase memory_limit_bytes "
+            f"(current {memory_limit_bytes/1e9:.3f} GB) or use transitions='sparse'."
         )
 
     # allocate arrays
+    t0 = time.perf_counter()
     next_arr = np.full((max_states, m), -1, dtype=np.int32)
     link = np.full(max_states, -1, dtype=np.int32)
     length = np.zeros(max_states, dtype=np.int32)
@@ -162,20 +465,207 @@ def compute_lz_complexity_bytes(raw: bytes, memory_limit_bytes=1_000_000_000):
     size_last[1] = 0
     link[0] = -1
     length[0] = 0
+    if timings is not None:
+        timings["allocation"] = time.perf_counter() - t0
 
     # time and compute
     t0 = time.perf_counter()
-    count = lz_factor_count(arr_mapped, next_arr, link, length, size_last)
+    count = lz_factor_count(arr_mapped, next_arr, link, length, size_last, counters)
+    t1 = time.perf_counter()
+    if timings is not None:
+        timings["lz_factor_count"] = t1 - t0
+    return int(count), float(t1 - t0)
+
+def new_sparse_automaton(n_states=SPARSE_INITIAL_STATES):
+    """
+    Empty sparse automaton (root state only): (edges, table, head, link, length, size_last).
+    """
+    edges = np.empty((n_states, 4), dtype=np.int32)
+    table = np.full(2 * n_states, -1, dtype=np.int32)
+    head = np.full(n_states, -1, dtype=np.int32)
+    link = np.full(n_states, -1, dtype=np.int32)
+    length = np.zeros(n_states, dtype=np.int32)
+    # size_last: [size, last, n_edges]
+    size_last = np.zeros(3, dtype=np.int64)
+    size_last[0] = 1  # one initial state (0)
+    return edges, table, head, link, length, size_last
+
+def _compute_sparse(arr_mapped, memory_limit_bytes, timings=None, counters=None):
+    t0 = time.perf_counter()
+    edges, table, head, link, length, size_last = new_sparse_automaton()
+    if timings is not None:
+        timings["allocation"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    count = lz_factor_count_sparse(arr_mapped, edges, table, head, link, length, size_last,
+                                   memory_limit_bytes, counters)
     t1 = time.perf_counter()
+    if timings is not None:
+        timings["lz_factor_count_sparse"] = t1 - t0
+    if count < 0:
+        raise MemoryError(
+            f"Sparse transition store exceeded memory_limit_bytes "
+            f"({memory_limit_bytes/1e9:.3f} GB) after {int(size_last[0])} states and "
+            f"{int(size_last[2])} transitions. Reduce input size or increase the limit."
+        )
     return int(count), float(t1 - t0)
 
+# ---------------------------
+# Prefix-complexity curve: one left-to-right pass
+# A prefix raw[:t] is factorized exactly like raw up to the factor containing
+# position t-1 (which is cut at t), so its complexity is the number of factors
+# that start before t.
+# This is the "automaton" measure of this file (a factor is matched only inside
+# the consumed prefix), not LZ76: for the LZ76 curve of complexityLempelZiv see
+# lz76_prefix_complexity() in lempel-ziv-v6.py.
+# ---------------------------
+def lz_prefix_complexity(raw: bytes, step=1, memory_limit_bytes=1_000_000_000):
+    """
+    raw: input bytes
+    step: sample every step-th prefix
+    Returns: int64 array c with c[k] = complexity of raw[:(k+1)*step],
+             i.e. what compute_lz_complexity_bytes() gives on that prefix
+             (automaton measure, not LZ76)
+    """
+    if step < 1:
+        raise ValueError("step must be >= 1")
+    n = len(raw)
+    curve = np.zeros(n // step, dtype=np.int64)
+    if n == 0:
+        return curve
+
+    map256, m = build_byte_mapping(raw)
+    arr_mapped = map256[np.frombuffer(raw, dtype=np.uint8)]
+
+    edges, table, head, link, length, size_last = new_sparse_automaton()
+    status, i, count, edges, table, head, link, length = lz_factor_run(
+        arr_mapped, 0, n, True, n + 1, edges, table, head, link, length, size_last,
+        memory_limit_bytes, curve, step)
+    if status < 0:
+        raise MemoryError(
+            f"Sparse transition store exceeded memory_limit_bytes "
+            f"({memory_limit_bytes/1e9:.3f} GB). Reduce input size or increase the limit."
+        )
+    return curve
+
+# ---------------------------
+# Streaming wrapper: bounded memory, LZ77-style sliding dictionary
+# ---------------------------
+STREAM_CHUNK_BYTES = 1 << 20
+
+def iter_chunks(source, chunk_bytes=STREAM_CHUNK_BYTES):
+    """
+    source: binary file object (read in chunk_bytes pieces) or iterable of bytes chunks
+    """
+    if hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_bytes)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        for chunk in source:
+            if chunk:
+                yield chunk
+
+def compute_lz_complexity_stream(source, window_bytes=2_000_000,
+                                 memory_limit_bytes=1_000_000_000,
+                                 chunk_bytes=STREAM_CHUNK_BYTES):
+    """
+    Same factorization as compute_lz_complexity_bytes(), but the input is read
+    incrementally and the dictionary is a sliding window: once the automaton
+    indexes 2*window_bytes symbols it is rebuilt from the last window_bytes
+    consumed bytes. Memory stays bounded by the window, not by the input size.
+
+    source: binary file object or iterable of bytes chunks
+    window_bytes: the dictionary always covers at least the last window_bytes bytes
+    memory_limit_bytes: cap for the automaton structures (MemoryError above it)
+    Returns: (complexity_count, elapsed_seconds, exact)
+        exact is True when no byte was ever dropped from the dictionary, i.e. the
+        count equals compute_lz_complexity_bytes(). When False the count is the
+        windowed one: factors whose only earlier occurrence lies outside the
+        window are cut shorter, so it can be larger than unbounded LZ76.
+    """
+    if window_bytes < 1:
+        raise ValueError("window_bytes must be >= 1")
+
+    edges, table, head, link, length, size_last = new_sparse_automaton()
+    # buf[:pos] is consumed text (only its last window_bytes are kept), buf[pos:fill] is pending
+    buf = np.empty(3 * window_bytes + chunk_bytes + 1, dtype=np.uint8)
+    pos = 0
+    fill = 0
+    count = 0
+    exact = True
+
+    t0 = time.perf_counter()
+    chunks = iter_chunks(source, chunk_bytes)
+    final = False
+    while not final:
+        chunk = next(chunks, None)
+        if chunk is None:
+            final = True
+        else:
+            data = np.frombuffer(chunk, dtype=np.uint8)
+            if fill + data.shape[0] > buf.shape[0]:
+                # drop consumed bytes that no longer belong to the window
+                keep = max(0, pos - window_bytes)
+                buf[:fill - keep] = buf[keep:fill]
+                pos -= keep
+                fill -= keep
+                if fill + data.shape[0] > buf.shape[0]:
+                    grown = np.empty(2 * (fill + data.shape[0]), dtype=np.uint8)
+                    grown[:fill] = buf[:fill]
+                    buf = grown
+            buf[fill:fill + data.shape[0]] = data
+            fill += data.shape[0]
+
+        while True:
+            status, pos, c, edges, table, head, link, length = lz_factor_run(
+                buf, pos, fill, final, 2 * window_bytes, edges, table, head, link, length,
+                size_last, memory_limit_bytes, np.zeros(0, dtype=np.int64), 1)
+            count += c
+            if status == 0:
+                break
+            if status == 1:
+                # dictionary full: restart it from the last window_bytes consumed bytes
+                exact = False
+                edges, table, head, link, length, size_last = new_sparse_automaton()
+                ok, edges, table, head, link, length = sa_extend_run(
+                    buf, pos - window_bytes, pos, edges, table, head, link, length,
+                    size_last, memory_limit_bytes)
+                if ok:
+                    continue
+            raise MemoryError(
+                f"Automaton for a {window_bytes} byte window exceeded memory_limit_bytes "
+                f"({memory_limit_bytes/1e9:.3f} GB). Reduce window_bytes or increase the limit."
+            )
+
+    t1 = time.perf_counter()
+    return int(count), float(t1 - t0), exact
+
+# ---------------------------
+# Warm-up: compile the kernels for the array types the wrappers above pass
+# (int32 mapped symbols, uint8 stream buffer), or load them from the cache
+# ---------------------------
+def warmup():
+    """
+    Returns: seconds spent compiling / loading the njit kernels
+    """
+    t0 = time.perf_counter()
+    compute_lz_complexity_bytes(b"abcab", transitions="dense")
+    compute_lz_complexity_bytes(b"abcab", transitions="sparse")
+    lz_prefix_complexity(b"abcab")
+    compute_lz_complexity_stream([b"abcab"], window_bytes=1)
+    return time.perf_counter() - t0
+
 # ---------------------------
 # CLI / demo
 # ---------------------------
 def read_input_bytes():
     print("Menù:\n")
     print("[F] Read from file")
-    print("[K] Read from keyboard (string)\n")
+    print("[K] Read from keyboard (string)")
+    print("[S] Stream a file (bounded memory, sliding window)\n")
     x = input("> ").strip().upper()
     if x == "F":
         fn = input("File name: ").strip()
@@ -185,13 +675,42 @@ def read_input_bytes():
         except FileNotFoundError:
             print(f"File {fn} not found.")
             sys.exit(1)
+    elif x == "S":
+        fn = input("File name: ").strip()
+        try:
+            return open(fn, "rb")
+        except FileNotFoundError:
+            print(f"File {fn} not found.")
+            sys.exit(1)
     else:
         s = input("give me a string: ")
         return s.encode("utf-8")
 
 
+def main_stream(f):
+    window = input("Window size in bytes [2000000]: ").strip()
+    window = int(window) if window else 2_000_000
+
+    try:
+        with f:
+            c, elapsed, exact = compute_lz_complexity_stream(f, window_bytes=window)
+    except MemoryError as e:
+        print("MemoryError:", e)
+        sys.exit(1)
+
+    print(f"\nLempel-Ziv complexity (number of factors) = {c}")
+    if not exact:
+        print(f"NOTE: input longer than the window, this is the windowed count "
+              f"({window} byte dictionary) and may differ from unbounded LZ76.")
+    print(f"Elapsed time = {elapsed:.6f} seconds\n")
+
+
 def main():
     raw = read_input_bytes()
+    print(f"Startup (JIT compile / cache load) = {warmup():.6f} seconds")
+    if hasattr(raw, "read"):
+        main_stream(raw)
+        return
     print(f"Input length = {len(raw)} bytes")
 
     try:
@@ -209,4 +728,7 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    # run through the stable module name: Numba's on-disk cache must not
+    # see these kernels as part of "__main__" (see lz_scripts.py)
+    from lz_scripts import load_script
+    load_script(__file__).main()
@@ -0,0 +1,272 @@
+#
+# lempel-ziv-v6.py : Linear-time Lempel-Ziv Complexity (LZ76) using SA-IS Suffix Array + LCP
+#                    Complexity: O(N)  --> same value as complexityLempelZiv (lempel-ziv-v2.py)
+#
+# The pipeline of lempel-ziv-v3.py (Kasai LCP, longest previous factor, factor
+# count) on a suffix array built by induced sorting (SA-IS, Nong-Zhang-Chan)
+# instead of prefix doubling: every step is linear in the length of the input.
+#
+
+import sys, time
+import numpy as np
+from numba import njit
+
+from lz_scripts import load_script
+
+v3 = load_script("lempel-ziv-v3.py")
+
+MAX_LENGTH = 2**31 - 2          # int32 indices
+
+
+# -----------------------------------------------------------
+#   SUFFIX ARRAY (SA-IS, induced sorting)
+# -----------------------------------------------------------
+@njit(cache=True, nogil=True)
+def classify(s, upper):
+    """
+    S/L type of every suffix (True = S), bucket starts of the L (sum_l) and
+    S (sum_s) suffixes of every symbol, and the LMS positions.
+    """
+    n = s.shape[0]
+    ls = np.zeros(n, dtype=np.bool_)
+    for i in range(n - 2, -1, -1):
+        if s[i] == s[i + 1]:
+            ls[i] = ls[i + 1]
+        else:
+            ls[i] = s[i] < s[i + 1]
+
+    sum_l = np.zeros(upper + 2, dtype=np.int64)
+    sum_s = np.zeros(upper + 2, dtype=np.int64)
+    for i in range(n):
+        if not ls[i]:
+            sum_s[s[i]] += 1
+        else:
+            sum_l[s[i] + 1] += 1
+    for c in range(upper + 1):
+        sum_s[c] += sum_l[c]
+        sum_l[c + 1] += sum_s[c]
+
+    lms_map = np.full(n + 1, -1, dtype=np.int32)
+    m = 0
+    for i in range(1, n):
+        if not ls[i - 1] and ls[i]:
+            lms_map[i] = m
+            m += 1
+    lms = np.empty(m, dtype=np.int32)
+    for i in range(1, n):
+        if lms_map[i] >= 0:
+            lms[lms_map[i]] = i
+    return ls, sum_l, sum_s, lms_map, lms
+
+
+@njit(cache=True, nogil=True)
+def induce(s, ls, sum_l, sum_s, lms, sa):
+    """
+    Place the LMS suffixes in the given order at the ends of their buckets,
+    then induce the L suffixes (left to right) and the S suffixes (right to left).
+    """
+    n = s.shape[0]
+    sa[:] = -1
+    buf = sum_s.copy()
+    for d in lms:
+        sa[buf[s[d]]] = d
+        buf[s[d]] += 1
+
+    buf[:] = sum_l
+    sa[buf[s[n - 1]]] = n - 1
+    buf[s[n - 1]] += 1
+    for i in range(n):
+        v = sa[i]
+        if v >= 1 and not ls[v - 1]:
+            sa[buf[s[v - 1]]] = v - 1
+            buf[s[v - 1]] += 1
+
+    buf[:] = sum_l
+    for i in range(n - 1, -1, -1):
+        v = sa[i]
+        if v >= 1 and ls[v - 1]:
+            buf[s[v - 1] + 1] -= 1
+            sa[buf[s[v - 1] + 1]] = v - 1
+
+
+@njit(cache=True, nogil=True)
+def name_lms(s, sa, lms, lms_map):
+    """
+    Name the LMS substrings in sorted order (equal substrings, equal names).
+    Returns (names in text order, largest name).
+    """
+    n = s.shape[0]
+    m = lms.shape[0]
+    sorted_lms = np.empty(m, dtype=np.int32)
+    k = 0
+    for i in range(n):
+        if lms_map[sa[i]] >= 0:
+            sorted_lms[k] = sa[i]
+            k += 1
+
+    names = np.empty(m, dtype=np.int32)
+    upper = 0
+    names[lms_map[sorted_lms[0]]] = 0
+    for i in range(1, m):
+        l = sorted_lms[i - 1]
+        r = sorted_lms[i]
+        end_l = lms[lms_map[l] + 1] if lms_map[l] + 1 < m else n
+        end_r = lms[lms_map[r] + 1] if lms_map[r] + 1 < m else n
+        same = end_l - l == end_r - r
+        if same:
+            while l < end_l and s[l] == s[r]:
+                l += 1
+                r += 1
+            if l == n or r == n or s[l] != s[r]:
+                same = False
+        if not same:
+            upper += 1
+        names[lms_map[sorted_lms[i]]] = upper
+    return names, upper
+
+
+def sa_is(s, upper):
+    """
+    Suffix array (int32) of s, symbols in 0..upper. One level per call: the
+    reduced string of the LMS names is sorted recursively only when some names repeat.
+    """
+    n = s.shape[0]
+    if n <= 1:
+        return np.zeros(n, dtype=np.int32)
+
+    ls, sum_l, sum_s, lms_map, lms = classify(s, upper)
+    sa = np.empty(n, dtype=np.int32)
+    induce(s, ls, sum_l, sum_s, lms, sa)
+    m = lms.shape[0]
+    if m:
+        names, rec_upper = name_lms(s, sa, lms, lms_map)
+        del lms_map
+        if rec_upper + 1 < m:
+            rec_sa = sa_is(names, rec_upper)
+        else:
+            # all names distinct: the names are already the ranks
+            rec_sa = np.empty(m, dtype=np.int32)
+            rec_sa[names] = np.arange(m, dtype=np.int32)
+        induce(s, ls, sum_l, sum_s, lms[rec_sa], sa)
+    return sa
+
+
+def dense_symbols(s):
+    """
+    Symbols -> (array with values 0..upper, upper). uint8 input is used as it is.
+    """
+    s = np.asarray(s)
+    if s.dtype == np.uint8:
+        return s, 255
+    symbols, inverse = np.unique(s, return_inverse=True)
+    return inverse.astype(np.int32).ravel(), max(symbols.shape[0] - 1, 0)
+
+
+def build_suffix_array(s):
+    """
+    Suffix array of s in O(N) (SA-IS).
+    """
+    dense, upper = dense_symbols(s)
+    if dense.shape[0] > MAX_LENGTH:
+        raise ValueError(f"input longer than {MAX_LENGTH} symbols")
+    return sa_is(dense, upper)
+
+
+# -----------------------------------------------------------
+#   LZ76 COMPLEXITY USING SUFFIX ARRAY + LCP
+# -----------------------------------------------------------
+def lz76_complexity(s):
+    """
+    Compute Lempel-Ziv complexity using the LZ76 factorization
+    (same value as complexityLempelZiv in lempel-ziv-v2.py, 0 for an empty input
+    like lz_engines.lz_complexity).
+    Complexity: O(N)
+    """
+    s = np.asarray(s)
+    if len(s) == 0:
+        return 0
+
+    sa = build_suffix_array(s)
+    lcp = v3.build_lcp_array(s, sa)
+    lpf = v3.longest_previous_factor(sa, lcp)
+    return int(v3.count_factors(lpf))
+
+
+def lz76_prefix_complexity(s, step=1):
+    """
+    LZ76 complexity of every step-th prefix in one pass, O(N).
+    A prefix s[:t] has the components of s up to the one containing t-1 (cut at t),
+    so its complexity is the number of components that start before t.
+    Returns: int64 array c with c[k] = lz76_complexity(s[:(k+1)*step])
+    """
+    if step < 1:
+        raise ValueError("step must be >= 1")
+    s = np.asarray(s)
+    n = len(s)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    sa = build_suffix_array(s)
+    lcp = v3.build_lcp_array(s, sa)
+    starts = v3.factor_starts(v3.longest_previous_factor(sa, lcp))
+    return np.searchsorted(starts, np.arange(step, n + 1, step)).astype(np.int64)
+
+
+def warmup():
+    """
+    Compile (or load from the on-disk cache) the kernels for read-only uint8
+    (np.frombuffer), writable uint8 and int32 inputs. Returns the seconds spent.
+    """
+    t0 = time.perf_counter()
+    for arr in (np.frombuffer(b"mmiissiissiippii", dtype=np.uint8), np.zeros(5, dtype=np.uint8),
+                np.zeros(5, dtype=np.int32)):
+        lz76_complexity(arr)
+        lz76_prefix_complexity(arr)
+    return time.perf_counter() - t0
+
+
+# -----------------------------------------------------------
+#   INPUT HANDLING
+# -----------------------------------------------------------
+def read_string():
+
+    print('\n\nlempel-ziv-v6.py : Linear-time Lempel-Ziv Complexity (LZ76) using SA-IS Suffix Array + LCP')
+    print('                        Complexity: O(N)  --> same value as complexityLempelZiv\n')
+    print("Menù:\n")
+    print("Read from [F]ile\n")
+    print("Read from [K]eyboard\n")
+    x = input("> ").strip()
+
+    if x.upper() == "F":
+        file_name = input("What file: ").strip()
+        try:
+            with open(file_name, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            print(f"File {file_name} not found.")
+            sys.exit(1)
+    else:
+        return input("give me a string: ").encode("utf-8")
+
+
+def main():
+    raw = read_string()
+    arr = np.frombuffer(raw, dtype=np.uint8)
+
+    print("\nComputing LZ complexity (linear O(N) version)...\n")
+    startup = warmup()
+
+    t0 = time.perf_counter()
+    c = lz76_complexity(arr)
+    elapsed = time.perf_counter() - t0
+
+    print(f"Lempel-Ziv complexity index = {c}")
+    print(f"\nStartup time (JIT compile / cache load): {startup:.6f} seconds")
+    print(f"Elapsed time: {elapsed:.6f} seconds\n")
+
+
+if __name__ == "__main__":
+    # run through the stable module name: Numba's on-disk cache must not
+    # see these kernels as part of "__main__" (see lz_scripts.py)
+    from lz_scripts import load_script
+    load_script(__file__).main()
@@ -0,0 +1,221 @@
+#
+# lempel-ziv.py : non-interactive Lempel-Ziv complexity of many files (lz_engines)
+#
+# use:   python lempel-ziv.py [INPUT ...] [--engine auto] [--measure lz76] [--processes N]
+#                             [--format jsonl|csv] [-o results.jsonl] [--files-from LIST]
+#
+# INPUT is a file, a directory (every file below it), a glob pattern ("data/**/*.txt",
+# for shells that do not expand it) or "-" for the bytes of stdin. --files-from reads
+# the paths one per line from a file ("-" = stdin), while they arrive.
+#
+# One record per input is written as soon as it is ready (JSON Lines or CSV):
+#   path, engine, measure, n, complexity, read_s, compute_s, error
+# read_s / compute_s exclude the Numba compilation (or cache load) of the engine,
+# which each worker does once, before its first input.
+# With --processes the inputs are spread over a pool of worker processes, and the
+# records come out in completion order (--ordered: in input order).
+#
+
+import os, sys, csv, json, glob, time, argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+FIELDS = ("path", "engine", "measure", "n", "complexity", "read_s", "compute_s", "error")
+STDIN = "-"
+
+
+# -----------------------------------------------------------
+#   INPUTS
+# -----------------------------------------------------------
+def _walk(directory):
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            yield os.path.join(root, name)
+
+
+def expand_inputs(inputs, files_from=None):
+    """
+    Paths (or STDIN) to score, lazily: files, directories, glob patterns,
+    then the lines of files_from. A missing path is yielded as it is (its record
+    reports the error).
+    """
+    for item in inputs:
+        if item == STDIN or os.path.isfile(item):
+            yield item
+        elif os.path.isdir(item):
+            yield from _walk(item)
+        elif glob.has_magic(item):
+            for path in sorted(glob.glob(item, recursive=True)):
+                if os.path.isdir(path):
+                    yield from _walk(path)
+                else:
+                    yield path
+        else:
+            yield item
+    if files_from is not None:
+        f = sys.stdin if files_from == STDIN else open(files_from)
+        try:
+            for line in f:
+                path = line.rstrip("\r\n")
+                if path:
+                    yield path
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+# -----------------------------------------------------------
+#   WORKER
+# -----------------------------------------------------------
+# engines already compiled / loaded in this process (warmup() is keyed by script)
+_warm = set()
+
+
+def _score(path, engine, measure, data=None, read_s=0.0):
+    """
+    One record for path (data: the bytes already read in read_s seconds, for stdin).
+    """
+    import lz_engines
+
+    record = dict.fromkeys(FIELDS)
+    record.update(path=path, measure=measure)
+    try:
+        t0 = time.perf_counter()
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        record["read_s"] = read_s + time.perf_counter() - t0
+        record["n"] = len(data)
+
+        name = engine
+        if engine == "auto" and data:
+            arr = lz_engines.as_symbols(data)
+            name, _ = lz_engines.select_engine(arr.shape[0], lz_engines.alphabet_size(arr), measure)
+        if name in lz_engines.ENGINES:
+            record["measure"] = lz_engines.ENGINES[name].measure
+            if name not in _warm:
+                lz_engines.warmup([name])
+                _warm.add(name)
+        record["engine"] = name
+
+        t0 = time.perf_counter()
+        record["complexity"] = int(lz_engines.lz_complexity(data, name, measure))
+        record["compute_s"] = time.perf_counter() - t0
+    except Exception as exc:
+        # one bad input must not stop the batch: the error goes in its record
+        record["error"] = f"{type(exc).__name__}: {exc}"
+    return record
+
+
+def _init_worker():
+    sys.path.insert(0, HERE)
+
+
+# -----------------------------------------------------------
+#   OUTPUT
+# -----------------------------------------------------------
+class RecordWriter:
+    """
+    JSON Lines or CSV records on a text stream, flushed one by one.
+    """
+
+    def __init__(self, stream, fmt="jsonl"):
+        if fmt not in ("jsonl", "csv"):
+            raise ValueError(f"unknown format {fmt!r} (use 'jsonl' or 'csv')")
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == "csv":
+            self.csv = csv.DictWriter(stream, fieldnames=FIELDS, lineterminator="\n")
+            self.csv.writeheader()
+
+    def write(self, record):
+        if self.fmt == "csv":
+            self.csv.writerow(record)
+        else:
+            self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
+
+
+def run(inputs, engine="auto", measure="lz76", processes=1, ordered=False, files_from=None):
+    """
+    Score every input (expand_inputs) and yield its record as soon as it is ready.
+    processes: worker processes (1 = this process, 0 = one per core)
+    """
+    paths = expand_inputs(inputs, files_from)
+    if processes == 1:
+        for path in paths:
+            yield _score(path, engine, measure, *_read_stdin(path))
+        return
+
+    processes = processes or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as pool:
+        # at most 2 inputs per worker in flight: paths may come from a stream
+        pending = []
+        for path in paths:
+            pending.append(pool.submit(_score, path, engine, measure, *_read_stdin(path)))
+            while len(pending) >= 2 * processes:
+                yield from _collect(pending, ordered)
+        while pending:
+            yield from _collect(pending, ordered)
+
+
+def _read_stdin(path):
+    # stdin is read here: worker processes do not share it
+    if path != STDIN:
+        return None, 0.0
+    t0 = time.perf_counter()
+    data = sys.stdin.buffer.read()
+    return data, time.perf_counter() - t0
+
+
+def _collect(pending, ordered):
+    if ordered:
+        yield pending.pop(0).result()
+        return
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in [f for f in pending if f in done]:
+        pending.remove(future)
+        yield future.result()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Lempel-Ziv complexity of files, directories, globs or stdin.")
+    parser.add_argument("inputs", nargs="*", help='files, directories, glob patterns, "-" for stdin')
+    parser.add_argument("--files-from", default=None, help='file with one path per line ("-" = stdin)')
+    parser.add_argument("--engine", default="auto", help="auto or an engine of lz_engines (v2, v6, v4-dense, ...)")
+    parser.add_argument("--measure", default="lz76", help="measure for --engine auto (lz76, automaton, v5, lz78)")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes (0 = one per core)")
+    parser.add_argument("--ordered", action="store_true", help="records in input order")
+    parser.add_argument("--format", default="jsonl", choices=("jsonl", "csv"))
+    parser.add_argument("-o", "--output", default=None, help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+    if not args.inputs and args.files_from is None:
+        parser.error("no inputs (give paths, \"-\" or --files-from)")
+    if args.inputs.count(STDIN) + (args.files_from == STDIN) > 1:
+        parser.error("stdin can be used only once")
+
+    sys.path.insert(0, HERE)
+    import lz_engines
+    if args.engine != "auto" and args.engine not in lz_engines.ENGINES:
+        parser.error(f"unknown engine {args.engine!r} (use 'auto' or one of {sorted(lz_engines.ENGINES)})")
+
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    failed = 0
+    try:
+        writer = RecordWriter(out, args.format)
+        for record in run(args.inputs, args.engine, args.measure, args.processes, args.ordered,
+                          args.files_from):
+            writer.write(record)
+            failed += record["error"] is not None
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if failed:
+        print(f"{failed} input(s) failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
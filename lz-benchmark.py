@@ -0,0 +1,282 @@
+#
+# lz-benchmark.py : reproducible benchmark of the Lempel-Ziv engines
+#
+# use:   python lz-benchmark.py run [-o results.json] [--engines v2,v3] [--sizes 10000,100000]
+#        python lz-benchmark.py compare baseline.json results.json [--threshold 0.10]
+#
+# Every (engine, corpus) pair runs in a fresh Python process, so that
+#   cold time  = imports + Numba compilation / cache load + first call
+#                (also reported split: import, warmup, first call)
+#   warm time  = best of --repeat further calls
+#   peak RSS   = maximum resident set size of that process
+# are measured independently of the other pairs. With --profile every result also
+# carries the lz_profile.py stats of one more call (phase times, sampled memory,
+# kernel counters).
+#
+
+import os, sys, json, time, platform, argparse, subprocess, resource
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+BUNDLED = ("low_complexity.txt", "high_complexity.txt", "storici.txt")
+GENERATED_SIZES = (10_000, 100_000, 1_000_000)
+GENERATED_KINDS = ("const", "rnd")
+
+
+# -----------------------------------------------------------
+#   CORPORA
+# -----------------------------------------------------------
+def corpus_names(sizes=GENERATED_SIZES):
+    names = list(BUNDLED)
+    for kind in GENERATED_KINDS:
+        for size in sizes:
+            names.append(f"gen:{kind}:{size}")
+    return names
+
+
+def load_corpus(name):
+    """
+    Bundled file name, or "gen:const:N" / "gen:rnd:N" produced with
+    generate-string.py (fixed seed, so every run sees the same bytes).
+    """
+    if not name.startswith("gen:"):
+        with open(os.path.join(HERE, name), "rb") as f:
+            return f.read()
+
+    from lz_scripts import load_script
+    gen = load_script("generate-string.py")
+    _, kind, size = name.split(":")
+    size = int(size)
+    if kind == "const":
+        return gen.generate_constant_string("ab", size // 2).encode("utf-8")
+    if kind == "rnd":
+        return gen.generate_random_string(size, seed=0).encode("utf-8")
+    raise ValueError(f"unknown generated corpus {name!r}")
+
+
+# -----------------------------------------------------------
+#   CHILD: one engine on one corpus
+# -----------------------------------------------------------
+def peak_rss_mb():
+    # ru_maxrss is in KB on Linux, in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_child(engine, corpus, repeat, profile=False):
+    t0 = time.perf_counter()
+    import lz_engines
+    import_seconds = time.perf_counter() - t0
+
+    raw = load_corpus(corpus)
+    base_rss = peak_rss_mb()
+
+    warmup_seconds = sum(lz_engines.warmup([engine]).values())
+    t0 = time.perf_counter()
+    count = lz_engines.lz_complexity(raw, engine, cache=False)
+    first_call = time.perf_counter() - t0
+    cold = import_seconds + warmup_seconds + first_call
+
+    warm = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        again = lz_engines.lz_complexity(raw, engine, cache=False)
+        warm.append(time.perf_counter() - t0)
+        if again != count:
+            raise AssertionError(f"{engine} is not deterministic on {corpus}: {count} != {again}")
+
+    best = min(warm) if warm else cold
+    row = {
+        "engine": engine,
+        "measure": lz_engines.ENGINES[engine].measure,
+        "corpus": corpus,
+        "bytes": len(raw),
+        "count": int(count),
+        "cold_seconds": cold,
+        "import_seconds": import_seconds,
+        "warmup_seconds": warmup_seconds,
+        "first_call_seconds": first_call,
+        "warm_seconds": best,
+        "mb_per_second": len(raw) / 1e6 / max(best, 1e-12),
+        "peak_rss_mb": peak_rss_mb(),
+        "base_rss_mb": base_rss,
+    }
+    if profile:
+        import lz_profile
+        _, stats = lz_profile.profile(raw, engine)
+        row["profile"] = stats.to_dict()
+    print(json.dumps(row))
+
+
+# -----------------------------------------------------------
+#   RUN
+# -----------------------------------------------------------
+def run_benchmark(engines, corpora, repeat, budget, timeout, profile=False):
+    sys.path.insert(0, HERE)
+    import numpy as np
+    import lz_engines
+
+    table = lz_engines.load_calibration()
+    results = []
+    for corpus in corpora:
+        raw = load_corpus(corpus)
+        arr = lz_engines.as_symbols(raw)
+        m = lz_engines.alphabet_size(arr)
+        for engine in engines:
+            predicted = lz_engines.predict_seconds(table, engine, len(raw), m)
+            row = {"engine": engine, "measure": lz_engines.ENGINES[engine].measure,
+                   "corpus": corpus, "bytes": len(raw)}
+            if lz_engines.ENGINES[engine].bytes_per_symbol(m) == float("inf"):
+                row["skipped"] = f"alphabet of {m} symbols not supported"
+            elif predicted * (repeat + 1) > budget:
+                row["skipped"] = f"predicted {predicted:.1f} s per call exceeds the budget"
+            else:
+                cmd = [sys.executable, os.path.abspath(__file__), "_child", engine, corpus, str(repeat)]
+                if profile:
+                    cmd.append("--profile")
+                try:
+                    p = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, cwd=HERE)
+                    if p.returncode == 0:
+                        row = json.loads(p.stdout.strip().splitlines()[-1])
+                    else:
+                        row["error"] = (p.stderr.strip().splitlines() or ["failed"])[-1]
+                except subprocess.TimeoutExpired:
+                    row["error"] = f"timeout after {timeout} s"
+            results.append(row)
+            print(format_row(row), flush=True)
+
+    return {
+        "meta": {
+            "host": platform.node(),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "numba": __import__("numba").__version__,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "repeat": repeat,
+            "profile": profile,
+        },
+        "results": results,
+        "mismatches": cross_engine_mismatches(results),
+    }
+
+
+def format_row(row):
+    head = f"{row['engine']:10s} {row['corpus']:22s} {row['bytes']:10d} B"
+    if "skipped" in row:
+        return f"{head}  skipped: {row['skipped']}"
+    if "error" in row:
+        return f"{head}  ERROR: {row['error']}"
+    return (f"{head}  count={row['count']:9d}  cold={row['cold_seconds']:8.3f}s  "
+            f"(warmup={row.get('warmup_seconds', 0.0):7.3f}s)  "
+            f"warm={row['warm_seconds']:8.4f}s  {row['mb_per_second']:8.2f} MB/s  "
+            f"rss={row['peak_rss_mb']:7.1f} MB")
+
+
+def cross_engine_mismatches(results):
+    """
+    Engines of the same measure must agree on every corpus.
+    """
+    by_key = {}
+    for r in results:
+        if "count" in r:
+            by_key.setdefault((r["measure"], r["corpus"]), {})[r["engine"]] = r["count"]
+    return [{"measure": measure, "corpus": corpus, "counts": counts}
+            for (measure, corpus), counts in by_key.items() if len(set(counts.values())) > 1]
+
+
+# -----------------------------------------------------------
+#   COMPARE
+# -----------------------------------------------------------
+def compare(baseline, current, threshold):
+    """
+    Returns a list of problems: warm-time regressions above threshold, results
+    that changed between the runs and cross-engine mismatches in current.
+    """
+    problems = []
+    old = {(r["engine"], r["corpus"]): r for r in baseline["results"] if "count" in r}
+    for r in current["results"]:
+        key = (r["engine"], r["corpus"])
+        if "count" not in r or key not in old:
+            continue
+        o = old[key]
+        if r["count"] != o["count"]:
+            problems.append(f"RESULT  {key[0]} on {key[1]}: {o['count']} -> {r['count']}")
+        ratio = r["warm_seconds"] / max(o["warm_seconds"], 1e-12)
+        if ratio > 1 + threshold:
+            problems.append(f"SLOWER  {key[0]} on {key[1]}: {o['warm_seconds']:.4f}s -> "
+                            f"{r['warm_seconds']:.4f}s ({(ratio - 1) * 100:+.1f}%)")
+        elif ratio < 1 - threshold:
+            print(f"faster  {key[0]} on {key[1]}: {o['warm_seconds']:.4f}s -> "
+                  f"{r['warm_seconds']:.4f}s ({(ratio - 1) * 100:+.1f}%)")
+    for m in cross_engine_mismatches(current["results"]):
+        problems.append(f"MISMATCH {m['measure']} on {m['corpus']}: {m['counts']}")
+    return problems
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark the Lempel-Ziv engines.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    run = sub.add_parser("run", help="benchmark engines on the corpora")
+    run.add_argument("-o", "--output", default="bench_results.json")
+    run.add_argument("--engines", default=None, help="comma separated (default: all)")
+    run.add_argument("--sizes", default=",".join(str(s) for s in GENERATED_SIZES),
+                     help="sizes of the generated corpora")
+    run.add_argument("--corpora", default=None, help="comma separated corpus names (default: all)")
+    run.add_argument("--repeat", type=int, default=3, help="warm runs per pair")
+    run.add_argument("--budget", type=float, default=60.0,
+                     help="skip pairs predicted to need more seconds than this")
+    run.add_argument("--timeout", type=float, default=600.0, help="seconds per pair")
+    run.add_argument("--profile", action="store_true",
+                     help="add phase times, sampled memory and kernel counters (lz_profile.py)")
+
+    cmp_ = sub.add_parser("compare", help="compare two result files")
+    cmp_.add_argument("baseline")
+    cmp_.add_argument("current")
+    cmp_.add_argument("--threshold", type=float, default=0.10, help="relative slowdown to flag")
+
+    child = sub.add_parser("_child")
+    child.add_argument("engine")
+    child.add_argument("corpus")
+    child.add_argument("repeat", type=int)
+    child.add_argument("--profile", action="store_true")
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "_child":
+        sys.path.insert(0, HERE)
+        run_child(args.engine, args.corpus, args.repeat, args.profile)
+        return 0
+
+    if args.cmd == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        problems = compare(baseline, current, args.threshold)
+        for p in problems:
+            print(p)
+        print(f"\n{len(problems)} problem(s)")
+        return 1 if problems else 0
+
+    sys.path.insert(0, HERE)
+    import lz_engines
+    engines = args.engines.split(",") if args.engines else list(lz_engines.ENGINES)
+    for e in engines:
+        if e not in lz_engines.ENGINES:
+            parser.error(f"unknown engine {e!r}")
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    corpora = args.corpora.split(",") if args.corpora else corpus_names(sizes)
+
+    report = run_benchmark(engines, corpora, args.repeat, args.budget, args.timeout, args.profile)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=1)
+    for m in report["mismatches"]:
+        print(f"MISMATCH {m['measure']} on {m['corpus']}: {m['counts']}")
+    print(f"\nResults saved in {args.output}")
+    return 1 if report["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,241 @@
+#
+# lz-fuzz.py : randomized differential test of the LZ76 engines against complexityLempelZiv
+#
+# use:   python lz-fuzz.py [--count 1000000] [--max-len 2000] [--engines v1,v3,v6,bits,batch]
+#                          [--seed 0] [--processes N] [-o failures.json]
+#
+# Every generated string is measured by complexityLempelZiv (lempel-ziv-v2.py, the
+# reference; 0 for an empty string, the convention of lz_engines) and by every
+# engine of the "lz76" measure through lz_engines.lz_complexity; "batch" is the
+# threaded kernel of lz_batch, run once per batch of strings. The generator
+# mixes short and long strings, alphabets of 1 to 256 symbols, and the shapes
+# where factorizations go wrong: runs, periods, near-periods, Fibonacci words,
+# overlapping repeats. A mismatch is shrunk to a short input that still fails
+# and saved, hex encoded, in the output file. With --processes the count is split
+# among worker processes, each with its own seed.
+#
+
+import os, sys, json, time, argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+# -----------------------------------------------------------
+#   GENERATOR
+# -----------------------------------------------------------
+def _alphabet(rng):
+    return int(rng.choice([1, 2, 2, 2, 3, 4, 4, 8, 26, 256]))
+
+
+def _length(rng, max_len):
+    # log-uniform: most strings short (edge cases), some close to max_len
+    return int(np.exp(rng.uniform(0, np.log(max_len + 1)))) - 1
+
+
+def _uniform(rng, n, k):
+    return rng.integers(0, k, n)
+
+
+def _biased(rng, n, k):
+    p = rng.dirichlet(np.full(k, 0.3))
+    return rng.choice(k, n, p=p)
+
+
+def _runs(rng, n, k):
+    lengths = rng.geometric(rng.uniform(0.05, 0.7), n)
+    return np.repeat(rng.integers(0, k, n), lengths)[:n]
+
+
+def _periodic(rng, n, k):
+    period = rng.integers(1, 12)
+    s = np.resize(rng.integers(0, k, period), n)
+    flips = rng.random(n) < rng.choice([0.0, 0.01, 0.1])
+    s[flips] = rng.integers(0, k, np.count_nonzero(flips))
+    return s
+
+
+def _fibonacci(rng, n, k):
+    a, b = [0], [0, 1]
+    while len(b) < n:
+        a, b = b, b + a
+    s = np.array(b[:n])
+    return (s + rng.integers(0, k)) % k
+
+
+def _repeats(rng, n, k):
+    # random blocks copied from earlier (often overlapping) positions
+    s = list(rng.integers(0, k, min(n, 4)))
+    while len(s) < n:
+        if rng.random() < 0.3:
+            s.append(int(rng.integers(0, k)))
+        else:
+            start = int(rng.integers(0, len(s)))
+            for j in range(int(rng.integers(1, 2 * len(s) + 1))):
+                s.append(s[start + j])
+    return np.array(s[:n])
+
+
+SHAPES = (_uniform, _biased, _runs, _periodic, _fibonacci, _repeats)
+
+
+def generate(rng, max_len):
+    """
+    One random test string, uint8.
+    """
+    n = _length(rng, max_len)
+    k = _alphabet(rng)
+    shape = SHAPES[rng.integers(len(SHAPES))]
+    return np.asarray(shape(rng, n, k), dtype=np.int64).astype(np.uint8)[:n]
+
+
+# -----------------------------------------------------------
+#   DIFFERENTIAL CHECK
+# -----------------------------------------------------------
+def engine_functions(names):
+    """
+    {name: f(arr) -> complexity or None (alphabet not supported)}; "batch" is handled apart.
+    """
+    import lz_engines
+
+    funcs = {}
+    for name in names:
+        if name == "batch":
+            continue
+        e = lz_engines.ENGINES[name]
+        if e.measure != "lz76":
+            raise ValueError(f"engine {name!r} computes {e.measure!r}, not lz76")
+
+        def run(arr, e=e):
+            m = lz_engines.alphabet_size(arr)
+            if e.bytes_per_symbol(m) == float("inf"):
+                return None
+            return int(lz_engines.lz_complexity(arr, e.name, cache=False))
+        funcs[name] = run
+    return funcs
+
+
+def shrink(arr, fails):
+    """
+    Smallest input found (dropping symbols and halves) for which fails(arr) is still true.
+    """
+    changed = True
+    while changed:
+        changed = False
+        for cut in (arr[:len(arr) // 2], arr[len(arr) // 2:]):
+            if len(cut) and fails(cut):
+                arr, changed = cut, True
+                break
+        else:
+            for i in range(len(arr)):
+                cut = np.delete(arr, i)
+                if fails(cut):
+                    arr, changed = cut, True
+                    break
+    return arr
+
+
+def fuzz(count, max_len=2000, engines=None, seed=0, batch_size=1000, max_failures=10, verbose=True):
+    """
+    Compare the engines with complexityLempelZiv on count random strings.
+    Returns the list of failures: {"engine", "expected", "got", "input" (hex), "shrunk" (hex)}.
+    """
+    import lz_engines
+    from lz_scripts import load_script
+    from lz_batch import lz_complexity_batch
+
+    kernel = load_script("lempel-ziv-v2.py").complexityLempelZiv
+
+    def reference(a):
+        # the kernel gives 1 for an empty string, the entry points 0
+        return int(kernel(a)) if len(a) else 0
+    if engines is None:
+        engines = [e.name for e in lz_engines.list_engines("lz76") if e.name != "v2"] + ["batch"]
+    funcs = engine_functions(engines)
+    lz_engines.warmup(list(funcs))
+
+    rng = np.random.default_rng(seed)
+    failures = []
+    t0 = time.perf_counter()
+    done = 0
+    while done < count and len(failures) < max_failures:
+        strings = [generate(rng, max_len) for _ in range(min(batch_size, count - done))]
+        expected = [reference(s) for s in strings]
+
+        got = {name: [f(s) for s in strings] for name, f in funcs.items()}
+        if "batch" in engines:
+            got["batch"] = [int(c) for c in lz_complexity_batch(strings)]
+
+        for name, values in got.items():
+            for s, want, value in zip(strings, expected, values):
+                if value is None or value == want:
+                    continue
+                f = funcs.get(name, lambda a: int(lz_complexity_batch([a])[0]))
+                small = shrink(s, lambda a: f(a) not in (None, reference(a)))
+                failures.append({"engine": name, "expected": want, "got": value,
+                                 "input": s.tobytes().hex(), "shrunk": small.tobytes().hex()})
+                if verbose:
+                    print(f"MISMATCH {name}: expected {want}, got {value} "
+                          f"(n={len(s)}; shrunk to {small.tolist()})")
+                if len(failures) >= max_failures:
+                    break
+
+        done += len(strings)
+        if verbose and (done % (batch_size * 100) == 0 or done >= count):
+            elapsed = time.perf_counter() - t0
+            print(f"{done:10d} strings  {done / elapsed:9.0f} strings/s  {len(failures)} failure(s)")
+    return failures
+
+
+def _fuzz_worker(args):
+    sys.path.insert(0, HERE)
+    count, max_len, engines, seed, max_failures = args
+    return fuzz(count, max_len, engines, seed, max_failures=max_failures, verbose=False)
+
+
+def fuzz_parallel(count, max_len=2000, engines=None, seed=0, processes=None, max_failures=10):
+    """
+    fuzz() split among processes, worker i with seed (seed, i). Returns all the failures.
+    """
+    processes = processes or os.cpu_count() or 1
+    shares = [count // processes + (i < count % processes) for i in range(processes)]
+    jobs = [(share, max_len, engines, (seed, i), max_failures) for i, share in enumerate(shares) if share]
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+        failures = [f for part in pool.map(_fuzz_worker, jobs) for f in part]
+    elapsed = time.perf_counter() - t0
+    print(f"{count:10d} strings  {count / elapsed:9.0f} strings/s  {len(failures)} failure(s)  "
+          f"({len(jobs)} processes)")
+    return failures
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Differential fuzzing of the LZ76 engines.")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--max-len", type=int, default=2000)
+    parser.add_argument("--engines", default=None, help="comma separated (default: every lz76 engine + batch)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=1, help="worker processes (0 = one per core)")
+    parser.add_argument("--max-failures", type=int, default=10)
+    parser.add_argument("-o", "--output", default="fuzz_failures.json")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, HERE)
+    engines = args.engines.split(",") if args.engines else None
+    if args.processes == 1:
+        failures = fuzz(args.count, args.max_len, engines, args.seed, max_failures=args.max_failures)
+    else:
+        failures = fuzz_parallel(args.count, args.max_len, engines, args.seed,
+                                 args.processes or None, args.max_failures)
+    if failures:
+        with open(args.output, "w") as f:
+            json.dump(failures, f, indent=1)
+        print(f"\n{len(failures)} failure(s) saved in {args.output}")
+        return 1
+    print("\nno mismatches")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,156 @@
+#
+# lz_batch.py : Lempel-Ziv complexity of many sequences in one call
+#               - "ks":        complexityLempelZiv (lempel-ziv-v2.py) over all cores with Numba prange
+#               - "automaton": compute_lz_complexity_bytes (lempel-ziv-v4.py) in a process pool
+#
+
+import os, sys, time
+import numpy as np
+import numba
+from numba import njit, prange
+from concurrent.futures import ProcessPoolExecutor
+
+from lz_scripts import load_script
+
+complexityLempelZiv = load_script("lempel-ziv-v2.py").complexityLempelZiv
+
+
+@njit(cache=True, parallel=True)
+def ks_batch(buf, offsets, out):
+    for k in prange(out.shape[0]):
+        lo = offsets[k]
+        hi = offsets[k + 1]
+        if hi > lo:
+            out[k] = complexityLempelZiv(buf[lo:hi])
+        else:
+            out[k] = 0
+
+
+def pack_sequences(seqs):
+    """
+    Ragged set of sequences (bytes, str or 1-D arrays) -> (buf, offsets),
+    sequence k being buf[offsets[k]:offsets[k+1]].
+    """
+    arrays = []
+    for s in seqs:
+        if isinstance(s, str):
+            s = s.encode("utf-8")
+        if isinstance(s, (bytes, bytearray, memoryview)):
+            s = np.frombuffer(s, dtype=np.uint8)
+        arrays.append(np.asarray(s).ravel())
+
+    offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+    np.cumsum([a.shape[0] for a in arrays], out=offsets[1:])
+    buf = np.concatenate(arrays) if arrays else np.zeros(0, dtype=np.uint8)
+    return buf, offsets
+
+
+def as_batch(data, offsets=None):
+    """
+    2-D array (one sequence per row), concatenated buffer + offsets, or a list
+    of sequences -> (buf, offsets)
+    """
+    if offsets is not None:
+        buf = np.ascontiguousarray(data).ravel()
+        offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+        if offsets.ndim != 1 or offsets.shape[0] < 1 or offsets[0] != 0 \
+                or offsets[-1] != buf.shape[0] or np.any(np.diff(offsets) < 0):
+            raise ValueError("offsets must be non-decreasing, start at 0 and end at len(data)")
+        return buf, offsets
+
+    if isinstance(data, np.ndarray) and data.ndim == 2:
+        rows, cols = data.shape
+        return np.ascontiguousarray(data).ravel(), np.arange(rows + 1, dtype=np.int64) * cols
+
+    return pack_sequences(data)
+
+
+def _automaton_chunk(args):
+    # worker: v4 engine on sequences of one task
+    buf, offsets = args
+    v4 = load_script("lempel-ziv-v4.py")
+    out = np.zeros(offsets.shape[0] - 1, dtype=np.int64)
+    for k in range(out.shape[0]):
+        raw = buf[offsets[k]:offsets[k + 1]].tobytes()
+        out[k] = v4.compute_lz_complexity_bytes(raw)[0]
+    return out
+
+
+def automaton_batch(buf, offsets, processes=None, chunk=64):
+    if buf.dtype != np.uint8:
+        # the automaton works on bytes: map up to 256 symbols onto uint8
+        symbols, inverse = np.unique(buf, return_inverse=True)
+        if symbols.shape[0] > 256:
+            raise ValueError("the automaton engine supports at most 256 distinct symbols")
+        buf = inverse.astype(np.uint8)
+
+    n = offsets.shape[0] - 1
+    tasks = []
+    for first in range(0, n, chunk):
+        last = min(first + chunk, n)
+        lo, hi = offsets[first], offsets[last]
+        tasks.append((buf[lo:hi], offsets[first:last + 1] - lo))
+
+    if processes == 1:
+        parts = [_automaton_chunk(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parts = list(pool.map(_automaton_chunk, tasks))
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+
+def lz_complexity_batch(data, offsets=None, engine="ks", threads=None, processes=None):
+    """
+    data: 2-D array of equal-length sequences (one per row), a concatenated
+          buffer with offsets (len = number of sequences + 1), or a list of sequences
+    engine: "ks" (complexityLempelZiv, Numba threads) or
+            "automaton" (compute_lz_complexity_bytes, process pool)
+    threads: Numba threads for "ks" (default: all)
+    processes: worker processes for "automaton" (default: os.cpu_count())
+    Returns: int64 NumPy array, one complexity per sequence (0 for empty ones)
+    """
+    buf, offsets = as_batch(data, offsets)
+
+    if engine == "ks":
+        out = np.zeros(offsets.shape[0] - 1, dtype=np.int64)
+        if threads is None:
+            ks_batch(buf, offsets, out)
+        else:
+            previous = numba.get_num_threads()
+            numba.set_num_threads(threads)
+            try:
+                ks_batch(buf, offsets, out)
+            finally:
+                numba.set_num_threads(previous)
+        return out
+    if engine == "automaton":
+        return automaton_batch(buf, offsets, processes=processes)
+    raise ValueError(f"unknown engine {engine!r} (use 'ks' or 'automaton')")
+
+
+def benchmark_scaling(n_seqs=2000, length=4000, alphabet=2, max_workers=None, seed=0):
+    """
+    Throughput of lz_complexity_batch with 1..max_workers threads / processes.
+    """
+    max_workers = max_workers or numba.config.NUMBA_NUM_THREADS
+    data = np.random.default_rng(seed).integers(0, alphabet, (n_seqs, length), dtype=np.uint8)
+    mb = data.nbytes / 1e6
+
+    lz_complexity_batch(data[:2])                       # compile before timing
+    print(f"{n_seqs} sequences x {length} symbols ({mb:.1f} MB)")
+    for engine, key in (("ks", "threads"), ("automaton", "processes")):
+        base = None
+        for workers in range(1, max_workers + 1):
+            t0 = time.perf_counter()
+            lz_complexity_batch(data, engine=engine, **{key: workers})
+            elapsed = time.perf_counter() - t0
+            base = base or elapsed
+            print(f"  {engine:9s} {workers:3d} {key:9s}: {elapsed:8.3f} s  "
+                  f"{n_seqs / elapsed:10.1f} seq/s  {mb / elapsed:8.2f} MB/s  speedup {base / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    # use:   python lz_batch.py [n_seqs] [length] [alphabet] [max_workers]
+    args = [int(a) for a in sys.argv[1:5]]
+    import lz_batch                 # the cached kernels belong to this name, not "__main__"
+    lz_batch.benchmark_scaling(*args)
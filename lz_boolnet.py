@@ -0,0 +1,279 @@
+#
+# lz_boolnet.py : boolean networks simulated in batch, bit-sliced over the initial states
+#
+# A network of N units is a list of rules, one per unit: the unit's next value is
+# a truth table of (up to MAX_INPUTS) current units, e.g. the evolve_v1 of diff-iit-zip
+#     [xor_rule(1, 2), copy_rule(0), and_rule(0, 1)]     # (B ^ C, A, A & B)
+#
+# A batch of B initial states (all 2^N, or random ones) is stored bit-sliced:
+# packed[i, w] holds unit i of the initial states 64*w .. 64*w+63, one per bit,
+# so one step of the whole batch is a few bitwise operations per unit and word.
+# The trajectories (steps, N, words) unpack to (B, steps, N) uint8 states, ready
+# for lz_batch (one LZ per initial state) and lz_psi.
+#
+
+import sys, time, argparse
+import numpy as np
+from collections import namedtuple
+from numba import njit
+
+MAX_INPUTS = 8
+
+Rule = namedtuple("Rule", "inputs table")
+
+
+# -----------------------------------------------------------
+#   RULES: table[j] = next value when the inputs read j (first input = most significant bit)
+# -----------------------------------------------------------
+def truth_table(inputs, table):
+    inputs = tuple(int(i) for i in inputs)
+    table = np.asarray(table, dtype=np.uint8).ravel()
+    if not 0 <= len(inputs) <= MAX_INPUTS or table.shape[0] != 1 << len(inputs):
+        raise ValueError(f"a rule needs at most {MAX_INPUTS} inputs and 2**inputs table entries")
+    return Rule(inputs, table)
+
+
+def _rows(k):
+    # the input bits of every table row, (2**k, k)
+    j = np.arange(1 << k)
+    return (j[:, None] >> np.arange(k - 1, -1, -1)) & 1
+
+
+def xor_rule(*inputs):
+    # also the sum modulo 2 of the inputs
+    return truth_table(inputs, _rows(len(inputs)).sum(axis=1) % 2)
+
+
+def and_rule(*inputs):
+    return truth_table(inputs, _rows(len(inputs)).all(axis=1))
+
+
+def or_rule(*inputs):
+    return truth_table(inputs, _rows(len(inputs)).any(axis=1))
+
+
+def copy_rule(i):
+    return truth_table((i,), [0, 1])
+
+
+def not_rule(i):
+    return truth_table((i,), [1, 0])
+
+
+def random_network(units, k=2, seed=None):
+    """
+    Random NK network: every unit reads k random units through a random truth table.
+    """
+    rng = np.random.default_rng(seed)
+    return [truth_table(rng.choice(units, size=k, replace=False), rng.integers(0, 2, 1 << k))
+            for _ in range(units)]
+
+
+NETWORKS = {
+    "v1": [xor_rule(1, 2), copy_rule(0), and_rule(0, 1)],          # evolve_v1 / evolve
+    "v2": [xor_rule(1, 2), xor_rule(0, 2), xor_rule(0, 1)],        # evolve_v2
+}
+
+
+def compile_network(rules):
+    """
+    rules -> (inputs (N, K) int64, k (N,) int64, tables (N, 2**K) uint8) for the kernel.
+    """
+    units = len(rules)
+    K = max([len(r.inputs) for r in rules] + [1])
+    inputs = np.zeros((units, K), dtype=np.int64)
+    k = np.zeros(units, dtype=np.int64)
+    tables = np.zeros((units, 1 << K), dtype=np.uint8)
+    for i, r in enumerate(rules):
+        if any(not 0 <= j < units for j in r.inputs):
+            raise ValueError(f"unit {i} reads a unit outside 0..{units - 1}")
+        k[i] = len(r.inputs)
+        inputs[i, :k[i]] = r.inputs
+        tables[i, :1 << k[i]] = r.table
+    return inputs, k, tables
+
+
+# -----------------------------------------------------------
+#   INITIAL STATES, packed over the batch
+# -----------------------------------------------------------
+def pack_batch(states):
+    """
+    (B, N) binary states -> (N, words) uint64, bit b of unit i = state b.
+    """
+    states = np.asarray(states, dtype=np.uint8)
+    B, N = states.shape
+    words = (B + 63) // 64
+    packed = np.zeros((N, words * 8), dtype=np.uint8)
+    packed[:, :(B + 7) // 8] = np.packbits(states.T, axis=1, bitorder="little")
+    packed = packed.view(np.uint64)
+    if sys.byteorder != "little":
+        packed = packed.byteswap()
+    return packed
+
+
+def unpack_batch(packed, batch):
+    """
+    (..., N, words) uint64 -> (batch, ..., N) uint8, inverse of pack_batch.
+    """
+    packed = np.ascontiguousarray(packed)
+    if sys.byteorder != "little":
+        packed = packed.byteswap()
+    bits = np.unpackbits(packed.view(np.uint8), axis=-1, bitorder="little")[..., :batch]
+    return np.ascontiguousarray(np.moveaxis(bits, -1, 0))
+
+
+def all_states(units):
+    """
+    The 2**units initial states in order (unit 0 = most significant bit), packed.
+    """
+    if units > 30:
+        raise ValueError("all_states: too many units, use random_states")
+    return pack_batch(_rows(units).astype(np.uint8))
+
+
+def random_states(units, count, p=0.5, seed=None):
+    rng = np.random.default_rng(seed)
+    return pack_batch((rng.random((count, units)) < p).astype(np.uint8))
+
+
+# -----------------------------------------------------------
+#   SIMULATION
+# -----------------------------------------------------------
+@njit(cache=True, nogil=True)
+def simulate_kernel(x0, inputs, k, tables, out):
+    steps = out.shape[0]
+    N, W = x0.shape
+    ones = ~np.uint64(0)
+    cur = x0.copy()
+    nxt = np.empty_like(x0)
+    for t in range(steps):
+        out[t] = cur
+        for i in range(N):
+            ki = k[i]
+            # sum of the minterms where the table is 1 (or the complement, if fewer)
+            n_true = 0
+            for j in range(1 << ki):
+                n_true += tables[i, j]
+            want = 1 if 2 * n_true <= (1 << ki) else 0
+            for w in range(W):
+                acc = np.uint64(0)
+                for j in range(1 << ki):
+                    if tables[i, j] != want:
+                        continue
+                    term = ones
+                    for b in range(ki):
+                        x = cur[inputs[i, b], w]
+                        if (j >> (ki - 1 - b)) & 1:
+                            term &= x
+                        else:
+                            term &= ~x
+                    acc |= term
+                nxt[i, w] = acc if want == 1 else ~acc
+        cur, nxt = nxt, cur
+    return out
+
+
+def simulate(rules, x0, steps):
+    """
+    rules: list of Rule (or a name of NETWORKS)
+    x0: packed initial states (N, words), from all_states / random_states / pack_batch
+    Returns: packed trajectories (steps, N, words), step 0 = x0
+    """
+    if isinstance(rules, str):
+        rules = NETWORKS[rules]
+    inputs, k, tables = compile_network(rules)
+    x0 = np.ascontiguousarray(x0, dtype=np.uint64)
+    if x0.shape[0] != len(rules):
+        raise ValueError(f"{x0.shape[0]} units in the initial states, {len(rules)} rules")
+    out = np.empty((steps,) + x0.shape, dtype=np.uint64)
+    return simulate_kernel(x0, inputs, k, tables, out)
+
+
+def trajectories(packed, batch):
+    """
+    Packed trajectories -> (batch, steps, N) uint8 states, one trajectory per initial state.
+    """
+    return unpack_batch(packed, batch)
+
+
+# -----------------------------------------------------------
+#   SCORING
+# -----------------------------------------------------------
+def lz_scores(states, engine="ks", threads=None):
+    """
+    LZ complexity of every trajectory (batch, steps, N), states concatenated one after
+    the other as diff-iit-zip does.
+    """
+    from lz_batch import lz_complexity_batch
+
+    return lz_complexity_batch(states.reshape(states.shape[0], -1), engine=engine, threads=threads)
+
+
+def psi_scores(states):
+    """
+    Simplified ψ (H_total - H_parts of lz_psi) of every whole trajectory (batch, steps, N),
+    without a Python loop over the batch (N <= 62).
+    """
+    B, T, N = states.shape
+    if N > 62:
+        raise ValueError("psi_scores: at most 62 units")
+    p = states.mean(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        h = -(p * np.log2(p) + (1 - p) * np.log2(1 - p))
+    h_parts = np.where((p > 0) & (p < 1), h, 0.0).sum(axis=1)
+
+    weights = np.int64(1) << np.arange(N - 1, -1, -1, dtype=np.int64)
+    codes = np.sort(states.astype(np.int64) @ weights, axis=1)
+    new = np.ones(codes.shape, dtype=bool)
+    new[:, 1:] = codes[:, 1:] != codes[:, :-1]
+    starts = np.flatnonzero(new.ravel())
+    runs = np.diff(np.append(starts, codes.size)).astype(np.float64)
+    s = np.bincount(starts // T, weights=runs * np.log2(runs), minlength=B)
+    h_total = np.maximum(np.log2(T) - s / T, 0.0)
+    return h_total - h_parts
+
+
+def warmup():
+    """
+    Compile (or load from the on-disk cache) the kernel. Returns the seconds spent.
+    """
+    t0 = time.perf_counter()
+    simulate("v1", all_states(3), 2)
+    return time.perf_counter() - t0
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Batch boolean network simulation, LZ and ψ scores.")
+    parser.add_argument("--network", default="v1", help=f"{', '.join(NETWORKS)} or random")
+    parser.add_argument("--units", type=int, default=16, help="units of a random network")
+    parser.add_argument("--k", type=int, default=2, help="inputs per unit of a random network")
+    parser.add_argument("--steps", type=int, default=64)
+    parser.add_argument("--initial", type=int, default=0, help="random initial states (0 = all 2^N)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rules = (random_network(args.units, args.k, args.seed) if args.network == "random"
+             else NETWORKS[args.network])
+    units = len(rules)
+    x0 = random_states(units, args.initial, seed=args.seed) if args.initial else all_states(units)
+    batch = args.initial or 1 << units
+
+    startup = warmup()
+    t0 = time.perf_counter()
+    states = trajectories(simulate(rules, x0, args.steps), batch)
+    t_sim = time.perf_counter() - t0
+    lz = lz_scores(states)
+    psi = psi_scores(states)
+    elapsed = time.perf_counter() - t0
+
+    print(f"{units} units, {batch} initial states, {args.steps} steps")
+    print(f"LZ complexity: mean {lz.mean():.2f}  min {lz.min()}  max {lz.max()}")
+    print(f"ψ semplificato: mean {psi.mean():.4f}  min {psi.min():.4f}  max {psi.max():.4f}")
+    print(f"\nStartup time (JIT compile / cache load): {startup:.6f} seconds")
+    print(f"Simulation time: {t_sim:.6f} seconds, total {elapsed:.6f} seconds\n")
+    return 0
+
+
+if __name__ == "__main__":
+    import lz_boolnet               # the cached kernel belongs to this name, not "__main__"
+    sys.exit(lz_boolnet.main(sys.argv[1:]))
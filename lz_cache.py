@@ -0,0 +1,221 @@
+#
+# lz_cache.py : content-addressed cache of complexity results (SQLite, LRU eviction)
+#
+# key = BLAKE2b of the input bytes (streamed) + engine name + parameters, so the
+# same corpus scored again by the same engine, in any process, is a lookup.
+# Each entry keeps the complexity (the number of factors / components), the
+# input length, the seconds the computation took and optional extra values.
+#
+# The store is one SQLite file in WAL mode: any number of processes can read
+# while one writes, and writers wait for each other (busy timeout). When the
+# entries exceed max_bytes the least recently used ones are deleted. A hit writes
+# its new last_used only when the stored one is older than TOUCH_INTERVAL, so
+# readers rarely take the writer lock (LRU order is exact to that interval).
+#
+# lz_engines.lz_complexity() and v4's compute_lz_complexity_bytes() consult the
+# default cache by themselves once it is enabled:
+#   LEMPEL_ZIV_CACHE=1           -> CACHE_FILE
+#   LEMPEL_ZIV_CACHE=/some/db    -> that file
+#   unset / 0                    -> no caching (the default)
+#
+# use:   python lz_cache.py stats | clear | evict [MAX_MB]
+#
+
+import os, sys, json, time, hashlib, sqlite3, threading
+from collections import namedtuple
+import numpy as np
+
+from lz_engines import CACHE_DIR
+
+CACHE_FILE = os.path.join(CACHE_DIR, "results.sqlite")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+HASH_CHUNK_BYTES = 1 << 20
+ENTRY_OVERHEAD = 96             # bytes of a row besides its text fields (estimate)
+TOUCH_INTERVAL = 60.0           # seconds: a hit refreshes last_used only when older than this
+
+# engines that compute the same value share one entry: v4's dense and sparse
+# transitions (lz_engines) and compute_lz_complexity_bytes() all store under "v4"
+SHARED_ENGINES = {"v4-dense": "v4", "v4-sparse": "v4"}
+
+CacheEntry = namedtuple("CacheEntry", "complexity n seconds extra engine params created")
+
+
+# -----------------------------------------------------------
+#   CONTENT HASH
+# -----------------------------------------------------------
+def content_digest(data, chunk_bytes=HASH_CHUNK_BYTES):
+    """
+    BLAKE2b-256 (hex) of bytes, str (UTF-8), a 1-D array's buffer, or an
+    iterable of buffers (hashed while streaming).
+    """
+    h = hashlib.blake2b(digest_size=32)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if isinstance(data, np.ndarray):
+        data = np.ascontiguousarray(data).view(np.uint8).ravel()
+    if isinstance(data, (bytes, bytearray, memoryview, np.ndarray)):
+        view = memoryview(data).cast("B")
+        for start in range(0, len(view), chunk_bytes):
+            h.update(view[start:start + chunk_bytes])
+    else:
+        for part in data:
+            h.update(part)
+    return h.hexdigest()
+
+
+def file_digest(path, chunk_bytes=HASH_CHUNK_BYTES):
+    """
+    BLAKE2b-256 of a file, streamed from mapped slices (compression_estimate.iter_slices).
+    """
+    from compression_estimate import iter_slices
+    return content_digest(iter_slices(path, chunk_bytes))
+
+
+def params_key(params):
+    return json.dumps(params or {}, sort_keys=True, separators=(",", ":"))
+
+
+# -----------------------------------------------------------
+#   STORE
+# -----------------------------------------------------------
+class ResultCache:
+    """
+    cache = ResultCache(path, max_bytes)
+    cache.get(digest, engine, params) -> CacheEntry or None
+    cache.put(digest, engine, params, complexity, n, seconds, extra)
+    cache.memoize(data, engine, compute, params) -> complexity
+    """
+
+    def __init__(self, path=CACHE_FILE, max_bytes=DEFAULT_MAX_BYTES, timeout=30.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS results (
+                               digest TEXT, engine TEXT, params TEXT,
+                               complexity INTEGER, n INTEGER, seconds REAL, extra TEXT,
+                               created REAL, last_used REAL, bytes INTEGER,
+                               PRIMARY KEY (digest, engine, params))""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS results_lru ON results (last_used)")
+        self.hits = self.misses = 0
+
+    def close(self):
+        self.db.close()
+
+    def get(self, digest, engine, params=None):
+        engine = SHARED_ENGINES.get(engine, engine)
+        key = (digest, engine, params_key(params))
+        row = self.db.execute("SELECT complexity, n, seconds, extra, created, last_used FROM results "
+                              "WHERE digest = ? AND engine = ? AND params = ?", key).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        complexity, n, seconds, extra, created, last_used = row
+        now = time.time()
+        if now - last_used > TOUCH_INTERVAL:
+            self.db.execute("UPDATE results SET last_used = ? WHERE digest = ? AND engine = ? AND params = ?",
+                            (now,) + key)
+        return CacheEntry(complexity, n, seconds, json.loads(extra) if extra else None,
+                          engine, key[2], created)
+
+    def put(self, digest, engine, params, complexity, n, seconds, extra=None):
+        engine = SHARED_ENGINES.get(engine, engine)
+        params = params_key(params)
+        extra = json.dumps(extra) if extra else None
+        size = ENTRY_OVERHEAD + len(digest) + len(engine) + len(params) + len(extra or "")
+        now = time.time()
+        self.db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (digest, engine, params, int(complexity), int(n), float(seconds), extra,
+                         now, now, size))
+        self.evict()
+
+    def evict(self, max_bytes=None):
+        """
+        Delete the least recently used entries beyond max_bytes. Returns how many.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        total = self.db.execute("SELECT COALESCE(SUM(bytes), 0) FROM results").fetchone()[0]
+        if total <= max_bytes:
+            return 0
+        cur = self.db.execute("""DELETE FROM results WHERE rowid IN (
+                                     SELECT rowid FROM (
+                                         SELECT rowid, SUM(bytes) OVER (ORDER BY last_used DESC, rowid DESC) AS kept
+                                         FROM results)
+                                     WHERE kept > ?)""", (max_bytes,))
+        return cur.rowcount
+
+    def memoize(self, data, engine, compute, params=None, digest=None, n=None):
+        """
+        compute() -> complexity, run only when (content of data, engine, params) is not cached.
+        """
+        digest = digest or content_digest(data)
+        hit = self.get(digest, engine, params)
+        if hit is not None:
+            return hit.complexity
+        t0 = time.perf_counter()
+        value = compute()
+        n = len(data) if n is None else n
+        self.put(digest, engine, params, value, n, time.perf_counter() - t0)
+        return value
+
+    def stats(self):
+        entries, total = self.db.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM results").fetchone()
+        return {"path": self.path, "entries": entries, "bytes": total, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        self.db.execute("DELETE FROM results")
+
+
+# -----------------------------------------------------------
+#   DEFAULT CACHE (environment)
+# -----------------------------------------------------------
+_default = threading.local()
+
+
+def default_cache():
+    """
+    The cache of this thread selected by LEMPEL_ZIV_CACHE, or None when caching is off.
+    """
+    setting = os.environ.get("LEMPEL_ZIV_CACHE", "")
+    if setting in ("", "0"):
+        return None
+    path = CACHE_FILE if setting == "1" else setting
+    # SQLite connections must not cross a thread or a fork: one per thread
+    # (thread-local, gone with the thread) and per process
+    caches = _default.__dict__.setdefault("caches", {})
+    key = (os.getpid(), path)
+    if key not in caches:
+        caches[key] = ResultCache(path)
+    return caches[key]
+
+
+def resolve(cache):
+    """
+    cache argument of the engine APIs -> ResultCache or None
+    (None = default cache, False = no caching, or a ResultCache).
+    """
+    if cache is False:
+        return None
+    if cache is None:
+        return default_cache()
+    return cache
+
+
+if __name__ == "__main__":
+    setting = os.environ.get("LEMPEL_ZIV_CACHE", "")
+    store = ResultCache(CACHE_FILE if setting in ("", "0", "1") else setting)
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    if cmd == "clear":
+        store.clear()
+    elif cmd == "evict":
+        mb = float(sys.argv[2]) if len(sys.argv) > 2 else store.max_bytes / (1024 * 1024)
+        print(f"{store.evict(int(mb * 1024 * 1024))} entries evicted")
+    elif cmd != "stats":
+        print("use: python lz_cache.py stats | clear | evict [MAX_MB]")
+        sys.exit(1)
+    print(store.stats())
@@ -0,0 +1,270 @@
+#
+# lz_checkpoint.py : resumable v4 complexity (compute_lz_complexity_bytes) of an append-only file
+#
+#   count, info = complexity_with_checkpoint("storici.txt")
+#
+# The suffix automaton of lempel-ziv-v4.py, with its sparse transitions (edges,
+# table, head, link, length), is kept in memory-mapped files together with the
+# factorization position, so when the file grows only the appended bytes are
+# processed, by v4's own lz_factor_run().
+#
+# The last factor of a file may still be open: if it matched up to the end of
+# the file, appended bytes can make it longer. The checkpoint therefore stops
+# before it: the automaton covers the bytes before the open factor, and count
+# is the number of factors closed there; the open factor is recomputed (and
+# counted) at every resume.
+#
+# The bytes the checkpoint has seen are hashed in segments of SEGMENT_BYTES
+# (BLAKE2b each): an update hashes only the last, partial segment and the new
+# ones, so it costs O(appended bytes). Before resuming they are checked against
+# all the segment digests (verify="full", reads the whole file), only the last
+# two segments (verify="tail") or not at all ("none"); a file that changed,
+# shrank, or a checkpoint left half-written by an interrupted run, means a fresh start.
+#
+# Size: the files grow with the states and the transitions that exist, whatever
+# the alphabet: about 70 bytes per input byte for text (~105 MB for storici.txt,
+# 1.5 MB, where v4's dense table would take ~575 MB). They are raw int32 files
+# extended in place for the new bytes, so nothing is copied; only the hash table
+# of the transitions is rewritten, when it doubles, and an update costs
+# O(appended bytes) amortized. They are memory-mapped: only the pages the
+# factorization touches are read back.
+#
+# use:   python lz_checkpoint.py FILE [--checkpoint DIR] [--verify full|tail|none] [--reset]
+#
+
+import os, sys, json, mmap, time, shutil, hashlib, argparse
+import numpy as np
+
+from lz_scripts import load_script
+from lz_engines import CACHE_DIR
+
+v4 = load_script("lempel-ziv-v4.py")
+
+CHECKPOINT_DIR = os.path.join(CACHE_DIR, "checkpoints")
+FORMAT_VERSION = 3
+SEGMENT_BYTES = 1 << 24
+TAIL_SEGMENTS = 2
+TABLE_INITIAL = 1 << 4
+NO_LIMIT = 1 << 62              # no dictionary or memory cap: the structures live on disk
+
+
+# -----------------------------------------------------------
+#   CHECKPOINT FILES
+# -----------------------------------------------------------
+def checkpoint_dir_for(path):
+    # one directory per absolute path of the input
+    key = hashlib.blake2b(os.path.abspath(path).encode("utf-8"), digest_size=8).hexdigest()
+    return os.path.join(CHECKPOINT_DIR, f"{os.path.basename(path)}-{key}")
+
+
+def prefix_digest(mm, start, stop):
+    h = hashlib.blake2b(digest_size=32)
+    view = memoryview(mm)
+    try:
+        for lo in range(start, stop, 1 << 20):
+            part = view[lo:min(lo + (1 << 20), stop)]
+            h.update(part)
+            part.release()
+    finally:
+        view.release()
+    return h.hexdigest()
+
+
+def _read_meta(directory):
+    try:
+        with open(os.path.join(directory, "meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(directory, meta):
+    tmp = os.path.join(directory, "meta.json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(meta, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(directory, "meta.json"))
+
+
+def _open(directory, name, shape):
+    """
+    directory/name.i32 as an int32 memmap of at least shape. A larger shape
+    extends the file in place (the new cells are zeros, the kernels write them
+    before reading them): the old content is not copied.
+    """
+    path = os.path.join(directory, name + ".i32")
+    nbytes = int(np.prod(shape)) * 4
+    with open(path, "ab") as f:
+        if f.tell() < nbytes:
+            f.truncate(nbytes)
+    return np.memmap(path, dtype=np.int32, mode="r+", shape=shape)
+
+
+def _store(directory, name, arr, mapped):
+    """
+    The kernel had to reallocate arr (more room than the memmap gave it):
+    replace the file with its content.
+    """
+    if arr.ctypes.data == mapped.ctypes.data:
+        return
+    path = os.path.join(directory, name + ".i32")
+    arr.tofile(path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+def _fresh_meta():
+    return {"version": FORMAT_VERSION, "state": "clean", "seen": 0, "segments": [],
+            "start": 0, "count": 0, "size": 1, "last": 0, "edges": 0,
+            "state_capacity": 0, "edge_capacity": 0, "table_size": 0}
+
+
+def segment_digests(mm, n, segments=()):
+    """
+    Digests of mm[k*SEGMENT_BYTES : (k+1)*SEGMENT_BYTES] up to n, reusing the
+    complete segments of a previous list (only the partial last one and the new ones are hashed).
+    """
+    keep = list(segments[:-1]) if segments else []
+    return keep + [prefix_digest(mm, lo, min(lo + SEGMENT_BYTES, n))
+                   for lo in range(len(keep) * SEGMENT_BYTES, n, SEGMENT_BYTES)]
+
+
+def _verify(meta, mm, verify):
+    seen = meta["seen"]
+    if len(mm) < seen:
+        return "the file is shorter than at the checkpoint"
+    segments = meta["segments"]
+    check = {"full": range(len(segments)), "none": range(0),
+             "tail": range(max(0, len(segments) - TAIL_SEGMENTS), len(segments))}[verify]
+    for k in check:
+        lo = k * SEGMENT_BYTES
+        if prefix_digest(mm, lo, min(lo + SEGMENT_BYTES, seen)) != segments[k]:
+            return "the bytes seen at the checkpoint changed"
+    return None
+
+
+# -----------------------------------------------------------
+#   RESUMABLE COMPUTATION
+# -----------------------------------------------------------
+def complexity_with_checkpoint(path, checkpoint_dir=None, verify="full", reset=False):
+    """
+    path: append-only input file
+    checkpoint_dir: where the memmapped automaton lives (default: under CACHE_DIR)
+    verify: "full", "tail" or "none" (how the old bytes are checked, see above)
+    reset: ignore an existing checkpoint
+    Returns: (count, info) with count == compute_lz_complexity_bytes(file content)[0] and
+             info = {"resumed", "reason", "new_bytes", "elapsed"}
+    """
+    if verify not in ("full", "tail", "none"):
+        raise ValueError(f"unknown verify mode {verify!r} (use 'full', 'tail' or 'none')")
+    directory = checkpoint_dir or checkpoint_dir_for(path)
+    os.makedirs(directory, exist_ok=True)
+    t0 = time.perf_counter()
+
+    with open(path, "rb") as f:
+        try:
+            raw = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raw = b""                               # empty file
+    try:
+        return _resume(raw, directory, verify, reset, t0)
+    finally:
+        if isinstance(raw, mmap.mmap):
+            raw.close()
+
+
+def _resume(raw, directory, verify, reset, t0):
+    n = len(raw)
+    meta = None if reset else _read_meta(directory)
+    reason = "reset" if reset else "no checkpoint"
+    if meta is not None:
+        if meta.get("version") != FORMAT_VERSION or meta.get("state") != "clean":
+            reason, meta = "incomplete or old checkpoint", None
+        else:
+            reason = _verify(meta, raw, verify)
+            if reason is not None:
+                meta = None
+    resumed = meta is not None
+    if not resumed:
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        meta = _fresh_meta()
+
+    start = meta["start"]
+    # symbols are the byte values themselves: the sparse store does not need
+    # a dense alphabet, so a new byte value changes nothing on disk
+    tail = np.frombuffer(raw, dtype=np.uint8, offset=start) if n > start else np.zeros(0, np.uint8)
+    arr = tail.astype(np.int32)
+    new_bytes = tail.shape[0]
+    del tail                                    # no view of the mapped file left behind
+
+    # room for the run: every extension adds at most 2 states; transitions are
+    # about 3 per symbol at most (beyond that the kernel reallocates and the
+    # file is rewritten)
+    size, n_edges = meta["size"], meta["edges"]
+    state_capacity = max(meta["state_capacity"], size + 2 * new_bytes + 1)
+    edge_capacity = max(meta["edge_capacity"], n_edges + 3 * new_bytes + 4)
+
+    meta["state"] = "dirty"                     # until the arrays are flushed again
+    _write_meta(directory, meta)
+    files = {"link": _open(directory, "link", (state_capacity,)),
+             "length": _open(directory, "length", (state_capacity,)),
+             "head": _open(directory, "head", (state_capacity,)),
+             "edges": _open(directory, "edges", (edge_capacity, 4))}
+    if not resumed:
+        # root state only
+        files["link"][0], files["length"][0], files["head"][0] = -1, 0, -1
+        np.full(TABLE_INITIAL, -1, dtype=np.int32).tofile(os.path.join(directory, "table.i32"))
+    table = _open(directory, "table", (meta["table_size"] or TABLE_INITIAL,))
+    size_last = np.array([size, meta["last"], n_edges], dtype=np.int64)
+
+    _, stop, closed, *grown = v4.lz_factor_run(
+        arr, 0, arr.shape[0], False, NO_LIMIT, np.asarray(files["edges"]), np.asarray(table),
+        np.asarray(files["head"]), np.asarray(files["link"]), np.asarray(files["length"]), size_last,
+        NO_LIMIT, np.zeros(0, dtype=np.int64), 1)
+    edges, table_out, head, link, length = grown
+    # the table is reallocated (rehashed) by the kernel when it doubles
+    files["table"] = table
+    for name, out in (("edges", edges), ("table", table_out), ("head", head), ("link", link),
+                      ("length", length)):
+        files[name].flush()
+        _store(directory, name, out, files[name])
+
+    meta.update(state="clean", seen=n, segments=segment_digests(raw, n, meta["segments"]),
+                start=start + int(stop), count=meta["count"] + int(closed),
+                size=int(size_last[0]), last=int(size_last[1]), edges=int(size_last[2]),
+                state_capacity=link.shape[0], edge_capacity=edges.shape[0], table_size=table_out.shape[0])
+    _write_meta(directory, meta)
+
+    count = meta["count"] + (1 if meta["start"] < n else 0)
+    info = {"resumed": resumed, "reason": reason, "new_bytes": new_bytes,
+            "elapsed": time.perf_counter() - t0}
+    return count, info
+
+
+def remove_checkpoint(path, checkpoint_dir=None):
+    shutil.rmtree(checkpoint_dir or checkpoint_dir_for(path), ignore_errors=True)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Resumable v4 Lempel-Ziv complexity of an append-only file.")
+    parser.add_argument("file")
+    parser.add_argument("--checkpoint", default=None, help="checkpoint directory")
+    parser.add_argument("--verify", default="full", choices=("full", "tail", "none"))
+    parser.add_argument("--reset", action="store_true", help="start from scratch")
+    args = parser.parse_args(argv)
+
+    startup = v4.warmup()
+    count, info = complexity_with_checkpoint(args.file, args.checkpoint, args.verify, args.reset)
+    print(f"Lempel-Ziv complexity (automaton) = {count}")
+    if info["resumed"]:
+        print(f"Resumed from the checkpoint: {info['new_bytes']} bytes processed")
+    else:
+        print(f"Computed from scratch ({info['reason']}): {info['new_bytes']} bytes processed")
+    print(f"\nStartup time (JIT compile / cache load): {startup:.6f} seconds")
+    print(f"Elapsed time: {info['elapsed']:.6f} seconds\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
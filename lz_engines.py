@@ -0,0 +1,345 @@
+#
+# lz_engines.py : one entry point for all the Lempel-Ziv engines of this folder
+#
+#   lz_complexity(data, engine="auto")
+#
+# Engines computing the same measure are interchangeable; "auto" picks the one
+# that is predicted to be fastest for the input length and alphabet size and
+# that fits in the available memory. Predictions come from a calibration table
+# measured on this host (calibrate()), or from built-in reference numbers.
+#
+#   measure "lz76"      : Kaspar-Schuster LZ76 (complexityLempelZiv)  -> v1, v2, v3, v6, bits
+#   measure "automaton" : factors matched against the consumed prefix -> v4-dense, v4-sparse
+#   measure "v5"        : lz_complexity_fast_numba of lempel-ziv-v5.py -> v5
+#   measure "lz78"      : LZ78 dictionary phrases (lempel-ziv-78.py)  -> lz78
+#
+
+import os, sys, json, time, platform
+from collections import namedtuple
+import numpy as np
+
+from lz_scripts import load_script
+
+Engine = namedtuple("Engine", "name measure script bytes_per_symbol run doc")
+
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "lempel-ziv")
+CALIBRATION_FILE = os.path.join(CACHE_DIR, "calibration.json")
+
+
+# -----------------------------------------------------------
+#   INPUT CONVERSION
+# -----------------------------------------------------------
+def as_symbols(data):
+    """
+    bytes / str / 1-D array-like -> 1-D NumPy symbol array (str is UTF-8 encoded)
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return np.frombuffer(data, dtype=np.uint8)
+    arr = np.ascontiguousarray(data)
+    if arr.ndim != 1:
+        raise ValueError(f"expected a 1-D sequence, got shape {arr.shape}")
+    return arr
+
+
+def as_bytes(arr):
+    """
+    Symbol array -> bytes for the byte-oriented engines (up to 256 distinct symbols).
+    """
+    if arr.dtype == np.uint8:
+        return arr.tobytes()
+    symbols, inverse = np.unique(arr, return_inverse=True)
+    if symbols.shape[0] > 256:
+        raise ValueError("byte-oriented engines support at most 256 distinct symbols")
+    return inverse.astype(np.uint8).tobytes()
+
+
+def alphabet_size(arr):
+    if arr.dtype == np.uint8:
+        return int(np.count_nonzero(np.bincount(arr, minlength=256)))
+    return int(np.unique(arr).shape[0])
+
+
+# -----------------------------------------------------------
+#   ENGINES
+# -----------------------------------------------------------
+NO_MEMORY_LIMIT = 1 << 62      # "auto" checks memory itself before choosing an engine
+
+def _run_v1(arr, m):
+    return int(load_script("lempel-ziv-v1.py").complexityLempelZiv(arr))
+
+def _run_v2(arr, m):
+    return int(load_script("lempel-ziv-v2.py").complexityLempelZiv(arr))
+
+def _run_bits(arr, m):
+    return load_script("lempel-ziv-bits.py").lz76_binary(arr)
+
+def _run_v3(arr, m):
+    return int(load_script("lempel-ziv-v3.py").lz76_complexity(arr))
+
+def _run_v6(arr, m):
+    return load_script("lempel-ziv-v6.py").lz76_complexity(arr)
+
+def _run_v4_dense(arr, m):
+    v4 = load_script("lempel-ziv-v4.py")
+    return v4.compute_lz_complexity_bytes(as_bytes(arr), memory_limit_bytes=NO_MEMORY_LIMIT,
+                                          transitions="dense", cache=False)[0]
+
+def _run_v4_sparse(arr, m):
+    v4 = load_script("lempel-ziv-v4.py")
+    return v4.compute_lz_complexity_bytes(as_bytes(arr), memory_limit_bytes=NO_MEMORY_LIMIT,
+                                          transitions="sparse", cache=False)[0]
+
+def _run_v5(arr, m):
+    return int(load_script("lempel-ziv-v5.py").lz_complexity_fast_numba(arr))
+
+def _run_lz78(arr, m):
+    v78 = load_script("lempel-ziv-78.py")
+    return v78.compute_lz78_complexity_bytes(as_bytes(arr), memory_limit_bytes=NO_MEMORY_LIMIT)[0]
+
+
+ENGINES = {e.name: e for e in (
+    # bytes_per_symbol: peak working memory per input symbol (m = alphabet size);
+    # inf = the engine does not support that alphabet, so "auto" never picks it
+    Engine("v1", "lz76", "lempel-ziv-v1.py", lambda m: 1, _run_v1,
+           "Kaspar-Schuster loop, Numba (original version, same result as v2)"),
+    Engine("v2", "lz76", "lempel-ziv-v2.py", lambda m: 1, _run_v2,
+           "Kaspar-Schuster loop, Numba; quadratic worst case, no extra memory"),
+    Engine("bits", "lz76", "lempel-ziv-bits.py", lambda m: 0.125 if m <= 2 else float("inf"), _run_bits,
+           "Kaspar-Schuster loop on 64 symbols per word, binary sequences only"),
+    Engine("v3", "lz76", "lempel-ziv-v3.py", lambda m: 48, _run_v3,
+           "suffix array + LCP + longest previous factor, O(N log N)"),
+    Engine("v6", "lz76", "lempel-ziv-v6.py", lambda m: 20, _run_v6,
+           "SA-IS suffix array + LCP + longest previous factor, O(N)"),
+    Engine("v4-dense", "automaton", "lempel-ziv-v4.py", lambda m: 8 * m + 20, _run_v4_dense,
+           "suffix automaton, dense (2N, m) transition table"),
+    Engine("v4-sparse", "automaton", "lempel-ziv-v4.py", lambda m: 130, _run_v4_sparse,
+           "suffix automaton, sparse hashed transitions"),
+    Engine("v5", "v5", "lempel-ziv-v5.py", lambda m: 1, _run_v5,
+           "lz_complexity_fast_numba of lempel-ziv-v5.py"),
+    Engine("lz78", "lz78", "lempel-ziv-78.py", lambda m: 24 if m > 16 else 4 * m + 12, _run_lz78,
+           "LZ78 phrase count, array-backed trie, O(N)"),
+)}
+
+# engines never chosen by "auto" (same result as a faster engine of their measure)
+AUTO_EXCLUDED = {"v1"}
+
+
+def list_engines(measure=None):
+    return [e for e in ENGINES.values() if measure is None or e.measure == measure]
+
+
+def warmup(engines=None):
+    """
+    Import the scripts of the given engines (default: all) and compile their
+    kernels, or load them from Numba's on-disk cache, before any timing.
+    Returns {script: seconds spent importing + warming up}.
+    """
+    times = {}
+    for name in engines or ENGINES:
+        script = ENGINES[name].script
+        if script not in times:
+            t0 = time.perf_counter()
+            load_script(script).warmup()
+            times[script] = time.perf_counter() - t0
+    return times
+
+
+# -----------------------------------------------------------
+#   CALIBRATION
+# -----------------------------------------------------------
+# Seconds on random input, per engine and alphabet size, as [[n, seconds], ...].
+# Reference numbers measured on the development machine (one core); run
+# calibrate() to replace them with measurements of this host.
+DEFAULT_CALIBRATION = {
+    "host": "reference",
+    "engines": {
+        "v2": {"2": [[4096, 0.0079], [32768, 0.41], [262144, 21.4]],
+               "64": [[4096, 0.0091], [32768, 0.43], [262144, 25.9]]},
+        "bits": {"2": [[4096, 0.0076], [32768, 0.38], [262144, 15.6]]},
+        "v3": {"2": [[4096, 0.0013], [32768, 0.0092], [262144, 0.11], [2097152, 2.11]],
+               "64": [[4096, 0.0011], [32768, 0.011], [262144, 0.11], [2097152, 1.75]]},
+        "v6": {"2": [[4096, 0.0006], [32768, 0.0038], [262144, 0.036], [2097152, 0.50]],
+               "64": [[4096, 0.0006], [32768, 0.0041], [262144, 0.038], [2097152, 0.53]]},
+        "v4-dense": {"2": [[4096, 0.0011], [32768, 0.0080], [262144, 0.11], [2097152, 1.54]],
+                     "64": [[4096, 0.0020], [32768, 0.021], [262144, 0.20], [2097152, 2.03]]},
+        "v4-sparse": {"2": [[4096, 0.0034], [32768, 0.049], [262144, 0.46], [2097152, 4.88]],
+                      "64": [[4096, 0.0034], [32768, 0.029], [262144, 0.39], [2097152, 4.50]]},
+        "v5": {"2": [[4096, 0.059], [32768, 3.78]],
+               "64": [[4096, 0.024], [32768, 1.59]]},
+        "lz78": {"2": [[4096, 0.00019], [32768, 0.00075], [262144, 0.0066], [2097152, 0.045]],
+                 "64": [[4096, 0.0003], [32768, 0.0016], [262144, 0.014], [2097152, 0.26]]},
+    },
+}
+
+CALIBRATION_SIZES = (1 << 12, 1 << 15, 1 << 18, 1 << 21)
+CALIBRATION_ALPHABETS = (2, 64)
+
+
+def calibrate(path=CALIBRATION_FILE, budget_seconds=1.0, seed=0, verbose=True):
+    """
+    Time every engine on random inputs of growing size (stopping an engine once
+    one run exceeds budget_seconds) and save the table as JSON in path.
+    """
+    rng = np.random.default_rng(seed)
+    table = {"host": platform.node(), "created": time.strftime("%Y-%m-%d %H:%M:%S"), "engines": {}}
+
+    for e in ENGINES.values():
+        if e.name in AUTO_EXCLUDED:
+            continue
+        per_alphabet = {}
+        for m in CALIBRATION_ALPHABETS:
+            if e.bytes_per_symbol(m) == float("inf"):
+                continue
+            e.run(rng.integers(0, m, 64, dtype=np.uint8), m)        # compile / warm up
+            points = []
+            for n in CALIBRATION_SIZES:
+                arr = rng.integers(0, m, n, dtype=np.uint8)
+                t0 = time.perf_counter()
+                e.run(arr, m)
+                elapsed = time.perf_counter() - t0
+                points.append([n, elapsed])
+                if verbose:
+                    print(f"  {e.name:10s} m={m:3d} n={n:9d} {elapsed:9.4f} s")
+                if elapsed > budget_seconds:
+                    break
+            per_alphabet[str(m)] = points
+        table["engines"][e.name] = per_alphabet
+
+    if path:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(table, f, indent=1)
+    return table
+
+
+def load_calibration(path=CALIBRATION_FILE):
+    """
+    Calibration table of this host if calibrate() was run, else the reference one.
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return DEFAULT_CALIBRATION
+
+
+def predict_seconds(table, engine, n, m):
+    """
+    Log-log interpolation of the calibration points of the closest alphabet size;
+    beyond the last point the slope of the last two points (at least linear) is used.
+    """
+    per_alphabet = table["engines"].get(engine)
+    if not per_alphabet:
+        return float("inf")
+    key = min(per_alphabet, key=lambda a: abs(np.log2(int(a)) - np.log2(max(m, 1))))
+    points = per_alphabet[key]
+
+    ns = np.log([p[0] for p in points])
+    ts = np.log([max(p[1], 1e-9) for p in points])
+    x = np.log(max(n, 1))
+    if len(points) == 1 or x <= ns[0]:
+        return float(np.exp(ts[0] + (x - ns[0])))
+    if x <= ns[-1]:
+        return float(np.exp(np.interp(x, ns, ts)))
+    slope = max(1.0, (ts[-1] - ts[-2]) / (ns[-1] - ns[-2]))
+    return float(np.exp(ts[-1] + slope * (x - ns[-1])))
+
+
+def available_memory():
+    """
+    Bytes of memory currently available (MemAvailable on Linux).
+    """
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return 1 << 62
+
+
+def select_engine(n, m, measure="lz76", table=None, memory_bytes=None):
+    """
+    Fastest engine of `measure` whose working memory fits in memory_bytes
+    (default: 80% of the available memory). Returns (name, predicted_seconds).
+    """
+    table = table or load_calibration()
+    if memory_bytes is None:
+        memory_bytes = 0.8 * available_memory()
+
+    candidates = [e for e in list_engines(measure) if e.name not in AUTO_EXCLUDED]
+    if not candidates:
+        raise ValueError(f"unknown measure {measure!r} "
+                         f"(use one of {sorted({e.measure for e in ENGINES.values()})})")
+
+    fitting = [e for e in candidates if n * e.bytes_per_symbol(m) <= memory_bytes]
+    if not fitting:
+        raise MemoryError(f"no {measure} engine fits in {memory_bytes/1e9:.3f} GB for N={n}, m={m}")
+
+    best = min(fitting, key=lambda e: predict_seconds(table, e.name, n, m))
+    return best.name, predict_seconds(table, best.name, n, m)
+
+
+# -----------------------------------------------------------
+#   ENTRY POINT
+# -----------------------------------------------------------
+def lz_complexity(data, engine="auto", measure="lz76", table=None, cache=None):
+    """
+    data: bytes, str or 1-D symbol array
+    engine: "auto" or one of ENGINES (v1, v2, bits, v3, v6, v4-dense, v4-sparse, v5, lz78)
+    measure: which complexity "auto" must compute ("lz76", "automaton", "v5", "lz78");
+             ignored when an engine is named
+    cache: lz_cache.ResultCache to consult, False for none
+           (default: the one enabled by LEMPEL_ZIV_CACHE, see lz_cache.py)
+    Returns: complexity (0 for empty input)
+    """
+    arr = as_symbols(data)
+    n = arr.shape[0]
+    if n == 0:
+        return 0
+
+    m = alphabet_size(arr)
+    if engine == "auto":
+        engine, _ = select_engine(n, m, measure, table)
+    elif engine not in ENGINES:
+        raise ValueError(f"unknown engine {engine!r} (use 'auto' or one of {sorted(ENGINES)})")
+
+    import lz_cache
+    store = lz_cache.resolve(cache)
+    if store is None:
+        return ENGINES[engine].run(arr, m)
+    params = {"measure": ENGINES[engine].measure}
+    if arr.dtype != np.uint8:
+        params["dtype"] = arr.dtype.str
+    return store.memoize(arr, engine, lambda: ENGINES[engine].run(arr, m), params)
+
+
+if __name__ == "__main__":
+    # use:   python lz_engines.py calibrate
+    #        python lz_engines.py FILE [engine] [measure]
+    if len(sys.argv) > 1 and sys.argv[1] == "calibrate":
+        calibrate()
+        print(f"\nCalibration saved in {CALIBRATION_FILE}")
+    elif len(sys.argv) > 1:
+        with open(sys.argv[1], "rb") as f:
+            raw = f.read()
+        engine = sys.argv[2] if len(sys.argv) > 2 else "auto"
+        measure = sys.argv[3] if len(sys.argv) > 3 else "lz76"
+        if engine == "auto":
+            arr = as_symbols(raw)
+            engine = select_engine(arr.shape[0], alphabet_size(arr), measure)[0]
+            print("engine:", engine)
+        startup = sum(warmup([engine]).values()) if engine in ENGINES else 0.0
+        print(f"Startup time (import + JIT compile / cache load): {startup:.6f} seconds")
+        t0 = time.perf_counter()
+        c = lz_complexity(raw, engine, measure)
+        print(f"Lempel-Ziv complexity = {c}")
+        print(f"Elapsed time: {time.perf_counter() - t0:.6f} seconds")
+    else:
+        print("use: python lz_engines.py calibrate | FILE [engine] [measure]")
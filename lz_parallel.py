@@ -0,0 +1,318 @@
+#
+# lz_parallel.py : the factor count of lempel-ziv-v4.py (lz_factor_count) on one
+#                  input, with the factorization spread over Numba threads
+#
+# lz_factor_count grows the automaton of the consumed prefix while it matches the
+# next factor against it, so it is sequential by construction. Here the suffix
+# automaton is built once for the whole input, and every state keeps the end of
+# its first occurrence (firstend): the factor starting at i is the longest s[i:j]
+# whose state has firstend < i (it occurs inside s[:i]) plus one symbol, which
+# any thread can compute for any i.
+#
+#   1. build     : automaton of the whole input (v4's sa_extend) + firstend
+#   2. speculate : the input is cut in chunks and every thread factorizes its
+#                  chunks starting from the chunk start, marking the factor starts
+#   3. stitch    : the true factorization enters chunk k at some position; it is
+#                  followed from there until it meets a marked start, after which
+#                  it is the speculative one (same start, same factors), so the
+#                  rest of the chunk's count is reused
+#
+# The count is exactly lz_factor_count's. The transitions live in the dense
+# (2n, m) table when it fits in memory_limit_bytes, else in v4's sparse hashed
+# store (~130 bytes per symbol instead of 8*m + 20).
+#
+# Only 2 and 3 run in parallel: the build (1) is sequential (every sa_extend
+# depends on the previous one) and costs about as much as lz_factor_count
+# itself, so the total speedup is capped at (build + factorize) / build whatever
+# the number of threads (e.g. 2M random symbols: build 0.91 s, factorize 0.15 s
+# -> at most ~1.2x). On the sparse store the build and the hashed lookups are
+# slower than the sequential count (~0.3x of it), and one thread gains nothing:
+# in those cases lz_factor_count_parallel() runs v4's sequential count instead
+# and says so (parallel=False, reason), unless force=True. Beating the sequential
+# count on one huge input would need an index built in parallel (e.g. a suffix
+# array answering "longest match whose source ends before i"), not this one.
+# benchmark_scaling() prints the cap next to the measured speedups.
+#
+# Positions, states and transitions are int32 (as in v4): inputs longer than
+# MAX_SYMBOLS (2n states, up to 3n transitions) are refused with a ValueError.
+#
+# use:   python lz_parallel.py [n] [alphabet] [max_threads]       (scaling benchmark)
+#
+
+import sys, time
+from collections import namedtuple
+import numpy as np
+import numba
+from numba import njit, prange
+
+from lz_scripts import load_script
+
+v4 = load_script("lempel-ziv-v4.py")
+
+MIN_CHUNK = 1 << 16
+CHUNKS_PER_THREAD = 4
+MAX_SYMBOLS = (2**31 - 1) // 3  # int32 states (2n) and sparse transitions (3n)
+
+ParallelCount = namedtuple("ParallelCount", "count parallel build_seconds factor_seconds reason")
+
+
+# -----------------------------------------------------------
+#   1. AUTOMATON OF THE WHOLE INPUT, WITH FIRST OCCURRENCES
+# -----------------------------------------------------------
+@njit(cache=True)
+def propagate_firstend(link, length, firstend, size, n):
+    """
+    A clone occurs where the states below it in the suffix-link tree occur:
+    push the minimum up, longest states first (counting sort on length).
+    """
+    count = np.zeros(n + 2, dtype=np.int64)
+    for v in range(size):
+        count[length[v] + 1] += 1
+    for k in range(1, n + 2):
+        count[k] += count[k - 1]
+    order = np.empty(size, dtype=np.int32)
+    for v in range(size):
+        order[count[length[v]]] = v
+        count[length[v]] += 1
+    for k in range(size - 1, 0, -1):
+        v = order[k]
+        if firstend[v] < firstend[link[v]]:
+            firstend[link[v]] = firstend[v]
+
+
+@njit(cache=True)
+def build_automaton(arr, next_arr, link, length, firstend):
+    """
+    Suffix automaton of arr (dense transitions). firstend[v] = end position of the
+    first occurrence of the strings of state v. Returns the number of states.
+    """
+    n = arr.shape[0]
+    size_last = np.zeros(2, dtype=np.int32)
+    size_last[0] = 1
+    firstend[:] = n
+    for i in range(n):
+        v4.sa_extend(arr[i], next_arr, link, length, size_last)
+        firstend[size_last[1]] = i            # the state of the prefix s[:i+1]
+    size = size_last[0]
+    propagate_firstend(link, length, firstend, size, n)
+    return size
+
+
+@njit(cache=True)
+def build_automaton_sparse(arr, edges, table, head, link, length, size_last, firstend,
+                           memory_limit_bytes):
+    """
+    build_automaton() on v4's sparse edge store (the state arrays grow as needed).
+    Returns (ok, edges, table, head, link, length); ok is False past memory_limit_bytes.
+    """
+    n = arr.shape[0]
+    firstend[:] = n
+    for i in range(n):
+        ok, edges, table, head, link, length = v4.sa_extend_grow(
+            arr[i], edges, table, head, link, length, size_last, memory_limit_bytes)
+        if not ok:
+            return False, edges, table, head, link, length
+        firstend[size_last[1]] = i
+    propagate_firstend(link, length, firstend, size_last[0], n)
+    return True, edges, table, head, link, length
+
+
+@njit(inline="always")
+def _transition(v, ch, next_arr, edges, table, sparse):
+    if sparse:
+        return edges[v4.find_edge(edges, table, v, ch), v4.EDGE_DST]
+    return next_arr[v, ch]
+
+
+@njit(cache=True, nogil=True)
+def next_start(arr, i, next_arr, edges, table, sparse, firstend):
+    """
+    Start of the factor after the one starting at i (n when it reaches the end).
+    The transitions are next_arr (dense) or edges / table (sparse).
+    """
+    n = arr.shape[0]
+    v = 0
+    j = i
+    while j < n:
+        nxt = _transition(v, arr[j], next_arr, edges, table, sparse)   # always there: s[i:j+1] occurs in s
+        if firstend[nxt] >= i:                 # not inside s[:i]
+            break
+        v = nxt
+        j += 1
+    return n if j == n else j + 1
+
+
+# -----------------------------------------------------------
+#   2. SPECULATION, 3. STITCHING
+# -----------------------------------------------------------
+@njit(cache=True, parallel=True)
+def speculate(arr, next_arr, edges, table, sparse, firstend, bounds, mark, counts, exits):
+    for k in prange(bounds.shape[0] - 1):
+        p = bounds[k]
+        hi = bounds[k + 1]
+        c = 0
+        while p < hi:
+            mark[p] = 1
+            c += 1
+            p = next_start(arr, p, next_arr, edges, table, sparse, firstend)
+        counts[k] = c
+        exits[k] = p
+
+
+@njit(cache=True)
+def stitch(arr, next_arr, edges, table, sparse, firstend, bounds, mark, counts, exits):
+    total = 0
+    p = 0
+    for k in range(bounds.shape[0] - 1):
+        hi = bounds[k + 1]
+        # follow the true factorization until it meets the speculative one
+        while p < hi and mark[p] == 0:
+            total += 1
+            p = next_start(arr, p, next_arr, edges, table, sparse, firstend)
+        if p < hi:
+            before = 0
+            for q in range(bounds[k], p):
+                before += mark[q]
+            total += counts[k] - before
+            p = exits[k]
+    return total
+
+
+def lz_factor_count_parallel(raw, threads=None, chunks=None, memory_limit_bytes=1_000_000_000,
+                             transitions="auto", force=False):
+    """
+    raw: input bytes
+    threads: Numba threads for the factorization (default: all)
+    chunks: speculative chunks (default: CHUNKS_PER_THREAD per thread, at least MIN_CHUNK bytes each)
+    transitions: "dense", "sparse" or "auto" (dense while it fits in memory_limit_bytes)
+    force: run the speculative factorization even where it cannot beat lz_factor_count
+           (sparse transitions, one thread)
+    Returns: ParallelCount(count, parallel, build_seconds, factor_seconds, reason) with
+             count = compute_lz_complexity_bytes(raw)[0]. parallel is False when v4's
+             sequential count ran instead (its time in factor_seconds, reason says why).
+             Only factor_seconds shrinks with more threads (the build is sequential).
+    """
+    n = len(raw)
+    if n == 0:
+        return ParallelCount(0, False, 0.0, 0.0, "empty input")
+    if n > MAX_SYMBOLS:
+        raise ValueError(f"input of {n} symbols: the int32 automaton holds at most {MAX_SYMBOLS}")
+    m = int(np.count_nonzero(np.bincount(np.frombuffer(raw, dtype=np.uint8), minlength=256)))
+
+    max_states = 2 * n
+    est_bytes = max_states * (4 * m + 12) + 9 * n
+    if transitions == "auto":
+        transitions = "dense" if est_bytes <= memory_limit_bytes else "sparse"
+    if transitions not in ("dense", "sparse"):
+        raise ValueError(f"unknown transitions mode {transitions!r} (use 'dense', 'sparse' or 'auto')")
+    if transitions == "dense" and est_bytes > memory_limit_bytes:
+        raise MemoryError(
+            f"Estimated memory for the automaton is {est_bytes/1e9:.3f} GB "
+            f"(limit {memory_limit_bytes/1e9:.3f} GB); use transitions='sparse' instead.")
+
+    reason = None
+    if transitions == "sparse":
+        reason = "sparse transitions: the speculative count is slower than the sequential one"
+    elif (threads or numba.get_num_threads()) == 1:
+        reason = "one thread: nothing to run in parallel"
+    if reason is not None and not force:
+        t0 = time.perf_counter()
+        count, _ = v4.compute_lz_complexity_bytes(raw, memory_limit_bytes, transitions, cache=False)
+        return ParallelCount(count, False, 0.0, time.perf_counter() - t0, reason)
+
+    map256, _ = v4.build_byte_mapping(raw)
+    arr = map256[np.frombuffer(raw, dtype=np.uint8)]
+    t0 = time.perf_counter()
+    firstend = np.empty(max_states, dtype=np.int32)
+    sparse = transitions == "sparse"
+    if sparse:
+        edges, table, head, link, length, size_last = v4.new_sparse_automaton()
+        ok, edges, table, head, link, length = build_automaton_sparse(
+            arr, edges, table, head, link, length, size_last, firstend, memory_limit_bytes)
+        if not ok:
+            raise MemoryError(
+                f"Sparse transition store exceeded memory_limit_bytes "
+                f"({memory_limit_bytes/1e9:.3f} GB) after {int(size_last[0])} states.")
+        del head, link, length
+        next_arr = np.zeros((0, 0), dtype=np.int32)
+    else:
+        next_arr = np.full((max_states, m), -1, dtype=np.int32)
+        link = np.full(max_states, -1, dtype=np.int32)
+        length = np.zeros(max_states, dtype=np.int32)
+        build_automaton(arr, next_arr, link, length, firstend)
+        del link, length
+        edges = np.zeros((0, 4), dtype=np.int32)
+        table = np.full(1, -1, dtype=np.int32)
+    t_build = time.perf_counter() - t0
+
+    previous = numba.get_num_threads()
+    if threads is not None:
+        numba.set_num_threads(threads)
+    try:
+        t0 = time.perf_counter()
+        if chunks is None:
+            chunks = CHUNKS_PER_THREAD * numba.get_num_threads()
+        chunks = max(1, min(chunks, n // MIN_CHUNK))
+        bounds = np.linspace(0, n, chunks + 1).astype(np.int64)
+        mark = np.zeros(n, dtype=np.uint8)
+        counts = np.zeros(chunks, dtype=np.int64)
+        exits = np.zeros(chunks, dtype=np.int64)
+        speculate(arr, next_arr, edges, table, sparse, firstend, bounds, mark, counts, exits)
+        count = stitch(arr, next_arr, edges, table, sparse, firstend, bounds, mark, counts, exits)
+        t_factor = time.perf_counter() - t0
+    finally:
+        numba.set_num_threads(previous)
+    return ParallelCount(int(count), True, t_build, t_factor, reason)
+
+
+def warmup():
+    """
+    Compile (or load from the on-disk cache) the kernels. Returns the seconds spent.
+    """
+    t0 = time.perf_counter()
+    lz_factor_count_parallel(b"abcab", transitions="dense", force=True)
+    lz_factor_count_parallel(b"abcab", transitions="sparse", force=True)
+    return time.perf_counter() - t0
+
+
+# -----------------------------------------------------------
+#   SCALING BENCHMARK
+# -----------------------------------------------------------
+def benchmark_scaling(n=4_000_000, alphabet=4, max_threads=64, seed=0, transitions="auto"):
+    """
+    Factorization time with 1, 2, 4, ... max_threads threads (capped at the
+    threads Numba can start) on a random input, checked against lz_factor_count.
+    The speculative path is forced (force=True) to measure it even where it loses.
+    The total speedup is bounded by the sequential build: the cap is printed too.
+    """
+    rng = np.random.default_rng(seed)
+    raw = rng.integers(0, alphabet, n, dtype=np.uint8).tobytes()
+    v4.warmup()
+    warmup()
+
+    t0 = time.perf_counter()
+    expected, _ = v4.compute_lz_complexity_bytes(raw, memory_limit_bytes=1 << 62, transitions="dense")
+    t_seq = time.perf_counter() - t0
+    print(f"N={n}, alphabet={alphabet}: sequential lz_factor_count {t_seq:.3f} s, count {expected}")
+
+    available = numba.config.NUMBA_NUM_THREADS
+    threads = [t for t in (1, 2, 4, 8, 16, 32, 64) if t <= min(max_threads, available)]
+    if max_threads > available:
+        print(f"(Numba can start {available} threads on this host: NUMBA_NUM_THREADS)")
+    base = None
+    for t in threads:
+        count, _, t_build, t_factor, _ = lz_factor_count_parallel(
+            raw, threads=t, memory_limit_bytes=1 << 62, transitions=transitions, force=True)
+        base = base or t_factor
+        status = "ok" if count == expected else f"MISMATCH ({count})"
+        total = t_build + t_factor
+        print(f"threads {t:3d}: build {t_build:8.3f} s  factorize {t_factor:8.3f} s "
+              f"({base / t_factor:5.2f}x)  total {total:8.3f} s ({t_seq / total:5.2f}x sequential)  {status}")
+    print(f"serial build: at most {t_seq / t_build:.2f}x over the sequential lz_factor_count "
+          f"with any number of threads")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:4]]
+    import lz_parallel              # the cached kernels belong to this name, not "__main__"
+    lz_parallel.benchmark_scaling(*args)
@@ -0,0 +1,152 @@
+#
+# lz_pci.py : spatiotemporal Lempel-Ziv complexity of binary channels x time matrices
+#             (the Perturbational Complexity Index of Casali et al. 2013)
+#
+#   LZc  = complexityLempelZiv of the matrix read column by column (time-major:
+#          all channels at t = 0, then all channels at t = 1, ...), the same
+#          concatenation diff-iit-zip makes of the states (A, B, C)
+#   PCI  = LZc * log2(L) / (L * H(p1)),  L = channels * time,
+#          H = source entropy of the fraction p1 of ones (binary entropy)
+#   per-channel LZ = complexityLempelZiv of every row
+#
+# Matrices may carry a leading trials axis, (trials, channels, time): every
+# trial is computed by lz_batch's threaded kernel, with no Python loop over trials.
+# Very large single matrices can use the bit-packed engine (engine="bits"), which
+# packs the time-major sequence in blocks without building it as uint8.
+#
+
+import sys
+from collections import namedtuple
+import numpy as np
+
+from lz_scripts import load_script
+
+PACK_BLOCK_SYMBOLS = 1 << 24
+
+PCIResult = namedtuple("PCIResult", "lzc pci p1 entropy channel_lz")
+
+
+def _check_binary(bits):
+    bits = np.asarray(bits)
+    if bits.ndim not in (2, 3):
+        raise ValueError(f"expected a (channels, time) or (trials, channels, time) array, got shape {bits.shape}")
+    if bits.dtype != np.bool_:
+        if bits.dtype != np.uint8:
+            bits = bits.astype(np.uint8)
+        if bits.size and bits.max() > 1:
+            raise ValueError("expected a binary matrix (0/1); see lz_symbolize.binarize()")
+    return bits.view(np.uint8)
+
+
+# -----------------------------------------------------------
+#   SEQUENCES
+# -----------------------------------------------------------
+def time_major(bits):
+    """
+    (..., channels, time) -> (..., channels * time) read column by column.
+    """
+    bits = np.asarray(bits)
+    return np.ascontiguousarray(np.swapaxes(bits, -1, -2)).reshape(bits.shape[:-2] + (-1,))
+
+
+def pack_time_major(bits, block_symbols=PACK_BLOCK_SYMBOLS):
+    """
+    (channels, time) binary matrix -> (words, n) for lempel-ziv-bits.py, built
+    block by block (memory: the packed output plus one block).
+    """
+    channels, T = bits.shape
+    n = channels * T
+    words = np.zeros((n + 63) // 64 + 1, dtype=np.uint64)
+    out = words.view(np.uint8)
+    # whole bytes per block: a multiple of 8 time steps
+    step = max(8, (block_symbols // max(channels, 1)) // 8 * 8)
+    pos = 0
+    for t0 in range(0, T, step):
+        packed = np.packbits(bits[:, t0:t0 + step].T.ravel(), bitorder="little")
+        out[pos:pos + packed.shape[0]] = packed
+        pos += packed.shape[0]
+    if sys.byteorder != "little":
+        words.byteswap(inplace=True)
+    return words, n
+
+
+# -----------------------------------------------------------
+#   COMPLEXITIES
+# -----------------------------------------------------------
+def lz_spatiotemporal(bits, engine="ks", threads=None):
+    """
+    LZc of the time-major concatenation: an int for a (channels, time) matrix,
+    an int64 array for (trials, channels, time).
+    engine: "ks" (complexityLempelZiv, threaded over trials) or
+            "bits" (bit-packed engine, one matrix at a time, 1 bit per sample)
+    """
+    bits = _check_binary(bits)
+    single = bits.ndim == 2
+    if engine == "bits":
+        packed = load_script("lempel-ziv-bits.py")
+        trials = bits[None] if single else bits
+        out = np.array([packed.complexity_packed(*pack_time_major(m)) for m in trials], dtype=np.int64)
+    elif engine == "ks":
+        from lz_batch import lz_complexity_batch
+        seqs = time_major(bits[None] if single else bits)
+        out = lz_complexity_batch(seqs, threads=threads)
+    else:
+        raise ValueError(f"unknown engine {engine!r} (use 'ks' or 'bits')")
+    return int(out[0]) if single else out
+
+
+def channel_lz(bits, threads=None):
+    """
+    complexityLempelZiv of every channel: shape (channels,) or (trials, channels).
+    """
+    from lz_batch import lz_complexity_batch
+
+    bits = _check_binary(bits)
+    rows = np.ascontiguousarray(bits).reshape(-1, bits.shape[-1])
+    return lz_complexity_batch(rows, threads=threads).reshape(bits.shape[:-1])
+
+
+def source_entropy(p1):
+    """
+    Binary entropy in bits of the fraction of ones (0 for constant matrices).
+    """
+    p = np.clip(np.asarray(p1, dtype=np.float64), 0.0, 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        h = -(p * np.log2(p) + (1 - p) * np.log2(1 - p))
+    return np.where((p > 0) & (p < 1), h, 0.0)
+
+
+def pci_normalize(lzc, n, p1):
+    """
+    LZc * log2(n) / (n * H(p1)); 0 where the entropy is 0.
+    """
+    h = source_entropy(p1)
+    lzc = np.asarray(lzc, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = lzc * np.log2(max(n, 2)) / (n * h)
+    return np.where(h > 0, score, 0.0)
+
+
+def pci(bits, engine="ks", per_channel=True, threads=None):
+    """
+    bits: binary (channels, time) or (trials, channels, time) matrix
+    Returns: PCIResult(lzc, pci, p1, entropy, channel_lz), scalars for one
+             matrix, arrays over the trials otherwise (channel_lz None if not per_channel)
+    """
+    bits = _check_binary(bits)
+    n = bits.shape[-1] * bits.shape[-2]
+    p1 = np.count_nonzero(bits, axis=(-2, -1)) / max(n, 1)
+    lzc = lz_spatiotemporal(bits, engine, threads)
+    score = pci_normalize(lzc, n, p1)
+    entropy = source_entropy(p1)
+    per = channel_lz(bits, threads) if per_channel else None
+    if bits.ndim == 2:
+        return PCIResult(lzc, float(score), float(p1), float(entropy), per)
+    return PCIResult(lzc, score, p1, entropy, per)
+
+
+if __name__ == "__main__":
+    # use:   python lz_pci.py FILE.npy [engine]      (binary channels x time, or trials x channels x time)
+    r = pci(np.load(sys.argv[1]), sys.argv[2] if len(sys.argv) > 2 else "ks")
+    print(f"LZc = {r.lzc}\nPCI = {r.pci}\np1  = {r.p1}\nH   = {r.entropy}")
+    print(f"per-channel LZ = {r.channel_lz}")
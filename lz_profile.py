@@ -0,0 +1,237 @@
+#
+# lz_profile.py : opt-in profiling of the engines (phase times, peak memory, kernel counters)
+#
+#   count, stats = profile_v4(raw)          # compute_lz_complexity_bytes, phase by phase
+#   count, stats = profile_lz76(raw)        # complexityLempelZiv
+#   count, stats = profile(raw, "v6")       # any engine of lz_engines (times + memory only)
+#   json.dumps(stats.to_dict())
+#
+# Phases are wall times (time.perf_counter): "compile" is the Numba compilation
+# or cache load of the engine in this process (0 once it is loaded), then the
+# phases of the engine itself (for v4: build_byte_mapping, allocation,
+# lz_factor_count). Memory is the resident set size, sampled by a thread every
+# sample_interval seconds while the engine runs, plus the kernel's own counters:
+#
+#   sa_extend           : states created, clones, suffix-link steps (transitions
+#                         added or redirected), transitions copied into clones
+#                         (m cells each with dense transitions, the real edges with sparse ones)
+#   lz_factor_count     : transitions followed while matching the factors
+#   complexityLempelZiv : symbol comparisons, match-extension steps
+#
+# The counters are kept by the engines' own kernels (lempel-ziv-v4.py, -v2.py),
+# which take an optional counters array: without it Numba compiles them with the
+# counting removed, so nothing costs anything unless a profile is asked for.
+# With counters=True the timed phase is the counting version of the kernel
+# (one pass, a few percent slower); counters=False times the plain one.
+#
+# use:   python lz_profile.py FILE [engine]        (v4-dense, v4-sparse, v2, or any engine)
+#
+
+import os, sys, json, time, threading, resource
+import numpy as np
+
+from lz_scripts import load_script
+
+SAMPLE_INTERVAL = 0.005
+
+
+# -----------------------------------------------------------
+#   STATS
+# -----------------------------------------------------------
+class ProfileStats:
+    """
+    stats.phases   : {phase: seconds}, in execution order
+    stats.counters : {counter: value}
+    stats.peak_rss_bytes / base_rss_bytes : sampled resident set size
+    """
+
+    def __init__(self, engine, n):
+        self.engine = engine
+        self.n = n
+        self.phases = {}
+        self.counters = {}
+        self.base_rss_bytes = None
+        self.peak_rss_bytes = None
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def total_seconds(self):
+        return sum(self.phases.values())
+
+    def to_dict(self):
+        return {"engine": self.engine, "n": self.n, "phases": dict(self.phases),
+                "total_seconds": self.total_seconds(), "counters": dict(self.counters),
+                "base_rss_bytes": self.base_rss_bytes, "peak_rss_bytes": self.peak_rss_bytes}
+
+    def report(self):
+        lines = [f"{self.engine}: {self.n} symbols"]
+        total = self.total_seconds()
+        for name, s in self.phases.items():
+            share = f"{100 * s / total:5.1f}%" if total > 0 else "      "
+            lines.append(f"  {name:24s} {s:12.6f} s  {share}")
+        if self.peak_rss_bytes is not None:
+            lines.append(f"  {'peak RSS':24s} {self.peak_rss_bytes / 2**20:12.1f} MB "
+                         f"(+{(self.peak_rss_bytes - self.base_rss_bytes) / 2**20:.1f} MB)")
+        for name, value in self.counters.items():
+            lines.append(f"  {name:24s} {value:12d}")
+        return "\n".join(lines)
+
+
+class _Phase:
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.phases[self.name] = self.stats.phases.get(self.name, 0.0) + time.perf_counter() - self.t0
+
+
+# -----------------------------------------------------------
+#   MEMORY SAMPLING
+# -----------------------------------------------------------
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes():
+    """
+    Current resident set size (Linux /proc), else the peak so far (getrusage).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is in KB on Linux, in bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+
+
+class MemorySampler:
+    """
+    with MemorySampler(stats): ...   -> stats.base_rss_bytes, stats.peak_rss_bytes
+    """
+
+    def __init__(self, stats, interval=SAMPLE_INTERVAL):
+        self.stats = stats
+        self.interval = interval
+        self.stop = threading.Event()
+
+    def _run(self):
+        while not self.stop.wait(self.interval):
+            self.peak = max(self.peak, rss_bytes())
+
+    def __enter__(self):
+        self.base = self.peak = rss_bytes()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.thread.join()
+        self.peak = max(self.peak, rss_bytes())
+        if self.stats.base_rss_bytes is None:
+            self.stats.base_rss_bytes = self.base
+        self.stats.peak_rss_bytes = max(self.peak, self.stats.peak_rss_bytes or 0)
+
+
+# -----------------------------------------------------------
+#   PROFILES
+# -----------------------------------------------------------
+def _compile_phase(stats, warm):
+    # first use in this process: compilation or on-disk cache load
+    with stats.phase("compile"):
+        warm()
+
+
+def profile_v4(raw, transitions="dense", memory_limit_bytes=1_000_000_000, counters=True,
+               sample_interval=SAMPLE_INTERVAL):
+    """
+    compute_lz_complexity_bytes(raw) (dense or sparse transitions) with its phases
+    timed, peak memory sampled and (counters=True) the counters of its kernels.
+    Returns: (count, ProfileStats)
+    """
+    v4 = load_script("lempel-ziv-v4.py")
+    stats = ProfileStats("v4-" + transitions, len(raw))
+    c = np.zeros(len(v4.COUNTERS), dtype=np.int64) if counters else None
+    _compile_phase(stats, lambda: _warm_v4(v4, transitions, c))
+
+    timings = {}
+    with MemorySampler(stats, sample_interval):
+        count, _ = v4.compute_lz_complexity_bytes(raw, memory_limit_bytes, transitions,
+                                                  cache=False, timings=timings, counters=c)
+    stats.phases.update(timings)
+    if c is not None:
+        stats.counters = dict(zip(v4.COUNTERS, c.tolist()))
+    return count, stats
+
+
+def profile_lz76(data, counters=True, sample_interval=SAMPLE_INTERVAL):
+    """
+    complexityLempelZiv(data) timed and memory-sampled, plus (counters=True) its counters.
+    Returns: (count, ProfileStats)
+    """
+    import lz_engines
+    v2 = load_script("lempel-ziv-v2.py")
+    arr = lz_engines.as_symbols(data)
+    stats = ProfileStats("v2", arr.shape[0])
+    c = np.zeros(len(v2.COUNTERS), dtype=np.int64) if counters else None
+    _compile_phase(stats, lambda: _warm_lz76(v2, arr, c))
+
+    with MemorySampler(stats, sample_interval):
+        with stats.phase("complexityLempelZiv"):
+            count = int(v2.complexityLempelZiv(arr, c))
+    if c is not None:
+        stats.counters = dict(zip(v2.COUNTERS, c.tolist()))
+    return count, stats
+
+
+def _warm_v4(v4, transitions, c):
+    v4.warmup()
+    # the counting specialization of the kernels is compiled apart from the plain one
+    if c is not None:
+        v4.compute_lz_complexity_bytes(b"abcab", transitions=transitions, cache=False, counters=c.copy())
+
+
+def _warm_lz76(v2, arr, c):
+    v2.warmup()
+    if c is not None:
+        v2.complexityLempelZiv(arr[:2], c.copy())
+
+
+def profile(data, engine, counters=True, sample_interval=SAMPLE_INTERVAL):
+    """
+    Profile of one lz_engines engine: the v4 and v2 engines phase by phase with
+    counters, the others as compile + run. Returns: (count, ProfileStats)
+    """
+    import lz_engines
+    if engine in ("v4-dense", "v4-sparse"):
+        raw = lz_engines.as_bytes(lz_engines.as_symbols(data))
+        return profile_v4(raw, engine[3:], lz_engines.NO_MEMORY_LIMIT, counters, sample_interval)
+    if engine == "v2":
+        return profile_lz76(data, counters, sample_interval)
+    if engine not in lz_engines.ENGINES:
+        raise ValueError(f"unknown engine {engine!r} (use one of {sorted(lz_engines.ENGINES)})")
+
+    arr = lz_engines.as_symbols(data)
+    stats = ProfileStats(engine, arr.shape[0])
+    _compile_phase(stats, lambda: lz_engines.warmup([engine]))
+    with MemorySampler(stats, sample_interval):
+        with stats.phase("run"):
+            count = int(lz_engines.lz_complexity(arr, engine, cache=False))
+    return count, stats
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("use: python lz_profile.py FILE [engine]")
+        sys.exit(1)
+    with open(sys.argv[1], "rb") as f:
+        raw = f.read()
+    count, stats = profile(raw, sys.argv[2] if len(sys.argv) > 2 else "v4-dense")
+    print(f"Lempel-Ziv complexity = {count}\n")
+    print(stats.report())
@@ -0,0 +1,116 @@
+#
+# lz_psi.py : streaming estimate of the simplified ψ of diff-iit-zip (H_total - H_parts)
+#
+#   H_parts = sum over the units of the binary entropy of their fraction of 1s
+#   H_total = entropy of the joint states seen so far
+#   ψ       = H_total - H_parts
+#
+# Running counts instead of np.unique on every prefix: the joint state is coded
+# as an integer (unit 0 = most significant bit, as lz_symbolize.pack_states) and
+# H_total is kept through S = Σ c·log2(c) over the joint counts,
+#   H_total(t) = log2(t) - S / t
+# so a step costs O(units), O(1) in the length of the sequence.
+#
+
+import sys, math
+import numpy as np
+from numba import njit
+
+MAX_UNITS = 24          # 2**24 joint counts = 128 MB
+
+
+def state_codes(states):
+    """
+    (time, units) binary states -> int64 code of every joint state.
+    """
+    states = np.asarray(states, dtype=np.uint8)
+    if states.ndim != 2 or not 1 <= states.shape[1] <= MAX_UNITS:
+        raise ValueError(f"expected a (time, units <= {MAX_UNITS}) array of binary states")
+    weights = np.int64(1) << np.arange(states.shape[1] - 1, -1, -1, dtype=np.int64)
+    return states.astype(np.int64) @ weights
+
+
+# -----------------------------------------------------------
+#   KERNEL: the whole curve in one pass
+# -----------------------------------------------------------
+@njit(cache=True)
+def xlog2x(c):
+    return c * math.log2(c) if c > 0 else 0.0
+
+
+@njit(cache=True)
+def psi_kernel(states, codes, n_codes):
+    T, U = states.shape
+    counts = np.zeros(n_codes, dtype=np.int64)
+    ones = np.zeros(U, dtype=np.int64)
+    h_parts = np.empty(T)
+    h_total = np.empty(T)
+    s = 0.0
+    for t in range(T):
+        n = t + 1
+        c = counts[codes[t]]
+        s += xlog2x(c + 1) - xlog2x(c)
+        counts[codes[t]] = c + 1
+        h_total[t] = max(math.log2(n) - s / n, 0.0)
+
+        h = 0.0
+        for k in range(U):
+            ones[k] += states[t, k]
+            if 0 < ones[k] < n:
+                p = ones[k] / n
+                h -= p * math.log2(p) + (1 - p) * math.log2(1 - p)
+        h_parts[t] = h
+    return h_parts, h_total
+
+
+def psi_curve(states):
+    """
+    states: (time, units) binary states (list of tuples or array)
+    Returns: (H_parts, H_total, psi) float64 arrays, element t-1 = value on the first t states
+    """
+    states = np.ascontiguousarray(states, dtype=np.uint8)
+    codes = state_codes(states)
+    h_parts, h_total = psi_kernel(states, codes, 1 << states.shape[1])
+    return h_parts, h_total, h_total - h_parts
+
+
+# -----------------------------------------------------------
+#   STREAMING: one state at a time
+# -----------------------------------------------------------
+class PsiEstimator:
+    """
+    est = PsiEstimator(units); est.update(state) -> (H_parts, H_total, psi) of the states so far.
+    """
+
+    def __init__(self, units):
+        if not 1 <= units <= MAX_UNITS:
+            raise ValueError(f"units must be between 1 and {MAX_UNITS}")
+        self.units = units
+        self.counts = np.zeros(1 << units, dtype=np.int64)
+        self.ones = [0] * units
+        self.n = 0
+        self.s = 0.0
+
+    def update(self, state):
+        code = 0
+        for k, bit in enumerate(state):
+            code = (code << 1) | int(bit)
+            self.ones[k] += int(bit)
+        self.n += 1
+        c = int(self.counts[code])
+        self.counts[code] = c + 1
+        self.s += (c + 1) * math.log2(c + 1) - (c * math.log2(c) if c else 0.0)
+        h_total = max(math.log2(self.n) - self.s / self.n, 0.0)
+
+        h_parts = 0.0
+        for ones in self.ones:
+            if 0 < ones < self.n:
+                p = ones / self.n
+                h_parts -= p * math.log2(p) + (1 - p) * math.log2(1 - p)
+        return h_parts, h_total, h_total - h_parts
+
+
+if __name__ == "__main__":
+    # use:   python lz_psi.py FILE.npy      ((time, units) binary states)
+    h_parts, h_total, psi = psi_curve(np.load(sys.argv[1]))
+    print(f"H_parts = {h_parts[-1]}\nH_total = {h_total[-1]}\nψ       = {psi[-1]}")
@@ -0,0 +1,47 @@
+#
+# lz_scripts.py : import the hyphen-named scripts of this folder (lempel-ziv-v4.py, ...)
+#                 as regular modules, without running their interactive main()
+#
+
+import os, sys, threading
+import importlib.util
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# scripts load other scripts while they run: reentrant
+_lock = threading.RLock()
+_loaded = set()
+
+
+def module_name(file_name):
+    # "lempel-ziv-v4.py" -> "lempel_ziv_v4"
+    return os.path.splitext(os.path.basename(file_name))[0].replace("-", "_")
+
+
+def load_script(file_name):
+    """
+    Import file_name (relative to this folder) once and return the module.
+    The module is registered in sys.modules under a stable name, which
+    Numba's on-disk cache (cache=True) needs to find it again.
+    """
+    name = module_name(file_name)
+    if name in _loaded:
+        return sys.modules[name]
+
+    # another thread may be executing the module: wait for it to finish
+    with _lock:
+        module = sys.modules.get(name)
+        if module is not None:
+            # fully loaded, or being loaded by this very thread (a circular load)
+            return module
+
+        spec = importlib.util.spec_from_file_location(name, os.path.join(HERE, file_name))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[name]
+            raise
+        _loaded.add(name)
+        return module
@@ -0,0 +1,305 @@
+#
+# lz_supervisor.py : run the Lempel-Ziv engines under wall-clock and memory budgets
+#
+#   lz_complexity_supervised(data, measure="lz76", time_limit=60, memory_limit_bytes=None)
+#
+# Every attempt runs in a fresh worker process watched by the parent:
+#   - wall clock: past the budget the worker is asked to stop (cancel event,
+#     checked between chunks by the streaming engine), then terminated after
+#     a grace period (the njit kernels cannot be interrupted from inside)
+#   - memory: the parent samples the worker's RSS (/proc) and stops it above
+#     the limit; the limit covers the whole worker, interpreter included
+#
+# The attempts follow a fallback chain per measure, skipping the engines whose
+# predicted time or memory does not fit in what is left of the budget:
+#   1. the fastest engine of the measure (lz_engines.select_engine)
+#   2. an exact engine with bounded memory (v2 / v4-sparse)
+#   3. an approximate one of the same measure, with a sliding dictionary:
+#      lz76 -> lz_windowed.sliding_lz76 (window sized to the time left)
+#      automaton -> the v4 stream (memory bounded by the window)
+# Every engine of a chain must compute the requested measure. The result records
+# which engine produced the value, why, and every attempt.
+#
+
+import os, sys, time, argparse
+import multiprocessing as mp
+from collections import namedtuple
+
+import lz_engines
+from lz_scripts import load_script
+
+STREAM_ENGINE = "v4-stream"
+STREAM_CHUNK_BYTES = 1 << 20
+STREAM_BYTES_PER_WINDOW_BYTE = 600      # automaton of 2*window symbols, ~130 B per symbol + slack
+
+WINDOW_ENGINE = "lz76-window"
+WINDOW_CHUNK_SYMBOLS = 1 << 16
+WINDOW_STEPS_PER_SECOND = 2e8           # symbol comparisons per second (conservative)
+WINDOW_MIN_SYMBOLS = 256
+
+# measures of the engines that are not in lz_engines
+CHAIN_ENGINES = {STREAM_ENGINE: "automaton", WINDOW_ENGINE: "lz76"}
+
+CHAINS = {
+    "lz76": ("auto", "v2", WINDOW_ENGINE),
+    "automaton": ("auto", "v4-sparse", STREAM_ENGINE),
+    "lz78": ("lz78",),
+    "v5": ("v5",),
+}
+
+Attempt = namedtuple("Attempt", "engine status reason seconds peak_rss_mb")
+SupervisedResult = namedtuple("SupervisedResult", "value engine measure exact reason seconds attempts")
+
+
+class Cancelled(Exception):
+    pass
+
+
+# -----------------------------------------------------------
+#   WORKER (child process)
+# -----------------------------------------------------------
+def _stream_chunks(raw, cancel):
+    view = memoryview(raw)
+    for start in range(0, len(raw), STREAM_CHUNK_BYTES):
+        if cancel.is_set():
+            raise Cancelled()
+        yield view[start:start + STREAM_CHUNK_BYTES]
+
+
+def _worker(conn, cancel, engine, data, memory_limit_bytes, window_bytes):
+    try:
+        if engine == WINDOW_ENGINE:
+            import lz_windowed
+            result = lz_windowed.sliding_lz76(data, window_bytes, WINDOW_CHUNK_SYMBOLS, cancel.is_set)
+            if result is None:
+                raise Cancelled()
+            value, exact = result
+        elif engine == STREAM_ENGINE:
+            v4 = load_script("lempel-ziv-v4.py")
+            raw = lz_engines.as_bytes(lz_engines.as_symbols(data))
+            value, _, exact = v4.compute_lz_complexity_stream(
+                _stream_chunks(raw, cancel), window_bytes=window_bytes,
+                memory_limit_bytes=memory_limit_bytes)
+        else:
+            value, exact = lz_engines.lz_complexity(data, engine), True
+        conn.send(("ok", int(value), exact, ""))
+    except Cancelled:
+        conn.send(("cancelled", None, False, "stopped at the cancel request"))
+    except MemoryError as e:
+        conn.send(("memory", None, False, f"MemoryError: {e}"))
+    except Exception as e:
+        conn.send(("error", None, False, f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+# -----------------------------------------------------------
+#   SUPERVISION (parent process)
+# -----------------------------------------------------------
+def engine_measure(engine):
+    """
+    Measure computed by an engine of a chain (lz_engines or CHAIN_ENGINES).
+    """
+    if engine in CHAIN_ENGINES:
+        return CHAIN_ENGINES[engine]
+    if engine in lz_engines.ENGINES:
+        return lz_engines.ENGINES[engine].measure
+    raise ValueError(f"unknown engine {engine!r} (use one of {sorted(lz_engines.ENGINES) + sorted(CHAIN_ENGINES)})")
+
+
+def window_symbols(n, seconds):
+    """
+    Dictionary window of the lz76 sliding engine that fits in about `seconds`.
+    """
+    return int(max(WINDOW_MIN_SYMBOLS, min(n, seconds * WINDOW_STEPS_PER_SECOND / max(n, 1))))
+
+
+def rss_bytes(pid):
+    """
+    Resident set size of process pid (0 where /proc is not available).
+    """
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def run_supervised(data, engine, time_limit, memory_limit_bytes, window_bytes=2_000_000,
+                   grace=1.0, poll=0.02, measure=None):
+    """
+    Run one engine in a worker process within time_limit seconds and
+    memory_limit_bytes of RSS. Returns (status, value, exact, reason, seconds, peak_rss_mb);
+    status is "ok", "timeout", "memory", "cancelled" or "error".
+    window_bytes: dictionary window of the sliding engines (lz76-window, v4-stream)
+    measure: if given, an engine computing another measure is refused (ValueError)
+    """
+    if measure is not None and engine_measure(engine) != measure:
+        raise ValueError(f"engine {engine!r} computes {engine_measure(engine)!r}, not {measure!r}")
+    ctx = mp.get_context("spawn")          # clean RSS: no pages shared with the parent
+    recv, send = ctx.Pipe(duplex=False)
+    cancel = ctx.Event()
+    worker = ctx.Process(target=_worker, daemon=True,
+                         args=(send, cancel, engine, data, memory_limit_bytes, window_bytes))
+    t0 = time.perf_counter()
+    worker.start()
+    send.close()
+
+    peak = 0
+    msg = None
+    stop = None
+    while msg is None and stop is None:
+        if recv.poll(poll):
+            try:
+                msg = recv.recv()
+            except EOFError:
+                msg = ("error", None, False, f"worker died (exit code {worker.exitcode})")
+            break
+        elapsed = time.perf_counter() - t0
+        rss = rss_bytes(worker.pid)
+        peak = max(peak, rss)
+        if not worker.is_alive() and not recv.poll(0):
+            worker.join()
+            msg = ("error", None, False, f"worker died (exit code {worker.exitcode})")
+        elif elapsed > time_limit:
+            stop = ("timeout", f"exceeded the {time_limit:.1f} s wall-clock budget")
+        elif rss > memory_limit_bytes:
+            stop = ("memory", f"RSS {rss / 1e6:.0f} MB above the {memory_limit_bytes / 1e6:.0f} MB budget")
+
+    if stop is not None:
+        # cooperative cancellation first (only the sliding engines check it), then the hard way
+        cancel.set()
+        if engine in CHAIN_ENGINES and recv.poll(grace):
+            try:
+                recv.recv()
+            except EOFError:
+                pass
+        msg = (stop[0], None, False, stop[1])
+    else:
+        worker.join(grace)
+    if worker.is_alive():
+        worker.terminate()
+        worker.join(grace)
+        if worker.is_alive():
+            worker.kill()
+            worker.join()
+    recv.close()
+
+    status, value, exact, reason = msg
+    return status, value, exact, reason, time.perf_counter() - t0, peak / (1024 * 1024)
+
+
+# -----------------------------------------------------------
+#   FALLBACK CHAIN
+# -----------------------------------------------------------
+def lz_complexity_supervised(data, measure="lz76", time_limit=60.0, memory_limit_bytes=None,
+                             chain=None, table=None, verbose=False):
+    """
+    data: bytes, str or 1-D symbol array
+    measure: "lz76", "automaton", "lz78" or "v5" (selects the default chain)
+    time_limit: seconds for the whole chain
+    memory_limit_bytes: RSS budget of each worker (default: 80% of the available memory)
+    chain: engine names to try in order ("auto" = fastest engine of the measure);
+           all of them must compute `measure`
+    Returns: SupervisedResult(value, engine, measure, exact, reason, seconds, attempts)
+    Raises RuntimeError when every engine of the chain failed or was skipped.
+    """
+    if measure not in CHAINS and chain is None:
+        raise ValueError(f"unknown measure {measure!r} (use one of {sorted(CHAINS)})")
+    chain = chain or CHAINS[measure]
+    for name in chain:
+        if name != "auto" and engine_measure(name) != measure:
+            raise ValueError(f"engine {name!r} in the chain computes {engine_measure(name)!r}, "
+                             f"not {measure!r}")
+    if memory_limit_bytes is None:
+        memory_limit_bytes = int(0.8 * lz_engines.available_memory())
+    table = table or lz_engines.load_calibration()
+
+    arr = lz_engines.as_symbols(data)
+    n = arr.shape[0]
+    if n == 0:
+        return SupervisedResult(0, None, measure, True, "empty input", 0.0, [])
+    m = lz_engines.alphabet_size(arr)
+    window_bytes = max(1, min(n, memory_limit_bytes // STREAM_BYTES_PER_WINDOW_BYTE))
+
+    t_start = time.perf_counter()
+    attempts = []
+    tried = set()
+    for name in chain:
+        if name == "auto":
+            try:
+                name, _ = lz_engines.select_engine(n, m, measure, table, memory_limit_bytes)
+            except MemoryError as e:
+                attempts.append(Attempt("auto", "skipped", str(e), 0.0, 0.0))
+                continue
+        if name in tried:
+            continue
+        tried.add(name)
+
+        remaining = time_limit - (time.perf_counter() - t_start)
+        if remaining <= 0:
+            attempts.append(Attempt(name, "skipped", "time budget exhausted", 0.0, 0.0))
+            break
+        window = window_bytes
+        if name == WINDOW_ENGINE:
+            window = window_symbols(n, remaining)
+        elif name != STREAM_ENGINE:
+            e = lz_engines.ENGINES[name]
+            need = n * e.bytes_per_symbol(m)
+            predicted = lz_engines.predict_seconds(table, name, n, m)
+            if need > memory_limit_bytes:
+                attempts.append(Attempt(name, "skipped", f"needs ~{need / 1e6:.0f} MB, budget "
+                                        f"{memory_limit_bytes / 1e6:.0f} MB", 0.0, 0.0))
+                continue
+            if predicted > remaining:
+                attempts.append(Attempt(name, "skipped", f"predicted {predicted:.1f} s, "
+                                        f"{remaining:.1f} s left", 0.0, 0.0))
+                continue
+
+        status, value, exact, reason, seconds, peak = run_supervised(
+            data, name, remaining, memory_limit_bytes, window, measure=measure)
+        attempts.append(Attempt(name, status, reason, seconds, peak))
+        if verbose:
+            print(f"  {name:10s} {status:9s} {seconds:8.3f} s  {peak:8.1f} MB  {reason}")
+        if status == "ok":
+            if len(attempts) == 1:
+                why = "first choice of the chain"
+            else:
+                why = "fallback after " + ", ".join(f"{a.engine} ({a.status}: {a.reason})"
+                                                    for a in attempts[:-1])
+            if not exact:
+                why += f"; approximate, {window} symbol sliding window"
+            return SupervisedResult(value, name, engine_measure(name), exact, why,
+                                    time.perf_counter() - t_start, attempts)
+
+    raise RuntimeError("no engine produced a result within the budget:\n" +
+                       "\n".join(f"  {a.engine}: {a.status} ({a.reason})" for a in attempts))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Lempel-Ziv complexity under time / memory budgets.")
+    parser.add_argument("file")
+    parser.add_argument("--measure", default="lz76", choices=sorted(CHAINS))
+    parser.add_argument("--time", type=float, default=60.0, help="seconds for the whole chain")
+    parser.add_argument("--memory-mb", type=float, default=None, help="RSS budget per worker")
+    parser.add_argument("--chain", default=None, help="comma separated engines of the measure, e.g. v3,v2,lz76-window")
+    args = parser.parse_args(argv)
+
+    with open(args.file, "rb") as f:
+        raw = f.read()
+    memory = int(args.memory_mb * 1024 * 1024) if args.memory_mb else None
+    chain = args.chain.split(",") if args.chain else None
+    try:
+        r = lz_complexity_supervised(raw, args.measure, args.time, memory, chain, verbose=True)
+    except RuntimeError as e:
+        print(e)
+        return 1
+    print(f"\nLempel-Ziv complexity = {r.value}  (engine {r.engine}, measure {r.measure}, "
+          f"{'exact' if r.exact else 'approximate'})")
+    print(f"Reason: {r.reason}")
+    print(f"Elapsed time: {r.seconds:.3f} seconds")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
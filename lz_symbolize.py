@@ -0,0 +1,189 @@
+#
+# lz_symbolize.py : numeric signals -> compact uint8 symbol arrays for the LZ engines
+#
+# Works on 1-D signals or 2-D (channels x time) arrays, one channel per row,
+# without any string conversion:
+#   binarize(x, "median" | "mean" | value)   1 where x > threshold of its channel
+#   quantize(x, levels)                      quantile bins 0..levels-1 per channel
+#   hilbert_binarize(x)                      amplitude envelope (analytic signal) > threshold
+#   ordinal_patterns(x, order, delay)        permutation (ordinal pattern) index 0..order!-1
+#
+# The output feeds complexityLempelZiv (lempel-ziv-v2.py), lz_batch (one
+# complexity per channel) and compute_lz_complexity_bytes (arr.tobytes()).
+#
+
+import sys
+from math import factorial
+import numpy as np
+
+MAX_ORDER = 5                   # 5! = 120 patterns still fit in a uint8
+
+
+def _as_2d(x):
+    x = np.asarray(x)
+    if x.ndim == 1:
+        return x[None, :], True
+    if x.ndim != 2:
+        raise ValueError(f"expected a 1-D signal or a (channels, time) array, got shape {x.shape}")
+    return x, False
+
+
+def _restore(sym, was_1d):
+    return sym[0] if was_1d else sym
+
+
+# -----------------------------------------------------------
+#   THRESHOLD / QUANTILE CODING
+# -----------------------------------------------------------
+def thresholds(x, threshold="median"):
+    """
+    Per channel threshold, shape (channels, 1): "median", "mean" or a number.
+    """
+    x2, _ = _as_2d(x)
+    if threshold == "median":
+        return np.median(x2, axis=1, keepdims=True)
+    if threshold == "mean":
+        return x2.mean(axis=1, keepdims=True)
+    if isinstance(threshold, str):
+        raise ValueError(f"unknown threshold {threshold!r} (use 'median', 'mean' or a number)")
+    return np.broadcast_to(np.asarray(threshold, dtype=np.float64).reshape(-1, 1), (x2.shape[0], 1))
+
+
+def binarize(x, threshold="median"):
+    """
+    1 where the sample is above the threshold of its channel, else 0 (uint8).
+    """
+    x2, was_1d = _as_2d(x)
+    return _restore((x2 > thresholds(x2, threshold)).astype(np.uint8), was_1d)
+
+
+def quantize(x, levels=4):
+    """
+    Equiprobable bins: symbol k for samples between the k/levels and
+    (k+1)/levels quantiles of their channel (uint8, 0..levels-1).
+    """
+    if not 2 <= levels <= 256:
+        raise ValueError("levels must be between 2 and 256")
+    x2, was_1d = _as_2d(x)
+    edges = np.quantile(x2, np.arange(1, levels) / levels, axis=1).T        # (channels, levels-1)
+    out = np.empty(x2.shape, dtype=np.uint8)
+    for c in range(x2.shape[0]):
+        out[c] = np.searchsorted(edges[c], x2[c], side="right")
+    return _restore(out, was_1d)
+
+
+# -----------------------------------------------------------
+#   HILBERT AMPLITUDE
+# -----------------------------------------------------------
+def analytic_amplitude(x):
+    """
+    |analytic signal| of every channel (FFT Hilbert transform, as scipy.signal.hilbert).
+    """
+    x2, was_1d = _as_2d(x)
+    n = x2.shape[1]
+    spectrum = np.fft.fft(x2, axis=1)
+    h = np.zeros(n)
+    h[0] = 1.0
+    if n % 2 == 0:
+        h[n // 2] = 1.0
+        h[1:n // 2] = 2.0
+    else:
+        h[1:(n + 1) // 2] = 2.0
+    return _restore(np.abs(np.fft.ifft(spectrum * h, axis=1)), was_1d)
+
+
+def hilbert_binarize(x, threshold="mean"):
+    """
+    Binarized amplitude envelope: 1 where |analytic signal| > threshold of its channel
+    (the symbolization of the Lempel-Ziv complexity of EEG / PCI studies).
+    """
+    return binarize(analytic_amplitude(x), threshold)
+
+
+# -----------------------------------------------------------
+#   ORDINAL PATTERNS
+# -----------------------------------------------------------
+def ordinal_patterns(x, order=3, delay=1):
+    """
+    Ordinal pattern (Bandt-Pompe) of every window x[t], x[t+delay], ..., x[t+(order-1)*delay]
+    coded as the Lehmer index of its ranking, 0..order!-1 (uint8). Ties keep time order.
+    The output is (order-1)*delay samples shorter than the input.
+    """
+    if not 2 <= order <= MAX_ORDER:
+        raise ValueError(f"order must be between 2 and {MAX_ORDER}")
+    x2, was_1d = _as_2d(x)
+    span = (order - 1) * delay
+    if x2.shape[1] <= span:
+        raise ValueError(f"signal of {x2.shape[1]} samples is too short for order {order}, delay {delay}")
+    windows = np.lib.stride_tricks.sliding_window_view(x2, span + 1, axis=1)[:, :, ::delay]
+    ranks = np.argsort(np.argsort(windows, axis=2, kind="stable"), axis=2, kind="stable")
+
+    code = np.zeros(ranks.shape[:2], dtype=np.int64)
+    for i in range(order - 1):
+        smaller_after = (ranks[:, :, i + 1:] < ranks[:, :, i:i + 1]).sum(axis=2)
+        code += smaller_after * factorial(order - 1 - i)
+    return _restore(code.astype(np.uint8), was_1d)
+
+
+# -----------------------------------------------------------
+#   PIPELINE
+# -----------------------------------------------------------
+METHODS = {
+    "median": lambda x, **kw: binarize(x, "median"),
+    "mean": lambda x, **kw: binarize(x, "mean"),
+    "quantile": lambda x, levels=4, **kw: quantize(x, levels),
+    "hilbert": lambda x, threshold="mean", **kw: hilbert_binarize(x, threshold),
+    "ordinal": lambda x, order=3, delay=1, **kw: ordinal_patterns(x, order, delay),
+}
+
+
+def symbolize(x, method="median", **params):
+    """
+    x: 1-D signal or (channels, time) array of floats or integers
+    method: "median", "mean", "quantile" (levels=), "hilbert" (threshold=),
+            "ordinal" (order=, delay=)
+    Returns: uint8 symbol array, same layout as x
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown method {method!r} (use one of {sorted(METHODS)})")
+    return METHODS[method](x, **params)
+
+
+def flatten_states(states):
+    """
+    (time, units) array of states -> 1-D uint8 sequence, state after state
+    (what ''.join of the states' digits gave, without the strings).
+    """
+    return np.ascontiguousarray(states, dtype=np.uint8).ravel()
+
+
+def pack_states(bits):
+    """
+    (channels, time) binary array with up to 8 channels -> one uint8 symbol per
+    time step, the state of all channels (channel 0 = most significant bit).
+    """
+    bits = np.asarray(bits, dtype=np.uint8)
+    if bits.ndim != 2 or bits.shape[0] > 8:
+        raise ValueError("expected a (channels <= 8, time) binary array")
+    weights = (1 << np.arange(bits.shape[0] - 1, -1, -1)).astype(np.uint8)
+    return (weights[:, None] * bits).sum(axis=0, dtype=np.uint8)
+
+
+def channel_complexity(x, method="median", engine="ks", **params):
+    """
+    Lempel-Ziv complexity of every channel of x after symbolize(x, method, **params).
+    engine: "ks" (complexityLempelZiv) or "automaton" (compute_lz_complexity_bytes),
+            both through lz_batch. Returns an int64 array (a scalar for a 1-D signal).
+    """
+    from lz_batch import lz_complexity_batch
+
+    sym = symbolize(x, method, **params)
+    out = lz_complexity_batch(np.atleast_2d(sym), engine=engine)
+    return int(out[0]) if sym.ndim == 1 else out
+
+
+if __name__ == "__main__":
+    # use:   python lz_symbolize.py FILE.npy [method]     (1-D or channels x time)
+    x = np.load(sys.argv[1])
+    method = sys.argv[2] if len(sys.argv) > 2 else "median"
+    print(channel_complexity(x, method))
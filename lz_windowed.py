@@ -0,0 +1,220 @@
+#
+# lz_windowed.py : Lempel-Ziv complexity time series over sliding windows
+#                  (same values as complexityLempelZiv on every window, one incremental pass)
+#
+# The factor starting at position i of the window [lo, hi) is 1 + the longest match of
+# s[i:hi] with a source p in [lo, i).  Sliding the window to [lo', hi') with lo' > lo:
+#   - a factor that did not reach hi keeps its length as long as its rightmost best
+#     source is still >= lo' (the match never looked past hi, so hi' does not matter)
+#   - only factors whose source fell out of the window, the factors near the new
+#     left edge and the last factor (cut by hi) have to be recomputed.
+# Blocks of consecutive windows are processed in parallel.
+#
+# sliding_lz76() is the same factorization on a whole input with the sources
+# limited to the last `window` symbols: approximate LZ76 in O(N * window) time and
+# no extra memory (the last resort of lz_supervisor.py's lz76 chain).
+#
+
+import sys, time
+import numpy as np
+from numba import njit, prange
+
+from lz_scripts import load_script
+
+# the LZ76 definition (reference of windowed_lz_naive) lives in lempel-ziv-v2.py
+complexityLempelZiv = load_script("lempel-ziv-v2.py").complexityLempelZiv
+
+
+@njit(cache=True, nogil=True)
+def longest_previous_match(s, lo, i, hi):
+    """
+    Longest match of s[i:hi] with a source p in [lo, i) (overlap allowed).
+    Returns (matched, source, reaches_end): source is the rightmost p achieving
+    the maximum (i when nothing matches); reaches_end means s[i:hi] was matched
+    completely, i.e. this is the last factor of the window.
+    """
+    best = 0
+    source = i
+    for p in range(lo, i):
+        l = 0
+        while i + l < hi and s[p + l] == s[i + l]:
+            l += 1
+        if i + l == hi:
+            return l, p, True
+        if l > 0 and l >= best:
+            best = l
+            source = p
+    return best, source, False
+
+
+@njit(cache=True, nogil=True)
+def sliding_lz76_run(s, i, stop, window):
+    """
+    LZ76 factors starting in [i, stop) of the whole s, with the sources restricted
+    to the last `window` symbols (p >= i - window).
+    Returns (factors, start of the next factor; n after the last one).
+    """
+    n = s.shape[0]
+    count = 0
+    while i < stop:
+        matched, source, reaches_end = longest_previous_match(s, max(0, i - window), i, n)
+        count += 1
+        if reaches_end:
+            return count, n
+        i += matched + 1
+    return count, i
+
+
+@njit(cache=True, nogil=True)
+def windowed_lz_block(s, window, stride, first, last, out):
+    """
+    Complexities of windows first..last-1 (window k starts at k*stride), reusing
+    the factorization of each window for the next one.
+    """
+    cap = window + 1
+    old_start = np.empty(cap, dtype=np.int64)
+    old_source = np.empty(cap, dtype=np.int64)
+    new_start = np.empty(cap, dtype=np.int64)
+    new_source = np.empty(cap, dtype=np.int64)
+    n_old = 0
+
+    for w in range(first, last):
+        lo = w * stride
+        hi = lo + window
+        n_new = 0
+        j = 0
+        x = lo
+        while x < hi:
+            while j < n_old and old_start[j] < x:
+                j += 1
+            if j < n_old - 1 and old_start[j] == x and old_source[j] >= lo:
+                # same factor as in the previous window
+                new_start[n_new] = x
+                new_source[n_new] = old_source[j]
+                n_new += 1
+                x = old_start[j + 1]
+                continue
+
+            matched, source, reaches_end = longest_previous_match(s, lo, x, hi)
+            new_start[n_new] = x
+            new_source[n_new] = source
+            n_new += 1
+            if reaches_end:
+                break
+            x += matched + 1
+
+        out[w] = n_new
+        old_start, new_start = new_start, old_start
+        old_source, new_source = new_source, old_source
+        n_old = n_new
+
+
+@njit(cache=True, parallel=True)
+def windowed_lz_parallel(s, window, stride, n_windows, block, out):
+    n_blocks = (n_windows + block - 1) // block
+    for b in prange(n_blocks):
+        first = b * block
+        last = min(first + block, n_windows)
+        windowed_lz_block(s, window, stride, first, last, out)
+
+
+def as_symbols(arr):
+    """
+    bytes / str / array-like -> 1-D NumPy symbol array
+    """
+    if isinstance(arr, str):
+        arr = arr.encode("utf-8")
+    if isinstance(arr, (bytes, bytearray, memoryview)):
+        return np.frombuffer(arr, dtype=np.uint8)
+    arr = np.ascontiguousarray(arr)
+    if arr.ndim != 1:
+        raise ValueError(f"expected a 1-D sequence, got shape {arr.shape}")
+    return arr
+
+
+def windowed_lz(arr, window, stride=1, block=4096):
+    """
+    LZ complexity (complexityLempelZiv) of every window arr[k*stride : k*stride + window].
+    block: windows per parallel task (each task restarts the incremental state once)
+    Returns: int64 NumPy array with one complexity per window
+    """
+    s = as_symbols(arr)
+    if window < 1 or stride < 1:
+        raise ValueError("window and stride must be >= 1")
+
+    n = s.shape[0]
+    if n < window:
+        return np.zeros(0, dtype=np.int64)
+
+    n_windows = (n - window) // stride + 1
+    out = np.zeros(n_windows, dtype=np.int64)
+    windowed_lz_parallel(s, window, stride, n_windows, max(1, block), out)
+    return out
+
+
+def sliding_lz76(arr, window, chunk_symbols=1 << 16, cancel=None):
+    """
+    LZ76 of the whole arr with a sliding dictionary: every factor is matched only
+    against the last `window` symbols. Time O(N * window), no memory beyond the input.
+    cancel: callable checked between chunks of chunk_symbols positions; when it
+            returns True the computation stops and None is returned
+    Returns: (complexity, exact); exact when window >= len(arr), i.e. the value
+             of complexityLempelZiv ((0, True) for an empty input, like lz_engines)
+    """
+    s = as_symbols(arr)
+    if window < 1:
+        raise ValueError("window must be >= 1")
+    n = s.shape[0]
+    if n == 0:
+        return 0, True
+    count = 0
+    i = 0
+    while i < n:
+        if cancel is not None and cancel():
+            return None
+        c, i = sliding_lz76_run(s, i, min(n, i + chunk_symbols), window)
+        count += c
+    return count, window >= n
+
+
+def windowed_lz_naive(arr, window, stride=1):
+    """
+    Reference: one complexityLempelZiv call per window.
+    """
+    s = as_symbols(arr)
+    n_windows = max(0, (s.shape[0] - window) // stride + 1)
+    out = np.zeros(n_windows, dtype=np.int64)
+    for k in range(n_windows):
+        out[k] = complexityLempelZiv(s[k * stride:k * stride + window])
+    return out
+
+
+def benchmark(n=200_000, window=1000, stride=1, alphabet=2, seed=0):
+    """
+    Compare windowed_lz() with the naive per-window loop on a random signal.
+    """
+    s = np.random.default_rng(seed).integers(0, alphabet, n, dtype=np.uint8)
+
+    # compile both paths before timing
+    windowed_lz(s[:window + 2 * stride], window, stride)
+    windowed_lz_naive(s[:window + 2 * stride], window, stride)
+
+    t0 = time.perf_counter()
+    fast = windowed_lz(s, window, stride)
+    t1 = time.perf_counter()
+    naive = windowed_lz_naive(s, window, stride)
+    t2 = time.perf_counter()
+
+    if not np.array_equal(fast, naive):
+        raise AssertionError("windowed_lz differs from the per-window complexityLempelZiv loop")
+
+    print(f"{fast.shape[0]} windows (N={n}, W={window}, S={stride}, alphabet={alphabet})")
+    print(f"  windowed_lz : {t1 - t0:.4f} s")
+    print(f"  naive loop  : {t2 - t1:.4f} s  ({(t2 - t1) / max(t1 - t0, 1e-9):.1f}x slower)")
+
+
+if __name__ == "__main__":
+    # use:   python lz_windowed.py [N] [window] [stride] [alphabet]
+    args = [int(a) for a in sys.argv[1:5]]
+    import lz_windowed                 # the cached kernels belong to this name, not "__main__"
+    lz_windowed.benchmark(*args)
@@ -0,0 +1,203 @@
+#
+# ncd_matrix.py : normalized compression distance between every pair of files
+#
+# use:   python ncd_matrix.py FILE_OR_DIR ... [-o ncd.npy] [--codec lzma] [--level 6]
+#        python ncd_matrix.py FILE_OR_DIR ... --codec lz76
+#
+#   NCD(x, y) = (C(xy) - min(C(x), C(y))) / max(C(x), C(y))
+#
+# C = compressed size (zlib / bz2 / lzma, streamed as in compression_estimate.py)
+# or LZ76 complexity (complexityLempelZiv of lempel-ziv-v2.py, codec "lz76").
+#
+# C(x) is computed once per distinct content and cached on disk keyed by its
+# SHA-256, so reruns over a growing corpus only compress the new files.
+# C(xy) is computed for i < j only (the matrix is made symmetric), in a
+# process pool for the compressors and with lz_batch's threaded kernel for lz76.
+#
+
+import os, sys, json, time, hashlib, argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from compression_estimate import CODECS, DEFAULT_LEVELS, CHUNK_BYTES, iter_slices
+from lz_engines import CACHE_DIR
+
+SIZE_CACHE_FILE = os.path.join(CACHE_DIR, "ncd_sizes.json")
+LZ76_BATCH_BYTES = 64 << 20
+
+
+# -----------------------------------------------------------
+#   C(x) CACHE
+# -----------------------------------------------------------
+def content_hash(path, chunk_bytes=CHUNK_BYTES):
+    h = hashlib.sha256()
+    for part in iter_slices(path, chunk_bytes):
+        h.update(part)
+    return h.hexdigest()
+
+
+def load_size_cache(path=SIZE_CACHE_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_size_cache(cache, path=SIZE_CACHE_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp, path)
+
+
+# -----------------------------------------------------------
+#   COMPRESSED SIZES
+# -----------------------------------------------------------
+def concat_compressed_size(paths, codec, level, chunk_bytes=CHUNK_BYTES):
+    """
+    Compressed size of the concatenation of the files in paths.
+    """
+    compressor = CODECS[codec](level)
+    size = 0
+    for path in paths:
+        for part in iter_slices(path, chunk_bytes):
+            size += len(compressor.compress(part))
+    return size + len(compressor.flush())
+
+
+def _single_size(args):
+    # worker: C(x) of one file
+    x, codec, level = args
+    return concat_compressed_size((x,), codec, level)
+
+
+def _pair_size(args):
+    # worker: C(xy) of one pair
+    x, y, codec, level = args
+    return concat_compressed_size((x, y), codec, level)
+
+
+def lz76_sizes(contents, pairs, threads=None):
+    """
+    LZ76 complexity of contents[k] (pairs is None) or of contents[i] + contents[j]
+    for (i, j) in pairs, computed with lz_batch in blocks of about LZ76_BATCH_BYTES.
+    """
+    from lz_batch import lz_complexity_batch
+
+    items = [(k,) for k in range(len(contents))] if pairs is None else pairs
+    out = np.zeros(len(items), dtype=np.int64)
+    start = 0
+    while start < len(items):
+        stop, total = start, 0
+        while stop < len(items) and (stop == start or total < LZ76_BATCH_BYTES):
+            total += sum(len(contents[k]) for k in items[stop])
+            stop += 1
+        seqs = [b"".join(contents[k] for k in item) for item in items[start:stop]]
+        out[start:stop] = lz_complexity_batch(seqs, threads=threads)
+        start = stop
+    return out
+
+
+# -----------------------------------------------------------
+#   MATRIX
+# -----------------------------------------------------------
+def ncd(cx, cy, cxy):
+    return (cxy - np.minimum(cx, cy)) / np.maximum(np.maximum(cx, cy), 1)
+
+
+def ncd_matrix(paths, codec="lzma", level=None, processes=None, cache_path=SIZE_CACHE_FILE,
+               verbose=False):
+    """
+    paths: files to compare
+    codec: "zlib", "bz2", "lzma" (compressed sizes) or "lz76" (LZ76 complexity)
+    Returns: (N, N) float64 NumPy array, symmetric with a zero diagonal
+    """
+    if codec != "lz76" and codec not in CODECS:
+        raise ValueError(f"unknown codec {codec!r} (use 'lz76' or one of {sorted(CODECS)})")
+    level = DEFAULT_LEVELS.get(codec) if level is None else level
+    n = len(paths)
+    tag = "lz76" if codec == "lz76" else f"{codec}:{level}"
+
+    t0 = time.perf_counter()
+    hashes = [content_hash(p) for p in paths]
+    cache = load_size_cache(cache_path) if cache_path else {}
+    first = {}
+    for k, h in enumerate(hashes):
+        if f"{tag}:{h}" not in cache:
+            first.setdefault(h, k)                 # one file per distinct content
+    missing = list(first.values())
+
+    pairs = [(i, j) for i in range(n) for j in range(i + 1, n)]
+    if codec == "lz76":
+        contents = []
+        for p in paths:
+            with open(p, "rb") as f:
+                contents.append(f.read())
+        for k, c in zip(missing, lz76_sizes([contents[k] for k in missing], None)):
+            cache[f"{tag}:{hashes[k]}"] = int(c)
+        pair_sizes = lz76_sizes(contents, pairs)
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            singles = pool.map(_single_size, [(paths[k], codec, level) for k in missing])
+            for k, c in zip(missing, singles):
+                cache[f"{tag}:{hashes[k]}"] = c
+            jobs = [(paths[i], paths[j], codec, level) for i, j in pairs]
+            chunk = max(1, len(jobs) // (4 * (processes or os.cpu_count() or 1)))
+            pair_sizes = np.fromiter(pool.map(_pair_size, jobs, chunksize=chunk), dtype=np.int64,
+                                     count=len(jobs))
+    if cache_path and missing:
+        save_size_cache(cache, cache_path)
+
+    sizes = np.array([cache[f"{tag}:{h}"] for h in hashes], dtype=np.float64)
+    out = np.zeros((n, n), dtype=np.float64)
+    if pairs:
+        i, j = np.array(pairs).T
+        out[i, j] = out[j, i] = ncd(sizes[i], sizes[j], pair_sizes.astype(np.float64))
+    if verbose:
+        print(f"{n} files, {len(missing)} singleton sizes computed "
+              f"({n - len(missing)} cached or duplicate), {len(pairs)} pairs in {time.perf_counter() - t0:.2f} s")
+    return out
+
+
+def collect_files(items):
+    files = []
+    for item in items:
+        if os.path.isdir(item):
+            files.extend(sorted(os.path.join(item, f) for f in os.listdir(item)
+                                if os.path.isfile(os.path.join(item, f))))
+        else:
+            files.append(item)
+    return files
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Normalized compression distance matrix.")
+    parser.add_argument("inputs", nargs="+", help="files or directories")
+    parser.add_argument("-o", "--output", default="ncd.npy")
+    parser.add_argument("--codec", default="lzma", choices=sorted(CODECS) + ["lz76"])
+    parser.add_argument("--level", type=int, default=None)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--no-cache", action="store_true", help="do not read or update the C(x) cache")
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.inputs)
+    if len(files) < 2:
+        parser.error("need at least two files")
+
+    matrix = ncd_matrix(files, args.codec, args.level, args.processes,
+                        cache_path=None if args.no_cache else SIZE_CACHE_FILE, verbose=True)
+    np.save(args.output, matrix)
+    names = os.path.splitext(args.output)[0] + ".files.txt"
+    with open(names, "w") as f:
+        f.write("\n".join(files) + "\n")
+    print(f"Matrix saved in {args.output} (row order in {names})")
+    if len(files) <= 10:
+        with np.printoptions(precision=3, suppress=True):
+            print(matrix)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))